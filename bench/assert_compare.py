@@ -0,0 +1,61 @@
+"""Measure the cost of explaining failed comparisons of large objects.
+
+Runs tests comparing lists, dicts and sets of N items (100,000 by default)
+which differ, with -v, and reports the time spent in each test. Extra
+arguments are passed to pytest, e.g. -vv to explain them in full:
+
+    python bench/assert_compare.py [N] [pytest args...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+
+TESTS = """
+N = {n}
+
+def test_list():
+    assert list(range(N)) == [*range(N - 1), -1]
+
+def test_nested_list():
+    assert [[i, str(i)] for i in range(N)] == [[i, str(i)] for i in range(1, N + 1)]
+
+def test_dict():
+    assert {{i: i for i in range(N)}} == {{i: -i for i in range(1, N + 1)}}
+
+def test_set():
+    assert set(range(N)) == set(range(N // 2, N + N // 2))
+"""
+
+
+class CallTimer:
+    def __init__(self) -> None:
+        self.timings = {}
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item):
+        start = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            self.timings[item.name] = time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = int(args.pop(0)) if args and args[0].isdigit() else 100_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test_compare.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(TESTS.format(n=n))
+        timer = CallTimer()
+        pytest.main(
+            [path, "-v", "-p", "no:cacheprovider", "--tb=no", *args],
+            plugins=[timer],
+        )
+    for name, elapsed in timer.timings.items():
+        print(f"{name}: {elapsed:.3f}s")
@@ -0,0 +1,69 @@
+"""Measure the cost of a passing assert in each assertion rewrite mode.
+
+Runs a loop of N passing asserts (1,000,000 by default) of a few common shapes,
+as plain Python asserts and rewritten in each assert_rewrite_mode, also with a
+pytest_assertion_pass hook ignoring the explanations, called for every passing
+assert or for a sample of 10% of them, and reports the time per assert, in
+nanoseconds:
+
+    python bench/assert_overhead.py [N]
+"""
+
+import ast
+import sys
+import time
+
+from _pytest.assertion import util
+from _pytest.assertion.rewrite import rewrite_asserts
+from _pytest.precompile import RewriteSettings
+
+
+SOURCE = """
+def loop(n):
+    values = [1.0, 2.0, 3.0]
+    for i in range(n):
+        assert i >= 0
+        assert values[1] == 2.0
+        assert 0 <= i < n and len(values) == 3
+        assert abs(values[0] - 1.0) < 1e-9
+"""
+ASSERTS_PER_ITERATION = 4
+
+
+def compile_loop(mode, pass_hook):
+    tree = ast.parse(SOURCE)
+    if mode is not None:
+        settings = RewriteSettings(
+            {"enable_assertion_pass_hook": pass_hook, "assert_rewrite_mode": mode},
+            None,
+            None,
+        )
+        rewrite_asserts(tree, SOURCE.encode(), "<bench>", settings)  # type: ignore[arg-type]
+    ns = {}
+    exec(compile(tree, "<bench>", "exec"), ns)
+    return ns["loop"]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    iterations = n // ASSERTS_PER_ITERATION
+    for label, mode, pass_sample_rate in (
+        ("plain", None, None),
+        ("full", "full", None),
+        ("lazy", "lazy", None),
+        ("full, pass hook", "full", 1.0),
+        ("full, pass hook sampling 10%", "full", 0.1),
+    ):
+        loop = compile_loop(mode, pass_sample_rate is not None)
+        if pass_sample_rate is not None:
+            util._assertion_pass = lambda lineno, orig, expl: None
+            util._assertion_pass_sample_rate = pass_sample_rate
+        start = time.perf_counter()
+        loop(iterations)
+        elapsed = time.perf_counter() - start
+        util._assertion_pass = None
+        util._assertion_pass_sample_rate = 1.0
+        print(
+            f"{label}: {elapsed:.2f}s, "
+            f"{elapsed / (iterations * ASSERTS_PER_ITERATION) * 1e9:.0f}ns per assert"
+        )
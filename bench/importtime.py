@@ -0,0 +1,88 @@
+"""Measure the modules imported by pytest on startup, with ``-X importtime``.
+
+Runs pytest on a single trivial test in a fresh interpreter, without the
+installed plugins, and reports the number of imported modules, the total
+import time and the costliest imports.
+Extra arguments are passed to pytest, e.g. to see what an option imports:
+
+    python bench/importtime.py [--top N] [pytest args...]
+
+With ``--import-only``, only ``import pytest`` is measured instead:
+
+    python bench/importtime.py [--top N] --import-only
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+from typing import Tuple
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return the (module, self us, cumulative us) of each import."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def run_pytest(args: List[str]) -> "subprocess.CompletedProcess[str]":
+    """Run pytest with ``-X importtime`` on a single trivial test."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test_trivial.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("def test_trivial():\n    pass\n")
+        return subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-m",
+                "pytest",
+                path,
+                "-q",
+                "-s",
+                "-p",
+                "no:cacheprovider",
+                *args,
+            ],
+            cwd=tmpdir,
+            env={**os.environ, "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"},
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    top = 15
+    if args[:1] == ["--top"]:
+        top = int(args[1])
+        del args[:2]
+    if args == ["--import-only"]:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import pytest"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    else:
+        result = run_pytest(args)
+    imports = parse_importtime(result.stderr)
+    total = sum(self_us for _, self_us, _ in imports)
+    plugins = sorted(
+        name[len("_pytest.") :]
+        for name, _, _ in imports
+        if name.startswith("_pytest.") and name.count(".") == 1
+    )
+    print(f"{len(imports)} modules imported in {total / 1000:.1f}ms")
+    print(f"_pytest modules: {', '.join(plugins)}")
+    print(f"\ncostliest {top} imports (cumulative ms, self ms):")
+    for name, self_us, cumulative_us in sorted(imports, key=lambda i: -i[2])[:top]:
+        print(f"{cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name.strip()}")
@@ -0,0 +1,49 @@
+"""Measure the fixed cost pytest adds to every test.
+
+Runs N trivial tests (1,000,000 by default) and reports the time spent in the
+runtest loop per test, in microseconds. Extra arguments are passed to pytest:
+
+    python bench/per_test_overhead.py [N] [pytest args...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+
+class RuntestLoopTimer:
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        self.count = 0
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtestloop(self, session):
+        self.count = len(session.items)
+        start = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = int(args.pop(0)) if args and args[0].isdigit() else 1_000_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test_trivial.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                "import pytest\n\n\n"
+                f"@pytest.mark.parametrize('i', range({n}))\n"
+                "def test_trivial(i):\n"
+                "    pass\n"
+            )
+        timer = RuntestLoopTimer()
+        pytest.main([path, "-q", "-p", "no:cacheprovider", *args], plugins=[timer])
+    print(
+        f"{timer.count} tests in {timer.elapsed:.2f}s: "
+        f"{timer.elapsed / max(timer.count, 1) * 1e6:.1f}us per test"
+    )
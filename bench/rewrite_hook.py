@@ -0,0 +1,49 @@
+"""Measure the cost of the assertion rewriting import hook for the imports it
+does not rewrite.
+
+Calls the find_spec() of the hook of a pytest session for every module
+imported so far, as on their first import, then again, as on their import
+after being removed from sys.modules, and reports the time per call. Extra
+arguments are passed to pytest, e.g. to use a pattern with a directory:
+
+    python bench/rewrite_hook.py [pytest args...]
+    python bench/rewrite_hook.py -o python_files=tests/*.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from _pytest.assertion.rewrite import assertstate_key
+import pytest
+
+
+class FindSpecTimer:
+    def __init__(self) -> None:
+        self.timings = []
+
+    def pytest_collection_finish(self, session):
+        hook = session.config.stash[assertstate_key].hook
+        names = sorted(name for name in sys.modules if not name.startswith("test_"))
+        for _ in range(2):
+            start = time.perf_counter()
+            for name in names:
+                hook.find_spec(name)
+            self.timings.append((len(names), time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test_trivial.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("def test_trivial():\n    pass\n")
+        timer = FindSpecTimer()
+        pytest.main(
+            [path, "-q", "-p", "no:cacheprovider", *sys.argv[1:]], plugins=[timer]
+        )
+    for label, (count, elapsed) in zip(("first", "again"), timer.timings):
+        print(
+            f"{label}: {count} modules in {elapsed * 1000:.1f}ms: "
+            f"{elapsed / count * 1e6:.2f}us per find_spec"
+        )
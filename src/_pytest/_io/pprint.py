@@ -15,6 +15,7 @@
 #  useful, thank small children who sleep at night.
 import collections as _collections
 import dataclasses as _dataclasses
+import heapq
 from io import StringIO as _StringIO
 import re
 import types as _types
@@ -22,6 +23,7 @@ from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import IO
+from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import Optional
@@ -65,6 +67,8 @@ class PrettyPrinter:
         indent: int = 4,
         width: int = 80,
         depth: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        max_chars: Optional[int] = None,
     ) -> None:
         """Handle pretty printing operations onto a stream using a set of
         configured parameters.
@@ -78,6 +82,11 @@ class PrettyPrinter:
         depth
             The maximum depth to print out nested structures.
 
+        max_lines, max_chars
+            The budget of the output: once it has that many lines or
+            characters, the remaining items of the containers being printed
+            are elided, with their count.
+
         """
         if indent < 0:
             raise ValueError("indent must be >= 0")
@@ -88,12 +97,33 @@ class PrettyPrinter:
         self._depth = depth
         self._indent_per_level = indent
         self._width = width
+        self._max_lines = max_lines
+        self._max_chars = max_chars
 
     def pformat(self, object: Any) -> str:
-        sio = _StringIO()
+        if self._max_lines is None and self._max_chars is None:
+            sio = _StringIO()
+        else:
+            sio = _CountingStream()
         self._format(object, sio, 0, 0, set(), 0)
         return sio.getvalue()
 
+    def _remaining_lines(self, stream: IO[str]) -> Optional[int]:
+        """Return how many more lines fit in the budget, if any."""
+        if isinstance(stream, _CountingStream):
+            if self._max_chars is not None and stream.tell() >= self._max_chars:
+                return 0
+            if self._max_lines is not None:
+                return max(0, self._max_lines - stream.lines)
+        return None
+
+    def _sorted(self, items: Iterable[Any], key, stream: IO[str]) -> List[Any]:
+        """Sort items, keeping only the first ones which may fit in the budget."""
+        remaining = self._remaining_lines(stream)
+        if remaining is None:
+            return sorted(items, key=key)
+        return heapq.nsmallest(remaining + 1, items, key=key)
+
     def _format(
         self,
         object: Any,
@@ -165,8 +195,10 @@ class PrettyPrinter:
     ) -> None:
         write = stream.write
         write("{")
-        items = sorted(object.items(), key=_safe_tuple)
-        self._format_dict_items(items, stream, indent, allowance, context, level)
+        items = self._sorted(object.items(), _safe_tuple, stream)
+        self._format_dict_items(
+            items, stream, indent, allowance, context, level, len(object)
+        )
         write("}")
 
     _dispatch[dict.__repr__] = _pprint_dict
@@ -239,8 +271,10 @@ class PrettyPrinter:
         else:
             stream.write(typ.__name__ + "({")
             endchar = "})"
-        object = sorted(object, key=_safe_key)
-        self._format_items(object, stream, indent, allowance, context, level)
+        items = self._sorted(object, _safe_key, stream)
+        self._format_items(
+            items, stream, indent, allowance, context, level, len(object)
+        )
         stream.write(endchar)
 
     _dispatch[set.__repr__] = _pprint_set
@@ -397,6 +431,7 @@ class PrettyPrinter:
         allowance: int,
         context: Set[int],
         level: int,
+        count: Optional[int] = None,
     ) -> None:
         if not items:
             return
@@ -404,8 +439,11 @@ class PrettyPrinter:
         write = stream.write
         item_indent = indent + self._indent_per_level
         delimnl = "\n" + " " * item_indent
-        for key, ent in items:
+        for i, (key, ent) in enumerate(items):
             write(delimnl)
+            if self._remaining_lines(stream) == 0:
+                write(_elided(len(items) if count is None else count, i))
+                break
             write(self._repr(key, context, level))
             write(": ")
             self._format(ent, stream, item_indent, 1, context, level)
@@ -428,8 +466,11 @@ class PrettyPrinter:
         write = stream.write
         item_indent = indent + self._indent_per_level
         delimnl = "\n" + " " * item_indent
-        for key, ent in items:
+        for i, (key, ent) in enumerate(items):
             write(delimnl)
+            if self._remaining_lines(stream) == 0:
+                write(_elided(len(items), i))
+                break
             write(key)
             write("=")
             if id(ent) in context:
@@ -458,6 +499,7 @@ class PrettyPrinter:
         allowance: int,
         context: Set[int],
         level: int,
+        count: Optional[int] = None,
     ) -> None:
         if not items:
             return
@@ -466,8 +508,11 @@ class PrettyPrinter:
         item_indent = indent + self._indent_per_level
         delimnl = "\n" + " " * item_indent
 
-        for item in items:
+        for i, item in enumerate(items):
             write(delimnl)
+            if self._remaining_lines(stream) == 0:
+                write(_elided(len(items) if count is None else count, i))
+                break
             self._format(item, stream, item_indent, 1, context, level)
             write(",")
 
@@ -505,8 +550,11 @@ class PrettyPrinter:
 
         if object:
             stream.write("{")
-            items = object.most_common()
-            self._format_dict_items(items, stream, indent, allowance, context, level)
+            remaining = self._remaining_lines(stream)
+            items = object.most_common(None if remaining is None else remaining + 1)
+            self._format_dict_items(
+                items, stream, indent, allowance, context, level, len(object)
+            )
             stream.write("}")
 
         stream.write(")")
@@ -658,6 +706,21 @@ def _recursion(object: Any) -> str:
     return f"<Recursion on {type(object).__name__} with id={id(object)}>"
 
 
+def _elided(count: int, shown: int) -> str:
+    elided = count - shown
+    return f"...({elided} more item{'' if elided == 1 else 's'})"
+
+
+class _CountingStream(_StringIO):
+    """StringIO counting the lines written to it."""
+
+    lines = 0
+
+    def write(self, s: str) -> int:
+        self.lines += s.count("\n")
+        return super().write(s)
+
+
 def _wrap_bytes_repr(object: Any, width: int, allowance: int) -> Iterator[str]:
     current = b""
     last = len(object) // 4 * 4
@@ -1,5 +1,9 @@
+import heapq
 import pprint
 import reprlib
+from typing import Any
+from typing import Iterable
+from typing import List
 from typing import Optional
 
 
@@ -68,6 +72,23 @@ class SafeRepr(reprlib.Repr):
             s = _ellipsize(s, self.maxsize)
         return s
 
+    # reprlib sorts the whole of dicts and sets to show their first items,
+    # these only sort the items it can show.
+
+    def repr_dict(self, x: dict, level: int) -> str:  # type: ignore[type-arg]
+        keys = _smallest(x, self.maxdict + 1)
+        if keys is not None:
+            x = {key: x[key] for key in keys}
+        return super().repr_dict(x, level)
+
+    def repr_set(self, x: set, level: int) -> str:  # type: ignore[type-arg]
+        items = _smallest(x, self.maxset + 1)
+        return super().repr_set(x if items is None else set(items), level)
+
+    def repr_frozenset(self, x: frozenset, level: int) -> str:  # type: ignore[type-arg]
+        items = _smallest(x, self.maxfrozenset + 1)
+        return super().repr_frozenset(x if items is None else frozenset(items), level)
+
     def repr_instance(self, x: object, level: int) -> str:
         try:
             s = repr(x)
@@ -80,6 +101,17 @@ class SafeRepr(reprlib.Repr):
         return s
 
 
+def _smallest(items: Iterable[Any], n: int) -> Optional[List[Any]]:
+    """Return the n smallest of the items if there are more, or None if there
+    are not, or if they cannot be sorted."""
+    try:
+        if len(items) <= n:  # type: ignore[arg-type]
+            return None
+        return heapq.nsmallest(n, items)
+    except Exception:
+        return None
+
+
 def safeformat(obj: object) -> str:
     """Return a pretty printed string for the given object.
 
@@ -0,0 +1,6 @@
+"""The options of the builtin plugins which are loaded lazily.
+
+They live apart from their plugin module, which re-exports them, so the stub
+of the plugin can add them without importing the plugin, see
+:mod:`_pytest.lazyplugins`.
+"""
@@ -0,0 +1,19 @@
+"""Command line options and ini keys of the affected plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--record-deps",
+        action="store_true",
+        help="Record the source files under the rootdir executed by each test "
+        "in the cache, for --affected",
+    )
+    group.addoption(
+        "--affected",
+        action="store_true",
+        help="Only run the tests whose recorded source files changed, the new "
+        "tests and the tests which failed last time",
+    )
@@ -0,0 +1,19 @@
+"""Command line options and ini keys of the daemon plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--daemon",
+        action="store_true",
+        help="Run the tests in a child of a daemon process which keeps the "
+        "plugins and initial conftest.py files loaded, starting the daemon of "
+        "the current directory if needed. Only given on the command line",
+    )
+    group.addoption(
+        "--daemon-stop",
+        action="store_true",
+        help="Stop the daemon of the current directory and exit",
+    )
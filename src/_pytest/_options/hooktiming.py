@@ -0,0 +1,23 @@
+"""Command line options and ini keys of the hooktiming plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("debugconfig")
+    group.addoption(
+        "--hook-durations",
+        action="store",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Time every hook implementation and show the N costliest (N=0 for all)",
+    )
+    group.addoption(
+        "--hook-durations-json",
+        action="store",
+        default=None,
+        metavar="path",
+        help="Time every hook implementation and write the timings as JSON "
+        "to the given path",
+    )
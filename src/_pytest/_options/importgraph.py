@@ -0,0 +1,16 @@
+"""Command line options and ini keys of the importgraph plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--changed-since",
+        action="store",
+        default=None,
+        metavar="REF_OR_FILES",
+        help="Only collect the test files which import, directly or not, a "
+        "changed file. Takes a comma-separated list of changed files, or a git "
+        "ref to compare the working tree with",
+    )
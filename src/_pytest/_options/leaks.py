@@ -0,0 +1,16 @@
+"""Command line options and ini keys of the leaks plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--track-leaks",
+        action="store",
+        default=None,
+        metavar="KINDS",
+        help="Warn about tests which leave resources behind. KINDS is a "
+        "comma-separated list of: fds, threads, children, tmpfiles, or 'all' "
+        "(Linux only)",
+    )
@@ -0,0 +1,15 @@
+"""Command line options and ini keys of the ordering plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("collect", "collection")
+    group.addoption(
+        "--order",
+        action="store",
+        choices=["duration"],
+        default=None,
+        help="Reorder the tests: 'duration' runs the longest tests first, "
+        "from the durations of the test history",
+    )
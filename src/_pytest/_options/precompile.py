@@ -0,0 +1,20 @@
+"""Command line options and ini keys of the precompile plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("debugconfig")
+    group.addoption(
+        "--precompile",
+        action="store_true",
+        help="Rewrite the asserts of the test modules and conftest.py files in "
+        "a process pool and cache them, without running the tests",
+    )
+    parser.addini(
+        "assert_rewrite_precompile",
+        type="bool",
+        default=False,
+        help="Rewrite the asserts of the test modules and conftest.py files in "
+        "a process pool at the start of the session, before collecting them",
+    )
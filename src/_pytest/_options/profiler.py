@@ -0,0 +1,33 @@
+"""Command line options and ini keys of the profiler plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("profiling", "Profiling")
+    group.addoption(
+        "--profile-sample",
+        action="store",
+        type=int,
+        default=None,
+        metavar="HZ",
+        help="Sample the stack HZ times per second of CPU time and attribute "
+        "the samples to the running test (POSIX only)",
+    )
+    group.addoption(
+        "--profile-sample-dir",
+        action="store",
+        default="pytest-profile",
+        metavar="DIR",
+        help="Directory receiving the collapsed stacks of --profile-sample, "
+        "one file per test plus session.collapsed. Default: pytest-profile.",
+    )
+    group.addoption(
+        "--profile-sample-top",
+        action="store",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Show the N tests with the most samples in the terminal summary. "
+        "Default: 10.",
+    )
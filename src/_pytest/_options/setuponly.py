@@ -0,0 +1,19 @@
+"""Command line options and ini keys of the setuponly plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("debugconfig")
+    group.addoption(
+        "--setuponly",
+        "--setup-only",
+        action="store_true",
+        help="Only setup fixtures, do not execute tests",
+    )
+    group.addoption(
+        "--setupshow",
+        "--setup-show",
+        action="store_true",
+        help="Show setup of fixtures while executing tests",
+    )
@@ -0,0 +1,15 @@
+"""Command line options and ini keys of the sharding plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("collect", "collection")
+    group.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        metavar="K/N",
+        help="Only run the K-th of N shards of the collected tests, balanced "
+        "by the durations of the test history",
+    )
@@ -0,0 +1,15 @@
+"""Command line options and ini keys of the startupprofile plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("debugconfig")
+    group.addoption(
+        "--startup-profile",
+        action="store",
+        default=None,
+        metavar="path",
+        help="Show the time taken by each phase of the startup, up to the "
+        "collection, and write the timings as JSON to the given path",
+    )
@@ -0,0 +1,16 @@
+"""Command line options and ini keys of the timebudget plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--time-budget",
+        action="store",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Only run the most valuable tests (new, recently failed or "
+        "changed) expected to fit in SECONDS, and stop once they are used up",
+    )
@@ -0,0 +1,14 @@
+"""Command line options and ini keys of the watch plugin."""
+
+from _pytest.config.argparsing import Parser
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--watch",
+        action="store_true",
+        help="After running the tests, watch the files under the rootdir and "
+        "re-run the tests affected by each change, and the failed ones, until "
+        "interrupted with Ctrl-C",
+    )
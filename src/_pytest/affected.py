@@ -0,0 +1,446 @@
+"""Record the source files executed by each test (--record-deps) and only run
+the tests affected by changes (--affected)."""
+
+import contextlib
+import hashlib
+import os
+from pathlib import Path
+import sys
+import threading
+from types import CodeType
+from types import FrameType
+from typing import Any
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from _pytest import nodes
+from _pytest._options.affected import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import hookimpl
+from _pytest.importgraph import ImportGraph
+from _pytest.importgraph import reachable
+from _pytest.main import Session
+from _pytest.nodes import File
+from _pytest.nodes import Item
+from _pytest.reports import CollectReport
+from _pytest.runner import register_runtest_phase_context
+
+
+DEPS_KEY = "affected/deps"
+
+
+def pytest_configure(config: Config) -> None:
+    if getattr(config, "cache", None) is None:
+        return
+    record = config.getoption("record_deps")
+    affected = config.getoption("affected")
+    if not record and not affected:
+        return
+    deps = DependencyRecord.load(config)
+    if record:
+        recorder = DependencyRecorder(config.rootpath)
+        register_runtest_phase_context(config, recorder.phase)
+        config.pluginmanager.register(
+            RecordDepsPlugin(config, deps, recorder), "recorddepsplugin"
+        )
+    if affected:
+        config.pluginmanager.register(AffectedPlugin(config, deps), "affectedplugin")
+
+
+def file_state(path: Path) -> Optional[Tuple[int, int, str]]:
+    """Return the modification time, size and hash of a file, or None if it
+    cannot be read."""
+    try:
+        st = path.stat()
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, digest
+
+
+class DependencyRecord:
+    """The source files executed by each test, with the state of the files at
+    the time they were recorded.
+
+    Files are stored relative to the rootdir, tests refer to them by index.
+    The tests which were collected but not run while recording are kept as
+    ``unrecorded``.
+    """
+
+    def __init__(
+        self,
+        rootpath: Path,
+        files: Dict[str, Tuple[int, int, str]],
+        tests: Dict[str, List[str]],
+        unrecorded: Set[str],
+    ) -> None:
+        self.rootpath = rootpath
+        self.files = files
+        self.tests = tests
+        self.unrecorded = unrecorded
+
+    @classmethod
+    def load(cls, config: Config) -> "DependencyRecord":
+        assert config.cache is not None
+        data = config.cache.get(DEPS_KEY, {})
+        files: Dict[str, Tuple[int, int, str]] = {}
+        tests: Dict[str, List[str]] = {}
+        unrecorded: Set[str] = set()
+        try:
+            names = [name for name, *_ in data.get("files", [])]
+            for name, mtime_ns, size, digest in data.get("files", []):
+                files[name] = (mtime_ns, size, digest)
+            for nodeid, indexes in data.get("tests", {}).items():
+                tests[nodeid] = [names[i] for i in indexes]
+            unrecorded.update(data.get("unrecorded", []))
+        except (AttributeError, TypeError, ValueError, IndexError):
+            # Unreadable record: start over.
+            files, tests, unrecorded = {}, {}, set()
+        return cls(config.rootpath, files, tests, unrecorded)
+
+    def save(self, config: Config) -> None:
+        assert config.cache is not None
+        names = sorted(self.files)
+        index = {name: i for i, name in enumerate(names)}
+        config.cache.set(
+            DEPS_KEY,
+            {
+                "files": [[name, *self.files[name]] for name in names],
+                "tests": {
+                    nodeid: sorted(index[name] for name in deps)
+                    for nodeid, deps in sorted(self.tests.items())
+                },
+                "unrecorded": sorted(self.unrecorded),
+            },
+        )
+
+    def changed_files(self) -> Set[str]:
+        """Return the recorded files which changed since they were recorded.
+
+        Files whose modification time and size did not change are not read.
+        """
+        changed = set()
+        for name, (mtime_ns, size, digest) in self.files.items():
+            path = self.rootpath / name
+            try:
+                st = path.stat()
+            except OSError:
+                changed.add(name)
+                continue
+            if st.st_mtime_ns == mtime_ns and st.st_size == size:
+                continue
+            state = file_state(path)
+            if state is None or state[2] != digest:
+                changed.add(name)
+        return changed
+
+    def update(self, recorded: Dict[str, Set[str]], collected: List[str]) -> None:
+        """Replace the dependencies of the given tests, with the current state
+        of their files.
+
+        Tests which were not run and depend on a file which changed since it
+        was recorded are forgotten, so that they count as new.
+        """
+        self.unrecorded.update(
+            nodeid
+            for nodeid in collected
+            if nodeid not in recorded and nodeid not in self.tests
+        )
+        self.unrecorded.difference_update(recorded)
+        names = set().union(*recorded.values()) if recorded else set()
+        states = {}
+        for name in names:
+            state = file_state(self.rootpath / name)
+            if state is not None:
+                states[name] = state
+        changed = {
+            name
+            for name, state in states.items()
+            if name in self.files and self.files[name][2] != state[2]
+        }
+        for nodeid, deps in list(self.tests.items()):
+            if nodeid not in recorded and changed.intersection(deps):
+                del self.tests[nodeid]
+                self.unrecorded.add(nodeid)
+        for nodeid, deps in recorded.items():
+            self.tests[nodeid] = sorted(name for name in deps if name in states)
+        self.files.update(states)
+        used = set().union(*self.tests.values()) if self.tests else set()
+        self.files = {name: s for name, s in self.files.items() if name in used}
+
+
+class DependencyRecorder:
+    """Collects the source files whose code runs during the test phases.
+
+    Uses :mod:`sys.monitoring` on Python 3.12+, where each code object is only
+    reported once per test, and :func:`sys.settrace` on older versions.
+    """
+
+    def __init__(self, rootpath: Path) -> None:
+        self.rootpath = rootpath
+        self.root = str(rootpath) + os.sep
+        self._current: Optional[Set[str]] = None
+        self._tool: Optional[int] = None
+        # Absolute file names of the tests being run, by nodeid.
+        self._running: Dict[str, Set[str]] = {}
+        #: Files relative to the rootdir of the tests which ran, by nodeid.
+        self.recorded: Dict[str, Set[str]] = {}
+        #: Files relative to the rootdir executed while collecting each test
+        #: file, by the name of the test file relative to the rootdir.
+        self.collected: Dict[str, Set[str]] = {}
+
+    def _on_py_start(self, code: CodeType, offset: int) -> Any:
+        current = self._current
+        if current is not None:
+            current.add(code.co_filename)
+        # Disabled until the events are restarted for the next test.
+        return sys.monitoring.DISABLE
+
+    def _trace(self, frame: FrameType, event: str, arg: object) -> None:
+        current = self._current
+        if current is not None:
+            current.add(frame.f_code.co_filename)
+        # No local tracing.
+        return None
+
+    def start(self) -> None:
+        if sys.version_info < (3, 12):
+            return
+        monitoring = sys.monitoring
+        for tool in (monitoring.COVERAGE_ID, monitoring.PROFILER_ID):
+            if monitoring.get_tool(tool) is None:
+                break
+        else:
+            return
+        monitoring.use_tool_id(tool, "pytest --record-deps")
+        monitoring.register_callback(
+            tool, monitoring.events.PY_START, self._on_py_start
+        )
+        monitoring.set_events(tool, monitoring.events.PY_START)
+        self._tool = tool
+
+    def stop(self) -> None:
+        if self._tool is None:
+            return
+        monitoring = sys.monitoring
+        monitoring.set_events(self._tool, 0)
+        monitoring.register_callback(self._tool, monitoring.events.PY_START, None)
+        monitoring.free_tool_id(self._tool)
+        self._tool = None
+
+    def _relative(self, filenames: Set[str]) -> Set[str]:
+        relative = set()
+        for filename in filenames:
+            if filename.startswith(self.root) and "site-packages" not in filename:
+                relative.add(Path(filename[len(self.root) :]).as_posix())
+        return relative
+
+    def _other_tracer(self) -> bool:
+        """Return whether another tracer, such as a debugger or coverage, is
+        active, with which the recorded files would be incomplete."""
+        return self._tool is None and sys.gettrace() is not None
+
+    @contextlib.contextmanager
+    def _record(self, files: Set[str]) -> Generator[None, None, None]:
+        self._current = files
+        tracing = self._tool is None
+        if tracing:
+            sys.settrace(self._trace)
+            threading.settrace(self._trace)
+        try:
+            yield
+        finally:
+            if tracing:
+                sys.settrace(None)
+                threading.settrace(None)  # type: ignore[arg-type]
+            self._current = None
+
+    @contextlib.contextmanager
+    def collecting(self, name: str) -> Generator[None, None, None]:
+        """Record the files executed while collecting the test file ``name``,
+        such as the modules it imports first and the code computing its
+        parameters."""
+        if self._tool is not None:
+            sys.monitoring.restart_events()
+        if self._other_tracer():
+            yield
+            return
+        files: Set[str] = set()
+        with self._record(files):
+            yield
+        self.collected.setdefault(name, set()).update(self._relative(files))
+
+    @contextlib.contextmanager
+    def phase(
+        self, item: Item, when: Literal["setup", "call", "teardown"]
+    ) -> Generator[None, None, None]:
+        if when == "setup":
+            if self._tool is not None:
+                sys.monitoring.restart_events()
+            self._running[item.nodeid] = set()
+        files = self._running.get(item.nodeid)
+        if files is not None and self._other_tracer():
+            del self._running[item.nodeid]
+            files = None
+        if files is None:
+            yield
+            return
+        with self._record(files):
+            yield
+        if when == "teardown":
+            # Only tests which ran to the end of their teardown are recorded.
+            del self._running[item.nodeid]
+            self.recorded[item.nodeid] = self._relative(files)
+
+
+class RecordDepsPlugin:
+    """Records the dependencies of the tests which ran and saves them to the
+    cache at the end of the session."""
+
+    def __init__(
+        self, config: Config, deps: DependencyRecord, recorder: DependencyRecorder
+    ) -> None:
+        self.config = config
+        self.deps = deps
+        self.recorder = recorder
+        self.collected: List[str] = []
+
+    @hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, items: List[Item]) -> None:
+        # Before any deselection.
+        self.collected = [item.nodeid for item in items]
+
+    def pytest_sessionstart(self) -> None:
+        self.recorder.start()
+
+    @hookimpl(wrapper=True)
+    def pytest_make_collect_report(
+        self, collector: nodes.Collector
+    ) -> Generator[None, CollectReport, CollectReport]:
+        if not isinstance(collector, File):
+            return (yield)
+        try:
+            name = collector.path.relative_to(self.config.rootpath).as_posix()
+        except ValueError:
+            return (yield)
+        with self.recorder.collecting(name):
+            return (yield)
+
+    def import_dependencies(self, recorded: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+        """Return the files each of the test files of ``recorded`` and their
+        conftest.py files import, directly or not, from the import graph.
+
+        A module imported by several test files only runs while collecting the
+        first one, and may not run at all if it is only read at import.
+        """
+        graph = ImportGraph(self.config)
+        graph.build()
+        dependencies = graph.dependencies()
+        imported: Dict[str, Set[str]] = {}
+        for nodeid in recorded:
+            name = nodeid.split("::")[0]
+            if name in imported:
+                continue
+            parts = name.split("/")
+            conftests = [
+                "/".join([*parts[:i], "conftest.py"]) for i in range(len(parts))
+            ]
+            imported[name] = reachable(
+                dependencies,
+                [name, *(c for c in conftests if c in graph.imports)],
+            )
+        return imported
+
+    @hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: Session) -> None:
+        self.recorder.stop()
+        config = self.config
+        if hasattr(config, "workerinput") or config.getoption("collectonly"):
+            return
+        recorded = self.recorder.recorded
+        # What runs at collection belongs to every test of the file.
+        collected = self.recorder.collected
+        imported = self.import_dependencies(recorded)
+        for nodeid, files in recorded.items():
+            name = nodeid.split("::")[0]
+            files.update(collected.get(name, ()), imported.get(name, ()))
+        self.deps.update(recorded, self.collected)
+        self.deps.save(config)
+
+    def pytest_unconfigure(self) -> None:
+        self.recorder.stop()
+
+
+class AffectedPlugin:
+    """Implements the --affected option."""
+
+    def __init__(self, config: Config, deps: DependencyRecord) -> None:
+        self.config = config
+        self.deps = deps
+        self.changed = deps.changed_files()
+        lf = config.pluginmanager.get_plugin("lfplugin")
+        self.lastfailed: Dict[str, bool] = lf.lastfailed if lf is not None else {}
+        self.unaffected_files = 0
+        # Test files whose known tests are all recorded and unaffected.
+        self._skippable: Set[Path] = set()
+        nf = config.pluginmanager.get_plugin("nfplugin")
+        if nf is not None and deps.tests:
+            files = set()
+            affected_files = set()
+            known = nf.cached_nodeids.union(
+                deps.tests, deps.unrecorded, self.lastfailed
+            )
+            for nodeid in known:
+                name = nodeid.split("::")[0]
+                files.add(name)
+                if self.is_affected(nodeid):
+                    affected_files.add(name)
+            for name in files - affected_files:
+                self._skippable.add(config.rootpath / name)
+
+    def is_affected(self, nodeid: str) -> bool:
+        if nodeid in self.lastfailed:
+            return True
+        deps = self.deps.tests.get(nodeid)
+        if deps is None:
+            return True
+        return not self.changed.isdisjoint(deps)
+
+    @hookimpl
+    def pytest_make_collect_report(
+        self, collector: nodes.Collector
+    ) -> Optional[CollectReport]:
+        # Unaffected test files are not even imported; new tests are only
+        # added by changing their file, which makes it affected.
+        if isinstance(collector, File) and collector.path in self._skippable:
+            self.unaffected_files += 1
+            return CollectReport(collector.nodeid, "passed", longrepr=None, result=[])
+        return None
+
+    @hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[Item], config: Config) -> None:
+        remaining = []
+        deselected = []
+        for item in items:
+            if self.is_affected(item.nodeid):
+                remaining.append(item)
+            else:
+                deselected.append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = remaining
+
+    def pytest_report_collectionfinish(self) -> Optional[str]:
+        if self.config.getoption("verbose") < 0:
+            return None
+        if not self.deps.tests:
+            return "affected: no recorded dependencies, running all tests"
+        return (
+            f"affected: {len(self.changed)} changed files, "
+            f"skipped {self.unaffected_files} unaffected files"
+        )
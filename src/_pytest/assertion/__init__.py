@@ -14,6 +14,7 @@ from _pytest.assertion import util
 from _pytest.assertion.rewrite import assertstate_key
 from _pytest.config import Config
 from _pytest.config import hookimpl
+from _pytest.config import UsageError
 from _pytest.config.argparsing import Parser
 from _pytest.nodes import Item
 
@@ -45,6 +46,39 @@ def pytest_addoption(parser: Parser) -> None:
         help="Enables the pytest_assertion_pass hook. "
         "Make sure to delete any previously generated pyc cache files.",
     )
+    parser.addini(
+        "assertion_pass_sample_rate",
+        default="1.0",
+        help="The fraction of the passing assertions the pytest_assertion_pass "
+        "hook is called for, between 0 and 1 (default: 1.0)",
+    )
+    parser.addini(
+        "assert_rewrite_mode",
+        default="full",
+        help="How the asserts are rewritten: to evaluate their intermediate "
+        "values (full), or to evaluate them as is, and again to explain them "
+        "only if they fail (lazy). "
+        "Make sure to delete any previously generated pyc cache files.",
+    )
+    parser.addini(
+        "assert_rewrite_validation",
+        default="mtime",
+        help="How the cached rewritten modules are validated: against the "
+        "modification time of their source (mtime), or a hash of their source "
+        "and of the rewrite configuration (hash)",
+    )
+    parser.addini(
+        "assert_rewrite_storage",
+        default="files",
+        help="Where the rewritten modules are cached: in a pyc file each (files), "
+        "or in a single archive file (archive)",
+    )
+    parser.addini(
+        "assert_rewrite_cache_dir",
+        default="",
+        help="Directory in which to cache the rewritten modules, hash validated, "
+        "instead of their __pycache__ directories",
+    )
     Config._add_verbosity_ini(
         parser,
         Config.VERBOSITY_ASSERTIONS,
@@ -95,6 +129,16 @@ class AssertionState:
         self.mode = mode
         self.trace = config.trace.root.get("assertion")
         self.hook: Optional[rewrite.AssertionRewritingHook] = None
+        value = config.getini("assertion_pass_sample_rate")
+        try:
+            self.pass_sample_rate = float(value)
+        except ValueError:
+            self.pass_sample_rate = -1.0
+        if not 0.0 <= self.pass_sample_rate <= 1.0:
+            raise UsageError(
+                "assertion_pass_sample_rate must be a number between 0 and 1, "
+                f"got {value!r}"
+            )
 
 
 def install_importhook(config: Config) -> rewrite.AssertionRewritingHook:
@@ -108,6 +152,8 @@ def install_importhook(config: Config) -> rewrite.AssertionRewritingHook:
         hook = config.stash[assertstate_key].hook
         if hook is not None and hook in sys.meta_path:
             sys.meta_path.remove(hook)
+        if hook is not None:
+            hook._save_archive()
 
     config.add_cleanup(undo)
     return hook
@@ -161,7 +207,11 @@ def pytest_runtest_protocol(item: Item) -> Generator[None, object, object]:
                 return res
         return None
 
-    saved_assert_hooks = util._reprcompare, util._assertion_pass
+    saved_assert_hooks = (
+        util._reprcompare,
+        util._assertion_pass,
+        util._assertion_pass_sample_rate,
+    )
     util._reprcompare = callbinrepr
     util._config = item.config
 
@@ -171,11 +221,18 @@ def pytest_runtest_protocol(item: Item) -> Generator[None, object, object]:
             ihook.pytest_assertion_pass(item=item, lineno=lineno, orig=orig, expl=expl)
 
         util._assertion_pass = call_assertion_pass_hook
+        assertstate = item.config.stash.get(assertstate_key, None)
+        if assertstate is not None:
+            util._assertion_pass_sample_rate = assertstate.pass_sample_rate
 
     try:
         return (yield)
     finally:
-        util._reprcompare, util._assertion_pass = saved_assert_hooks
+        (
+            util._reprcompare,
+            util._assertion_pass,
+            util._assertion_pass_sample_rate,
+        ) = saved_assert_hooks
         util._config = None
 
 
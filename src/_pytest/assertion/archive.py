@@ -0,0 +1,159 @@
+"""Storage of the rewritten modules in a single archive file
+(``assert_rewrite_storage = archive``), instead of one pyc per module.
+
+The archive is read through a memory map, and its index is parsed once, so
+loading a module from it costs no file system access of its own. It is never
+modified in place: the modules rewritten during a session are merged into the
+latest version of the archive when the session ends, which is written to a
+temporary file atomically replacing it, like the pycs. Concurrent pytest
+processes therefore always read a complete archive, and at worst drop the
+entries added by one another, which are then rewritten again.
+"""
+
+import importlib.util
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import Callable
+from typing import Dict
+from typing import IO
+from typing import Optional
+from typing import Tuple
+
+
+ARCHIVE_MAGIC = b"pytest-rewrite\x00\x01"
+# Magic, Python bytecode magic number, number of entries.
+HEADER = struct.Struct("<16s4sI")
+# Key, offset and size of the marshalled code, size of the path of the module.
+INDEX_ENTRY = struct.Struct("<16sQII")
+
+
+class RewriteArchive:
+    """The archive of the rewritten modules at ``path``.
+
+    Its entries are the marshalled code of the modules, keyed on what
+    validates it, e.g. a hash of their source.
+    """
+
+    def __init__(
+        self, path: Path, trace: Callable[[str], None] = lambda x: None
+    ) -> None:
+        self.path = path
+        self._trace = trace
+        self._mmap: Optional[mmap.mmap] = None
+        # The path of the module, offset and size of each entry in the map.
+        self._index: Optional[Dict[bytes, Tuple[str, int, int]]] = None
+        # The path of the module and marshalled code of the entries added
+        # since the archive was opened.
+        self._added: Dict[bytes, Tuple[str, bytes]] = {}
+
+    def _open(self) -> Dict[bytes, Tuple[str, int, int]]:
+        if self._index is None:
+            self._index = {}
+            try:
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Missing, or empty.
+                return self._index
+            self._index = _read_index(self._mmap)
+            if not self._index:
+                self._trace(f"invalid or empty rewrite archive: {self.path}")
+        return self._index
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._index = None
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._added or key in self._open()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Return the marshalled code of the entry ``key``, if any."""
+        added = self._added.get(key)
+        if added is not None:
+            return added[1]
+        entry = self._open().get(key)
+        if entry is None:
+            return None
+        assert self._mmap is not None
+        _, offset, size = entry
+        return self._mmap[offset : offset + size]
+
+    def add(self, key: bytes, path: str, data: bytes) -> None:
+        """Add the marshalled code ``data`` of the module at ``path``, to be
+        written by :meth:`save`."""
+        self._added[key] = (path, data)
+
+    def save(self) -> bool:
+        """Write the added entries to the archive, returning whether it was
+        written.
+
+        They are merged into its latest version, which may have been written
+        by another process, replacing the entries of the same modules.
+        """
+        if not self._added:
+            return False
+        latest = RewriteArchive(self.path, self._trace)
+        index = latest._open()
+        added_paths = {path for path, _ in self._added.values()}
+        entries: Dict[bytes, Tuple[str, bytes]] = {}
+        for key, (path, offset, size) in index.items():
+            if path not in added_paths:
+                assert latest._mmap is not None
+                entries[key] = (path, latest._mmap[offset : offset + size])
+        latest.close()
+        entries.update(self._added)
+        # Windows cannot replace a mapped file.
+        self.close()
+
+        proc_path = f"{self.path}.{os.getpid()}"
+        try:
+            with open(proc_path, "wb") as fp:
+                _write(fp, entries)
+            os.replace(proc_path, self.path)
+        except OSError as e:
+            self._trace(f"error writing rewrite archive {self.path}: {e}")
+            try:
+                os.unlink(proc_path)
+            except OSError:
+                pass
+            return False
+        self._added.clear()
+        return True
+
+
+def _read_index(buffer: mmap.mmap) -> Dict[bytes, Tuple[str, int, int]]:
+    """Return the index of an archive, or an empty one if it is invalid."""
+    index: Dict[bytes, Tuple[str, int, int]] = {}
+    try:
+        magic, bytecode_magic, count = HEADER.unpack_from(buffer, 0)
+        if magic != ARCHIVE_MAGIC or bytecode_magic != importlib.util.MAGIC_NUMBER:
+            return {}
+        pos = HEADER.size
+        for _ in range(count):
+            key, offset, size, path_size = INDEX_ENTRY.unpack_from(buffer, pos)
+            pos += INDEX_ENTRY.size
+            path = buffer[pos : pos + path_size].decode("utf-8", "surrogateescape")
+            pos += path_size
+            if offset + size > len(buffer):
+                return {}
+            index[key] = (path, offset, size)
+    except (struct.error, UnicodeDecodeError):
+        return {}
+    return index
+
+
+def _write(fp: IO[bytes], entries: Dict[bytes, Tuple[str, bytes]]) -> None:
+    paths = [path.encode("utf-8", "surrogateescape") for path, _ in entries.values()]
+    offset = HEADER.size + sum(INDEX_ENTRY.size + len(path) for path in paths)
+    fp.write(HEADER.pack(ARCHIVE_MAGIC, importlib.util.MAGIC_NUMBER, len(entries)))
+    for (key, (_, data)), path in zip(entries.items(), paths):
+        fp.write(INDEX_ENTRY.pack(key, offset, len(data), len(path)))
+        fp.write(path)
+        offset += len(data)
+    for _, data in entries.values():
+        fp.write(data)
@@ -2,8 +2,12 @@
 
 import ast
 from collections import defaultdict
+from collections import UserString
+import copy
 import errno
+import fnmatch
 import functools
+import hashlib
 import importlib.abc
 import importlib.machinery
 import importlib.util
@@ -13,10 +17,13 @@ import marshal
 import os
 from pathlib import Path
 from pathlib import PurePath
+import random
+import re
 import struct
 import sys
 import tokenize
 import types
+from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import IO
@@ -24,20 +31,26 @@ from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Pattern
 from typing import Sequence
 from typing import Set
 from typing import Tuple
 from typing import TYPE_CHECKING
 from typing import Union
 
+import _imp
+
 from _pytest._io.saferepr import DEFAULT_REPR_MAX_SIZE
 from _pytest._io.saferepr import saferepr
 from _pytest._version import version
 from _pytest.assertion import util
+from _pytest.assertion.archive import RewriteArchive
 from _pytest.config import Config
+from _pytest.config import UsageError
 from _pytest.main import Session
 from _pytest.pathlib import absolutepath
 from _pytest.pathlib import fnmatch_ex
+from _pytest.pathlib import resolve_from_str
 from _pytest.stash import StashKey
 
 
@@ -59,6 +72,21 @@ assertstate_key = StashKey["AssertionState"]()
 PYTEST_TAG = f"{sys.implementation.cache_tag}-pytest-{version}"
 PYC_EXT = ".py" + (__debug__ and "c" or "o")
 PYC_TAIL = "." + PYTEST_TAG + PYC_EXT
+# https://www.python.org/dev/peps/pep-0552/
+PYC_FLAGS_MTIME = b"\x00\x00\x00\x00"
+PYC_FLAGS_HASH = b"\x03\x00\x00\x00"
+# The ini options the rewritten code depends on.
+REWRITE_INI = ("enable_assertion_pass_hook", "assert_rewrite_mode")
+# The name of the directory of the rewrite archive in the cache directory, and
+# of the archive.
+ARCHIVE_CACHE_NAME = "assertion-rewrite"
+ARCHIVE_NAME = "rewritten." + PYTEST_TAG + ("" if __debug__ else ".opt") + ".pack"
+# Explains a failed assertion which is true when evaluated again to explain
+# it, in the lazy rewrite mode.
+LAZY_PASSED_ON_RETRY = (
+    "(the assertion passed when evaluated again to explain its failure, "
+    "see assert_rewrite_mode)"
+)
 
 # Special marker that denotes we have just left a scope definition
 _SCOPE_END_MARKER = Sentinel()
@@ -82,10 +110,64 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
         self._basenames_to_check_rewrite = {"conftest"}
         self._marked_for_rewrite_cache: Dict[str, bool] = {}
         self._session_paths_checked = False
+        # The names of the modules which _early_rewrite_bailout() found not to
+        # be rewritten, until the basenames to check or the marked names change.
+        self._bailed_out: Set[str] = set()
+        # The fnpats indexed by _index_fnpats().
+        self._indexed_fnpats: Optional[List[str]] = None
+        self._fnpats_re: Optional[Pattern[str]] = None
+        self._path_fnpats = False
+        validation = config.getini("assert_rewrite_validation")
+        if validation not in ("mtime", "hash"):
+            raise UsageError(
+                f"assert_rewrite_validation must be mtime or hash, got {validation!r}"
+            )
+        mode = config.getini("assert_rewrite_mode")
+        if mode not in ("full", "lazy"):
+            raise UsageError(f"assert_rewrite_mode must be full or lazy, got {mode!r}")
+        cache_dir = config.getini("assert_rewrite_cache_dir")
+        # The central cache directory, whose pycs are named after the hash of
+        # their source, so they are found from any checkout.
+        self._pyc_dir: Optional[Path] = (
+            resolve_from_str(cache_dir, config.rootpath) if cache_dir else None
+        )
+        # What the pycs are validated against besides the source, if they are
+        # validated by hash.
+        self._rewrite_key: Optional[bytes] = None
+        if validation == "hash" or self._pyc_dir is not None:
+            self._rewrite_key = _rewrite_key(config)
+        # What the archived code depends on besides its source, whatever the
+        # validation, as the archive is not reset when the options change.
+        self._config_key = _rewrite_key(config)
+        storage = config.getini("assert_rewrite_storage")
+        if storage not in ("files", "archive"):
+            raise UsageError(
+                f"assert_rewrite_storage must be files or archive, got {storage!r}"
+            )
+        self._archive: Optional[RewriteArchive] = None
+        if storage == "archive":
+            if self._pyc_dir is not None:
+                archive_dir = self._pyc_dir
+            elif config.pluginmanager.is_blocked("cacheprovider"):
+                raise UsageError(
+                    "assert_rewrite_storage = archive needs the cacheprovider "
+                    "plugin, or assert_rewrite_cache_dir"
+                )
+            else:
+                archive_dir = (
+                    resolve_from_str(config.getini("cache_dir"), config.rootpath)
+                    / "d"
+                    / ARCHIVE_CACHE_NAME
+                )
+            self._archive = RewriteArchive(
+                archive_dir / ARCHIVE_NAME,
+                config.trace.root.get("assertion"),
+            )
 
     def set_session(self, session: Optional[Session]) -> None:
         self.session = session
         self._session_paths_checked = False
+        self._bailed_out.clear()
 
     # Indirection so we can mock calls to find_spec originated from the hook during testing
     _find_spec = importlib.machinery.PathFinder.find_spec
@@ -98,6 +180,9 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
     ) -> Optional[importlib.machinery.ModuleSpec]:
         if self._writing_pyc:
             return None
+        if name in self._bailed_out and self.fnpats is self._indexed_fnpats:
+            # Found not to be rewritten before.
+            return None
         state = self.config.stash[assertstate_key]
         if self._early_rewrite_bailout(name, state):
             return None
@@ -152,31 +237,87 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
         # cached pyc is always a complete, valid pyc. Operations on it must be
         # atomic. POSIX's atomic rename comes in handy.
         write = not sys.dont_write_bytecode
-        cache_dir = get_cache_dir(fn)
+        if self._archive is not None:
+            exec(self._archived_code(fn, write, state), module.__dict__)
+            return
+        pyc, source, source_hash = _locate_pyc(fn, self._pyc_dir, self._rewrite_key)
+        cache_dir = pyc.parent
         if write:
             ok = try_makedirs(cache_dir)
             if not ok:
                 write = False
                 state.trace(f"read only directory: {cache_dir}")
 
-        cache_name = fn.name[:-3] + PYC_TAIL
-        pyc = cache_dir / cache_name
         # Notice that even if we're in a read-only directory, I'm going
         # to check for a cached pyc. This may not be optimal...
-        co = _read_pyc(fn, pyc, state.trace)
+        co = _read_pyc(fn, pyc, state.trace, source_hash)
         if co is None:
             state.trace(f"rewriting {fn!r}")
-            source_stat, co = _rewrite_test(fn, self.config)
+            source_stat, co = _rewrite_test(fn, self.config, source)
             if write:
                 self._writing_pyc = True
                 try:
-                    _write_pyc(state, co, source_stat, pyc)
+                    _write_pyc(state, co, source_stat, pyc, source_hash)
                 finally:
                     self._writing_pyc = False
         else:
             state.trace(f"found cached rewritten pyc for {fn}")
+            if source_hash is not None:
+                # The pyc may have been written for the same source elsewhere.
+                _imp._fix_co_filename(co, str(fn))
         exec(co, module.__dict__)
 
+    def _archived_code(
+        self, fn: Path, write: bool, state: "AssertionState"
+    ) -> types.CodeType:
+        """Return the rewritten code of *fn* from the archive, rewriting and
+        adding it if it is missing."""
+        assert self._archive is not None
+        key, source = _archive_key(fn, self._rewrite_key, self._config_key)
+        data = self._archive.get(key)
+        if data is not None:
+            try:
+                co = marshal.loads(data)
+            except Exception as e:
+                state.trace(f"archived code of {fn}: marshal.loads error {e}")
+            else:
+                if isinstance(co, types.CodeType):
+                    state.trace(f"found archived rewritten code for {fn}")
+                    _imp._fix_co_filename(co, str(fn))
+                    return co
+        state.trace(f"rewriting {fn!r}")
+        _, co = _rewrite_test(fn, self.config, source)
+        if write:
+            self._archive.add(key, str(fn), marshal.dumps(co))
+        return co
+
+    def _save_archive(self) -> None:
+        """Write the modules rewritten in this session to the archive."""
+        if self._archive is None or not self._archive._added:
+            return
+        cache = getattr(self.config, "cache", None)
+        if self._pyc_dir is None and cache is not None:
+            try:
+                # Creates the cache directory with its supporting files.
+                cache.mkdir(ARCHIVE_CACHE_NAME)
+            except OSError:
+                pass
+        if try_makedirs(self._archive.path.parent):
+            self._archive.save()
+
+    def _index_fnpats(self) -> None:
+        """Compile the fnpats matching file names only into one regex; if any
+        matches whole paths, which are only known after _find_spec(), there is
+        nothing to compile."""
+        self._indexed_fnpats = self.fnpats
+        self._bailed_out.clear()
+        self._path_fnpats = any(os.path.dirname(pat) for pat in self.fnpats)
+        self._fnpats_re = None
+        if self.fnpats and not self._path_fnpats:
+            self._fnpats_re = re.compile(
+                "|".join(fnmatch.translate(os.path.normcase(p)) for p in self.fnpats)
+            )
+
     def _early_rewrite_bailout(self, name: str, state: "AssertionState") -> bool:
         """A fast way to get out of rewriting modules.
 
@@ -185,8 +326,11 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
         tries to filter what we're sure won't be rewritten before getting to
         it.
         """
+        if self.fnpats is not self._indexed_fnpats:
+            self._index_fnpats()
         if self.session is not None and not self._session_paths_checked:
             self._session_paths_checked = True
+            self._bailed_out.clear()
             for initial_path in self.session._initialpaths:
                 # Make something as c:/projects/my_project/path.py ->
                 #     ['c:', 'projects', 'my_project', 'path.py']
@@ -195,25 +339,25 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
                 self._basenames_to_check_rewrite.add(os.path.splitext(parts[-1])[0])
 
         # Note: conftest already by default in _basenames_to_check_rewrite.
-        parts = name.split(".")
-        if parts[-1] in self._basenames_to_check_rewrite:
+        basename = name.rpartition(".")[2]
+        if basename in self._basenames_to_check_rewrite:
             return False
 
+        # if a pattern contains subdirectories ("tests/**.py" for example) we can't bail out based
+        # on the name alone because we need to match against the full path
+        if self._path_fnpats:
+            return False
         # For matching the name it must be as if it was a filename.
-        path = PurePath(*parts).with_suffix(".py")
-
-        for pat in self.fnpats:
-            # if the pattern contains subdirectories ("tests/**.py" for example) we can't bail out based
-            # on the name alone because we need to match against the full path
-            if os.path.dirname(pat):
-                return False
-            if fnmatch_ex(pat, path):
-                return False
+        if self._fnpats_re is not None and self._fnpats_re.match(
+            os.path.normcase(basename + ".py")
+        ):
+            return False
 
         if self._is_marked_for_rewrite(name, state):
             return False
 
         state.trace(f"early skip of rewriting module: {name}")
+        self._bailed_out.add(name)
         return True
 
     def _should_rewrite(self, name: str, fn: str, state: "AssertionState") -> bool:
@@ -256,6 +400,7 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
         The named module or package as well as any nested modules will
         be rewritten on import.
         """
+        self._bailed_out.clear()
         already_imported = (
             set(names).intersection(sys.modules).difference(self._rewritten_names)
         )
@@ -298,21 +443,84 @@ class AssertionRewritingHook(importlib.abc.MetaPathFinder, importlib.abc.Loader)
             return FileReader(types.SimpleNamespace(path=self._rewritten_names[name]))
 
 
+def _rewrite_key(config: Config) -> bytes:
+    """Return what, besides the source of a module, its rewritten code
+    depends on, for the hash validation of its pyc."""
+    key = (
+        PYTEST_TAG,
+        PYC_EXT,
+        sys.flags.optimize,
+        *(config.getini(name) for name in REWRITE_INI),
+    )
+    return repr(key).encode()
+
+
+def _source_digest(rewrite_key: bytes, source: bytes) -> bytes:
+    """Return the hash validating the rewritten code of the given source."""
+    return hashlib.sha256(rewrite_key + b"\0" + source).digest()
+
+
+def _archive_key(
+    fn: Path, rewrite_key: Optional[bytes], config_key: bytes
+) -> Tuple[bytes, Optional[bytes]]:
+    """Return the key of the rewritten code of *fn* in the archive.
+
+    It is the hash of its source if the code is validated by hash, i.e.
+    *rewrite_key* is given, in which case the source is also returned, or
+    else a hash of its path, modification time and size, and of
+    *config_key*, the :func:`_rewrite_key` of the config.
+    """
+    if rewrite_key is None:
+        st = os.stat(fn)
+        key = f"{fn}\0{st.st_mtime_ns}\0{st.st_size}\0".encode(
+            "utf-8", "surrogateescape"
+        )
+        return hashlib.sha256(key + config_key).digest()[:16], None
+    source = fn.read_bytes()
+    return _source_digest(rewrite_key, source)[:16], source
+
+
+def _locate_pyc(
+    fn: Path, pyc_dir: Optional[Path], rewrite_key: Optional[bytes]
+) -> Tuple[Path, Optional[bytes], Optional[bytes]]:
+    """Return the path of the pyc caching the rewritten code of *fn*.
+
+    If the pyc is validated by hash, i.e. *rewrite_key* is given, also return
+    the source of *fn* and the hash of the pyc; pycs in the central *pyc_dir*
+    are named after it.
+    """
+    if rewrite_key is None:
+        return get_cache_dir(fn) / (fn.name[:-3] + PYC_TAIL), None, None
+    source = fn.read_bytes()
+    digest = _source_digest(rewrite_key, source)
+    if pyc_dir is None:
+        pyc = get_cache_dir(fn) / (fn.name[:-3] + PYC_TAIL)
+    else:
+        pyc = pyc_dir / (digest.hex()[:32] + PYC_TAIL)
+    return pyc, source, digest[:8]
+
+
 def _write_pyc_fp(
-    fp: IO[bytes], source_stat: os.stat_result, co: types.CodeType
+    fp: IO[bytes],
+    source_stat: os.stat_result,
+    co: types.CodeType,
+    source_hash: Optional[bytes] = None,
 ) -> None:
     # Technically, we don't have to have the same pyc format as
     # (C)Python, since these "pycs" should never be seen by builtin
     # import. However, there's little reason to deviate.
     fp.write(importlib.util.MAGIC_NUMBER)
-    # https://www.python.org/dev/peps/pep-0552/
-    flags = b"\x00\x00\x00\x00"
-    fp.write(flags)
-    # as of now, bytecode header expects 32-bit numbers for size and mtime (#4903)
-    mtime = int(source_stat.st_mtime) & 0xFFFFFFFF
-    size = source_stat.st_size & 0xFFFFFFFF
-    # "<LL" stands for 2 unsigned longs, little-endian.
-    fp.write(struct.pack("<LL", mtime, size))
+    if source_hash is not None:
+        # A checked hash-based pyc, with our own hash of the source.
+        fp.write(PYC_FLAGS_HASH)
+        fp.write(source_hash)
+    else:
+        fp.write(PYC_FLAGS_MTIME)
+        # as of now, bytecode header expects 32-bit numbers for size and mtime (#4903)
+        mtime = int(source_stat.st_mtime) & 0xFFFFFFFF
+        size = source_stat.st_size & 0xFFFFFFFF
+        # "<LL" stands for 2 unsigned longs, little-endian.
+        fp.write(struct.pack("<LL", mtime, size))
     fp.write(marshal.dumps(co))
 
 
@@ -321,11 +529,12 @@ def _write_pyc(
     co: types.CodeType,
     source_stat: os.stat_result,
     pyc: Path,
+    source_hash: Optional[bytes] = None,
 ) -> bool:
     proc_pyc = f"{pyc}.{os.getpid()}"
     try:
         with open(proc_pyc, "wb") as fp:
-            _write_pyc_fp(fp, source_stat, co)
+            _write_pyc_fp(fp, source_stat, co, source_hash)
     except OSError as e:
         state.trace(f"error writing pyc file at {proc_pyc}: errno={e.errno}")
         return False
@@ -341,10 +550,14 @@ def _write_pyc(
     return True
 
 
-def _rewrite_test(fn: Path, config: Config) -> Tuple[os.stat_result, types.CodeType]:
-    """Read and rewrite *fn* and return the code object."""
+def _rewrite_test(
+    fn: Path, config: Config, source: Optional[bytes] = None
+) -> Tuple[os.stat_result, types.CodeType]:
+    """Read and rewrite *fn*, unless its *source* is given, and return the
+    code object."""
     stat = os.stat(fn)
-    source = fn.read_bytes()
+    if source is None:
+        source = fn.read_bytes()
     strfn = str(fn)
     tree = ast.parse(source, filename=strfn)
     rewrite_asserts(tree, source, strfn, config)
@@ -353,10 +566,16 @@ def _rewrite_test(fn: Path, config: Config) -> Tuple[os.stat_result, types.CodeT
 
 
 def _read_pyc(
-    source: Path, pyc: Path, trace: Callable[[str], None] = lambda x: None
+    source: Path,
+    pyc: Path,
+    trace: Callable[[str], None] = lambda x: None,
+    source_hash: Optional[bytes] = None,
 ) -> Optional[types.CodeType]:
     """Possibly read a pytest pyc containing rewritten code.
 
+    The pyc is validated against the *source_hash* if given, or else against
+    the modification time and size of the source.
+
     Return rewritten code if successful or None if not.
     """
     try:
@@ -365,9 +584,10 @@ def _read_pyc(
         return None
     with fp:
         try:
-            stat_result = os.stat(source)
-            mtime = int(stat_result.st_mtime)
-            size = stat_result.st_size
+            if source_hash is None:
+                stat_result = os.stat(source)
+                mtime = int(stat_result.st_mtime)
+                size = stat_result.st_size
             data = fp.read(16)
         except OSError as e:
             trace(f"_read_pyc({source}): OSError {e}")
@@ -379,17 +599,23 @@ def _read_pyc(
         if data[:4] != importlib.util.MAGIC_NUMBER:
             trace("_read_pyc(%s): invalid pyc (bad magic number)" % source)
             return None
-        if data[4:8] != b"\x00\x00\x00\x00":
+        expected_flags = PYC_FLAGS_MTIME if source_hash is None else PYC_FLAGS_HASH
+        if data[4:8] != expected_flags:
             trace("_read_pyc(%s): invalid pyc (unsupported flags)" % source)
             return None
-        mtime_data = data[8:12]
-        if int.from_bytes(mtime_data, "little") != mtime & 0xFFFFFFFF:
-            trace("_read_pyc(%s): out of date" % source)
-            return None
-        size_data = data[12:16]
-        if int.from_bytes(size_data, "little") != size & 0xFFFFFFFF:
-            trace("_read_pyc(%s): invalid pyc (incorrect size)" % source)
-            return None
+        if source_hash is not None:
+            if data[8:16] != source_hash:
+                trace("_read_pyc(%s): out of date" % source)
+                return None
+        else:
+            mtime_data = data[8:12]
+            if int.from_bytes(mtime_data, "little") != mtime & 0xFFFFFFFF:
+                trace("_read_pyc(%s): out of date" % source)
+                return None
+            size_data = data[12:16]
+            if int.from_bytes(size_data, "little") != size & 0xFFFFFFFF:
+                trace("_read_pyc(%s): invalid pyc (incorrect size)" % source)
+                return None
         try:
             co = marshal.load(fp)
         except Exception as e:
@@ -495,15 +721,103 @@ def _call_reprcompare(
     return expl
 
 
+def _format_template(template: str, values: Dict[str, object]) -> str:
+    return template % values
+
+
+class _LazyExplanation(UserString):
+    """The explanation of a passing assertion given to the pytest_assertion_pass
+    hook, or a part of it, formatted by calling *func* with *args* only when
+    first used as a string.
+
+    The lazy explanations among *args*, also in lists, are formatted first.
+    """
+
+    def __init__(self, func: Callable[..., str], *args: Any) -> None:
+        self._func: Optional[Callable[..., str]] = func
+        self._args = args
+        self._data = ""
+
+    @property  # type: ignore[override]
+    def data(self) -> str:
+        if self._func is not None:
+            args = [_format_lazy(arg) for arg in self._args]
+            self._data = self._func(*args)
+            self._func = None
+            self._args = ()
+        return self._data
+
+
+def _format_lazy(arg: object) -> object:
+    if isinstance(arg, _LazyExplanation):
+        return arg.data
+    if isinstance(arg, list):
+        return [_format_lazy(item) for item in arg]
+    return arg
+
+
+# Explanation helpers whose calls _DeferExplanation defers.
+DEFERRED_HELPERS = frozenset(
+    ("_saferepr", "_format_boolop", "_call_reprcompare", "_format_explanation")
+)
+
+
+class _DeferExplanation(ast.NodeTransformer):
+    """Transform the statements explaining a passing assertion to build
+    _LazyExplanation objects, formatting nothing until the
+    pytest_assertion_pass hook uses the explanation."""
+
+    def visit_Assign(self, node: ast.Assign) -> ast.Assign:
+        self.generic_visit(node)
+        target = node.targets[0]
+        # The assignments of AssertionRewriter.pop_format_context().
+        if (
+            isinstance(target, ast.Name)
+            and target.id.startswith("@py_format")
+            and isinstance(node.value, ast.BinOp)
+        ):
+            node.value = self.defer(
+                "_format_template", node.value.left, node.value.right
+            )
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.expr:
+        self.generic_visit(node)
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.value.id == "@pytest_ar"
+            and func.attr in DEFERRED_HELPERS
+        ):
+            return self.defer(func.attr, *node.args)
+        return node
+
+    @staticmethod
+    def defer(name: str, *args: ast.expr) -> ast.expr:
+        py_name = ast.Name("@pytest_ar", ast.Load())
+        helper = ast.Attribute(py_name, name, ast.Load())
+        lazy = ast.Attribute(py_name, "_LazyExplanation", ast.Load())
+        return ast.Call(lazy, [helper, *args], [])
+
+
 def _call_assertion_pass(lineno: int, orig: str, expl: str) -> None:
     if util._assertion_pass is not None:
         util._assertion_pass(lineno, orig, expl)
 
 
+# Not the global random number generator, to leave its state to the tests.
+_pass_sampler = random.Random()
+
+
 def _check_if_assertion_pass_impl() -> bool:
     """Check if any plugins implement the pytest_assertion_pass hook
-    in order not to generate explanation unnecessarily (might be expensive)."""
-    return True if util._assertion_pass else False
+    in order not to generate explanation unnecessarily (might be expensive),
+    and whether this assertion is sampled for it."""
+    if util._assertion_pass is None:
+        return False
+    rate = util._assertion_pass_sample_rate
+    return rate >= 1.0 or _pass_sampler.random() < rate
 
 
 UNARY_MAP = {ast.Not: "not %s", ast.Invert: "~%s", ast.USub: "-%s", ast.UAdd: "+%s"}
@@ -666,8 +980,10 @@ class AssertionRewriter(ast.NodeVisitor):
             self.enable_assertion_pass_hook = config.getini(
                 "enable_assertion_pass_hook"
             )
+            self.lazy = config.getini("assert_rewrite_mode") == "lazy"
         else:
             self.enable_assertion_pass_hook = False
+            self.lazy = False
         self.source = source
         self.scope: tuple[ast.AST, ...] = ()
         self.variables_overwrite: defaultdict[tuple[ast.AST, ...], Dict[str, str]] = (
@@ -839,8 +1155,7 @@ class AssertionRewriter(ast.NodeVisitor):
         format_dict = ast.Dict(keys, list(current.values()))
         form = ast.BinOp(expl_expr, ast.Mod(), format_dict)
         name = "@py_format" + str(next(self.variable_counter))
-        if self.enable_assertion_pass_hook:
-            self.format_variables.append(name)
+        self.format_variables.append(name)
         self.expl_stmts.append(ast.Assign([ast.Name(name, ast.Store())], form))
         return ast.Name(name, ast.Load())
 
@@ -874,22 +1189,72 @@ class AssertionRewriter(ast.NodeVisitor):
                 lineno=assert_.lineno,
             )
 
+        if self.lazy:
+            statements = self.lazy_assert(assert_)
+        else:
+            statements = self.instrument_assert(
+                assert_, assert_.test, self.enable_assertion_pass_hook
+            )
+        # Fix locations (line numbers/column offsets).
+        for stmt in statements:
+            for node in traverse_node(stmt):
+                ast.copy_location(node, assert_)
+        return statements
+
+    def lazy_assert(self, assert_: ast.Assert) -> List[ast.stmt]:
+        """Return the statements of an assertion in the lazy rewrite mode.
+
+        The test is first evaluated as is, and only evaluated again by the
+        statements of .instrument_assert() to explain it if it is false.
+        The pytest_assertion_pass hook, which needs the explanation of every
+        assertion, gets it from the instrumented statements alone.
+        """
+        # Copied before the visitors modify it.
+        test = copy.deepcopy(assert_.test)
+        explain = self.instrument_assert(assert_, copy.deepcopy(assert_.test), False)
+        # In case the test is true when evaluated again, e.g. as it has side
+        # effects, the assertion still fails.
+        if assert_.msg:
+            assertmsg = self.helper("_format_assertmsg", assert_.msg)
+            gluestr = "\n>assert "
+        else:
+            assertmsg = ast.Constant("")
+            gluestr = "assert "
+        orig = _get_assertion_exprs(self.source)[assert_.lineno]
+        template = ast.BinOp(
+            assertmsg,
+            ast.Add(),
+            ast.Constant(gluestr + orig + "\n~" + LAZY_PASSED_ON_RETRY),
+        )
+        fmt = self.helper("_format_explanation", template)
+        err_name = ast.Name("AssertionError", ast.Load())
+        explain.append(ast.Raise(ast.Call(err_name, [fmt], []), None))
+        lazy: List[ast.stmt] = [ast.If(ast.UnaryOp(ast.Not(), test), explain, [])]
+        if not self.enable_assertion_pass_hook:
+            return lazy
+        full = self.instrument_assert(assert_, assert_.test, True)
+        return [ast.If(self.helper("_check_if_assertion_pass_impl"), full, lazy)]
+
+    def instrument_assert(
+        self, assert_: ast.Assert, test: ast.expr, pass_hook: bool
+    ) -> List[ast.stmt]:
+        """Return the statements evaluating *test* with its intermediate
+        values, which raise an assertion error explaining it if it is false,
+        or call the pytest_assertion_pass hook with its explanation if
+        *pass_hook*."""
         self.statements: List[ast.stmt] = []
         self.variables: List[str] = []
         self.variable_counter = itertools.count()
-
-        if self.enable_assertion_pass_hook:
-            self.format_variables: List[str] = []
-
+        self.format_variables: List[str] = []
         self.stack: List[Dict[str, ast.expr]] = []
         self.expl_stmts: List[ast.stmt] = []
         self.push_format_context()
         # Rewrite assert into a bunch of statements.
-        top_condition, explanation = self.visit(assert_.test)
+        top_condition, explanation = self.visit(test)
 
         negation = ast.UnaryOp(ast.Not(), top_condition)
 
-        if self.enable_assertion_pass_hook:  # Experimental pytest_assertion_pass hook
+        if pass_hook:  # Experimental pytest_assertion_pass hook
             msg = self.pop_format_context(ast.Constant(explanation))
 
             # Failed
@@ -909,8 +1274,10 @@ class AssertionRewriter(ast.NodeVisitor):
             statements_fail.extend(self.expl_stmts)
             statements_fail.append(raise_)
 
-            # Passed
-            fmt_pass = self.helper("_format_explanation", msg)
+            # Passed, with an explanation formatted only if the hook uses it.
+            defer = _DeferExplanation()
+            expl_stmts_pass = [defer.visit(copy.deepcopy(s)) for s in self.expl_stmts]
+            fmt_pass = defer.visit(self.helper("_format_explanation", msg))
             orig = _get_assertion_exprs(self.source)[assert_.lineno]
             hook_call_pass = ast.Expr(
                 self.helper(
@@ -923,7 +1290,7 @@ class AssertionRewriter(ast.NodeVisitor):
             # If any hooks implement assert_pass hook
             hook_impl_test = ast.If(
                 self.helper("_check_if_assertion_pass_impl"),
-                [*self.expl_stmts, hook_call_pass],
+                [*expl_stmts_pass, hook_call_pass],
                 [],
             )
             statements_pass = [hook_impl_test]
@@ -962,10 +1329,6 @@ class AssertionRewriter(ast.NodeVisitor):
             variables = [ast.Name(name, ast.Store()) for name in self.variables]
             clear = ast.Assign(variables, ast.Constant(None))
             self.statements.append(clear)
-        # Fix locations (line numbers/column offsets).
-        for stmt in self.statements:
-            for node in traverse_node(stmt):
-                ast.copy_location(node, assert_)
         return self.statements
 
     def visit_NamedExpr(self, name: ast.NamedExpr) -> Tuple[ast.NamedExpr, str]:
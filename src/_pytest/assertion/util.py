@@ -2,6 +2,7 @@
 """Utilities for assertion debugging."""
 
 import collections.abc
+import heapq
 import os
 import pprint
 from typing import AbstractSet
@@ -14,10 +15,13 @@ from typing import Mapping
 from typing import Optional
 from typing import Protocol
 from typing import Sequence
+from typing import Tuple
 from unicodedata import normalize
 
 from _pytest import outcomes
 import _pytest._code
+from _pytest._io.pprint import _elided
+from _pytest._io.pprint import _safe_key
 from _pytest._io.pprint import PrettyPrinter
 from _pytest._io.saferepr import saferepr
 from _pytest._io.saferepr import saferepr_unlimited
@@ -34,6 +38,9 @@ _reprcompare: Optional[Callable[[str, object, object], Optional[str]]] = None
 # when pytest_runtest_setup is called.
 _assertion_pass: Optional[Callable[[int, str, str], None]] = None
 
+# The fraction of the passing assertions _assertion_pass is called for.
+_assertion_pass_sample_rate = 1.0
+
 # Config object which is assigned during pytest_runtest_protocol.
 _config: Optional[Config] = None
 
@@ -333,8 +340,10 @@ def _compare_eq_iterable(
     # dynamic import to speedup pytest
     import difflib
 
-    left_formatting = PrettyPrinter().pformat(left).splitlines()
-    right_formatting = PrettyPrinter().pformat(right).splitlines()
+    max_lines, max_chars = _explanation_budget(verbose)
+    printer = PrettyPrinter(max_lines=max_lines, max_chars=max_chars)
+    left_formatting = printer.pformat(left).splitlines()
+    right_formatting = printer.pformat(right).splitlines()
 
     explanation = ["", "Full diff:"]
     # "right" is the expected base against which we compare "left",
@@ -419,8 +428,8 @@ def _compare_eq_set(
     verbose: int = 0,
 ) -> List[str]:
     explanation = []
-    explanation.extend(_set_one_sided_diff("left", left, right, highlighter))
-    explanation.extend(_set_one_sided_diff("right", right, left, highlighter))
+    explanation.extend(_set_one_sided_diff("left", left, right, highlighter, verbose))
+    explanation.extend(_set_one_sided_diff("right", right, left, highlighter, verbose))
     return explanation
 
 
@@ -430,7 +439,7 @@ def _compare_gt_set(
     highlighter: _HighlightFunc,
     verbose: int = 0,
 ) -> List[str]:
-    explanation = _compare_gte_set(left, right, highlighter)
+    explanation = _compare_gte_set(left, right, highlighter, verbose)
     if not explanation:
         return ["Both sets are equal"]
     return explanation
@@ -442,7 +451,7 @@ def _compare_lt_set(
     highlighter: _HighlightFunc,
     verbose: int = 0,
 ) -> List[str]:
-    explanation = _compare_lte_set(left, right, highlighter)
+    explanation = _compare_lte_set(left, right, highlighter, verbose)
     if not explanation:
         return ["Both sets are equal"]
     return explanation
@@ -454,7 +463,7 @@ def _compare_gte_set(
     highlighter: _HighlightFunc,
     verbose: int = 0,
 ) -> List[str]:
-    return _set_one_sided_diff("right", right, left, highlighter)
+    return _set_one_sided_diff("right", right, left, highlighter, verbose)
 
 
 def _compare_lte_set(
@@ -463,7 +472,7 @@ def _compare_lte_set(
     highlighter: _HighlightFunc,
     verbose: int = 0,
 ) -> List[str]:
-    return _set_one_sided_diff("left", left, right, highlighter)
+    return _set_one_sided_diff("left", left, right, highlighter, verbose)
 
 
 def _set_one_sided_diff(
@@ -471,12 +480,17 @@ def _set_one_sided_diff(
     set1: AbstractSet[Any],
     set2: AbstractSet[Any],
     highlighter: _HighlightFunc,
+    verbose: int = 0,
 ) -> List[str]:
     explanation = []
     diff = set1 - set2
     if diff:
         explanation.append(f"Extra items in the {posn} set:")
-        for item in diff:
+        max_lines = _explanation_budget(verbose)[0]
+        for i, item in enumerate(diff):
+            if i == max_lines:
+                explanation.append(_elided(len(diff), i))
+                break
             explanation.append(highlighter(saferepr(item)))
     return explanation
 
@@ -498,9 +512,13 @@ def _compare_eq_dict(
         explanation += ["Common items:"]
         explanation += highlighter(pprint.pformat(same)).splitlines()
     diff = {k for k in common if left[k] != right[k]}
+    max_lines = _explanation_budget(verbose)[0]
     if diff:
         explanation += ["Differing items:"]
-        for k in diff:
+        for i, k in enumerate(diff):
+            if i == max_lines:
+                explanation.append(_elided(len(diff), i))
+                break
             explanation += [
                 highlighter(saferepr({k: left[k]}))
                 + " != "
@@ -514,7 +532,7 @@ def _compare_eq_dict(
             % (len_extra_left, "" if len_extra_left == 1 else "s")
         )
         explanation.extend(
-            highlighter(pprint.pformat({k: left[k] for k in extra_left})).splitlines()
+            _pformat_items(left, extra_left, highlighter, max_lines).splitlines()
         )
     extra_right = set_right - set_left
     len_extra_right = len(extra_right)
@@ -524,11 +542,25 @@ def _compare_eq_dict(
             % (len_extra_right, "" if len_extra_right == 1 else "s")
         )
         explanation.extend(
-            highlighter(pprint.pformat({k: right[k] for k in extra_right})).splitlines()
+            _pformat_items(right, extra_right, highlighter, max_lines).splitlines()
         )
     return explanation
 
 
+def _pformat_items(
+    mapping: Mapping[Any, Any],
+    keys: AbstractSet[Any],
+    highlighter: _HighlightFunc,
+    max_lines: Optional[int],
+) -> str:
+    """Pretty print the items of the keys, the first max_lines of them if given."""
+    if max_lines is None or len(keys) <= max_lines:
+        return highlighter(pprint.pformat({k: mapping[k] for k in keys}))
+    first = heapq.nsmallest(max_lines, keys, key=_safe_key)
+    formatted = pprint.pformat({k: mapping[k] for k in first})
+    return highlighter(formatted) + "\n" + _elided(len(keys), max_lines)
+
+
 def _compare_eq_cls(
     left: Any, right: Any, highlighter: _HighlightFunc, verbose: int
 ) -> List[str]:
@@ -603,6 +635,23 @@ def _notin_text(term: str, text: str, verbose: int = 0) -> List[str]:
     return newdiff
 
 
+def _explanation_budget(verbose: int) -> Tuple[Optional[int], Optional[int]]:
+    """Return the number of lines and characters past which the parts of the
+    explanations listing the items of the compared objects are elided, or None
+    if the explanations are not truncated.
+
+    It is a multiple of what the truncated explanations show, so that this
+    only bounds the work spent on large objects, whose explanations are cut
+    anyway.
+    """
+    if verbose >= 2 or running_on_ci():
+        return None, None
+    from _pytest.assertion.truncate import DEFAULT_MAX_CHARS
+    from _pytest.assertion.truncate import DEFAULT_MAX_LINES
+
+    return DEFAULT_MAX_LINES * 10, DEFAULT_MAX_CHARS * 10
+
+
 def running_on_ci() -> bool:
     """Check if we're currently running on a CI system."""
     env_vars = ["CI", "BUILD_NUMBER"]
@@ -0,0 +1,218 @@
+"""Run the parametrized cases of a test function inside one runtest protocol."""
+
+import contextlib
+from typing import ContextManager
+from typing import Dict
+from typing import FrozenSet
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from _pytest.config import Config
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.python import Function
+from _pytest.python import FunctionDefinition
+from _pytest.python import get_direct_param_fixture_func
+from _pytest.runner import call_and_report
+from _pytest.runner import show_test_item
+from _pytest.scope import Scope
+from _pytest.stash import StashKey
+from _pytest.warnings import catch_warnings_for_item
+import pytest
+
+
+# On the first case of a batch: the other cases of the batch, in order.
+batch_members_key = StashKey[List[Function]]()
+# On the first case of a batch: the item which follows the batch, if any.
+batch_nextitem_key = StashKey[Optional[Item]]()
+# On the other cases of a batch: set once the case ran as part of the batch.
+batch_done_key = StashKey[bool]()
+
+
+def pytest_configure(config: Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "batch: run the parametrized cases of a test function which share the "
+        "same fixture values with a single fixture setup and teardown. "
+        "See https://docs.pytest.org/en/stable/how-to/parametrize.html#batch",
+    )
+
+
+def _direct_argnames(item: Function) -> Optional[FrozenSet[str]]:
+    """Return the names of the function-scoped, directly parametrized
+    arguments of ``item``, or None if the item cannot be batched because
+    another fixture depends on one of them, or on the request of the item."""
+    if "request" in item._fixtureinfo.argnames:
+        return None
+    name2fixturedefs = item._fixtureinfo.name2fixturedefs
+    direct = frozenset(
+        name
+        for name in item.callspec.params
+        if name in name2fixturedefs
+        and name2fixturedefs[name][-1].func is get_direct_param_fixture_func
+    )
+    for name in direct:
+        if item.callspec._arg2scope.get(name) is not Scope.Function:
+            return None
+    for name, fixturedefs in name2fixturedefs.items():
+        if name in direct:
+            continue
+        for fixturedef in fixturedefs:
+            if direct.intersection(fixturedef.argnames):
+                return None
+            # A function-scoped fixture bound to the request, such as tmp_path
+            # or record_property, would belong to the first case only.
+            if fixturedef._scope is Scope.Function and "request" in (
+                fixturedef.argnames
+            ):
+                return None
+    return direct
+
+
+def _batch_key(item: Item) -> Optional[Hashable]:
+    """Return a key shared by the cases which can run in the same batch as
+    ``item``, or None if ``item`` is not batchable."""
+    if not isinstance(item, Function) or isinstance(item, FunctionDefinition):
+        return None
+    callspec = getattr(item, "callspec", None)
+    # Cases with their own marks (skip, xfail, usefixtures...) must go through
+    # their own setup.
+    if callspec is None or callspec.marks:
+        return None
+    if item.get_closest_marker("batch") is None:
+        return None
+    direct = _direct_argnames(item)
+    if not direct:
+        return None
+    fixture_indices = tuple(
+        sorted(
+            (name, index)
+            for name, index in callspec.indices.items()
+            if name not in direct
+        )
+    )
+    return (item.parent, item.originalname, direct, fixture_indices)
+
+
+def assign_batches(items: Sequence[Item]) -> None:
+    """Group consecutive items which can run in the same batch.
+
+    The batch is recorded on the stash of its first item, which runs it,
+    replacing the batches previously assigned to ``items``.
+    """
+    for item in items:
+        for key in (batch_members_key, batch_nextitem_key, batch_done_key):
+            if key in item.stash:
+                del item.stash[key]
+    head: Optional[Function] = None
+    head_key: Optional[Hashable] = None
+    members: List[Function] = []
+    for item in items:
+        key = _batch_key(item)
+        if key is not None and key == head_key:
+            assert isinstance(item, Function)
+            members.append(item)
+            continue
+        if head is not None and members:
+            head.stash[batch_members_key] = members
+            head.stash[batch_nextitem_key] = item
+        head, head_key, members = None, key, []
+        if key is not None:
+            assert isinstance(item, Function)
+            head = item
+    if head is not None and members:
+        head.stash[batch_members_key] = members
+        head.stash[batch_nextitem_key] = None
+
+
+def assign_run_batches(config: Config, items: Sequence[Item]) -> None:
+    """Assign the batches of the items about to run, unless only their
+    fixture setup is shown (--setup-only, --setup-plan)."""
+    if config.getoption("setuponly", False) or config.getoption("setupplan", False):
+        return
+    assign_batches(items)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_finish(session: Session) -> None:
+    assign_run_batches(session.config, session.items)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item: Item, nextitem: Optional[Item]) -> Optional[bool]:
+    if batch_done_key in item.stash:
+        # Already ran as part of its batch, which only covers this call.
+        del item.stash[batch_done_key]
+        return True
+    members = item.stash.get(batch_members_key, None)
+    # Only run the batch if the runtest loop is going to run its cases next,
+    # which is not the case if a plugin distributes or reorders items itself.
+    if members is None or nextitem is not members[0]:
+        return None
+    assert isinstance(item, Function)
+    runbatchprotocol(item, members, item.stash[batch_nextitem_key])
+    return True
+
+
+def warnings_context(item: Item) -> ContextManager[None]:
+    """Attribute the warnings raised by a case of a batch to that case rather
+    than to the first one, whose protocol runs the batch."""
+    if not item.config.pluginmanager.hasplugin("warnings"):
+        return contextlib.nullcontext()
+    return catch_warnings_for_item(
+        config=item.config, ihook=item.ihook, when="runtest", item=item
+    )
+
+
+def runbatchprotocol(
+    item: Function, members: Sequence[Function], nextitem: Optional[Item]
+) -> None:
+    """Run ``item`` and the other cases of its batch with a single setup and
+    teardown of ``item``.
+
+    Every case gets its own call report; the setup and teardown reports
+    belong to ``item``.
+    """
+    ihook = item.ihook
+    ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    if not item._request:
+        # This only happens if the item is re-run, as is done by
+        # pytest-rerunfailures.
+        item._initrequest()
+    rep = call_and_report(item, "setup")
+    unrun: Sequence[Function] = members
+    if rep.passed:
+        if item.config.getoption("setupshow", False):
+            show_test_item(item)
+        call_and_report(item, "call")
+        direct = _direct_argnames(item) or frozenset()
+        session = item.session
+        for index, member in enumerate(members):
+            if session.shouldfail or session.shouldstop:
+                unrun = members[index:]
+                break
+            member.stash[batch_done_key] = True
+            member.ihook.pytest_runtest_logstart(
+                nodeid=member.nodeid, location=member.location
+            )
+            params: Dict[str, object] = {
+                name: member.callspec.params[name] for name in direct
+            }
+            member.funcargs = {**item.funcargs, **params}
+            with warnings_context(member):
+                call_and_report(member, "call")
+            member._request = False  # type: ignore[assignment]
+            member.funcargs = None  # type: ignore[assignment]
+            member.ihook.pytest_runtest_logfinish(
+                nodeid=member.nodeid, location=member.location
+            )
+        else:
+            unrun = ()
+    # The cases which did not run go through the regular protocol.
+    teardown_nextitem = unrun[0] if unrun else nextitem
+    call_and_report(item, "teardown", nextitem=teardown_nextitem)
+    item._request = False  # type: ignore[assignment]
+    item.funcargs = None  # type: ignore[assignment]
+    ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
@@ -3,12 +3,12 @@
 
 import argparse
 import collections.abc
+import contextlib
 import copy
 import dataclasses
 import enum
 from functools import lru_cache
 import glob
-import importlib.metadata
 import inspect
 import os
 from pathlib import Path
@@ -21,6 +21,7 @@ from types import FunctionType
 from typing import Any
 from typing import Callable
 from typing import cast
+from typing import ContextManager
 from typing import Dict
 from typing import Final
 from typing import final
@@ -46,10 +47,12 @@ from pluggy import HookspecMarker
 from pluggy import HookspecOpts
 from pluggy import PluginManager
 
+from . import plugincache
 from .compat import PathAwareHookProxy
 from .exceptions import PrintHelp as PrintHelp
 from .exceptions import UsageError as UsageError
 from .findpaths import determine_setup
+from .startupprofile import StartupProfile
 from _pytest import __version__
 import _pytest._code
 from _pytest._code import ExceptionInfo
@@ -203,7 +206,14 @@ def console_main() -> int:
     """
     # https://docs.python.org/3/library/signal.html#note-on-sigpipe
     try:
-        code = main()
+        args = sys.argv[1:]
+        if "--daemon" in args or "--daemon-stop" in args:
+            # Before loading any plugin, which is left to the daemon.
+            from _pytest import daemon
+
+            code = daemon.run(args)
+        else:
+            code = main()
         sys.stdout.flush()
         return code
     except BrokenPipeError:
@@ -252,6 +262,7 @@ essential_plugins = (
 default_plugins = (
     *essential_plugins,
     "python",
+    "batch",
     "terminal",
     "debugging",
     "unittest",
@@ -266,6 +277,14 @@ default_plugins = (
     "junitxml",
     "doctest",
     "cacheprovider",
+    "history",
+    "sharding",
+    "ordering",
+    "timebudget",
+    "affected",
+    "importgraph",
+    "daemon",
+    "watch",
     "freeze_support",
     "setuponly",
     "setupplan",
@@ -277,6 +296,11 @@ default_plugins = (
     "unraisableexception",
     "threadexception",
     "faulthandler",
+    "leaks",
+    "profiler",
+    "hooktiming",
+    "startupprofile",
+    "precompile",
 )
 
 builtin_plugins = set(default_plugins)
@@ -303,8 +327,14 @@ def get_config(
         # Handle any "-p no:plugin" args.
         pluginmanager.consider_preparse(args, exclude_only=True)
 
+    from _pytest.lazyplugins import lazy_plugins
+    from _pytest.lazyplugins import LazyPlugin
+
     for spec in default_plugins:
-        pluginmanager.import_plugin(spec)
+        if spec in lazy_plugins:
+            pluginmanager.register(LazyPlugin(spec), spec)
+        else:
+            pluginmanager.import_plugin(spec)
 
     return config
 
@@ -407,6 +437,9 @@ class PytestPluginManager(PluginManager):
 
         super().__init__("pytest")
 
+        # The phases of the startup, reported by --startup-profile.
+        self._startup_profile = StartupProfile()
+
         # -- State related to local conftest plugins.
         # All loaded conftest modules.
         self._conftest_plugins: Set[types.ModuleType] = set()
@@ -431,6 +464,13 @@ class PytestPluginManager(PluginManager):
         # just stored here to be used later.
         self.skipped_plugins: List[Tuple[str, str]] = []
 
+        # Builtin plugin modules registered in place of their LazyPlugin stub.
+        self._lazily_loaded: Set[types.ModuleType] = set()
+
+        # The pytest11 entry points, when Config found them in the cache.
+        self._cached_entry_points: Optional[plugincache.PluginEntryPoints] = None
+        self._cached_distinfo: List[Tuple[_PluggyPlugin, Any]] = []
+
         self.add_hookspecs(_pytest.hookspec)
         self.register(self)
         if os.environ.get("PYTEST_DEBUG"):
@@ -465,6 +505,9 @@ class PytestPluginManager(PluginManager):
         # Ignore names which can not be hooks.
         if name == "pytest_plugins":
             return None
+        # The options of a lazily loaded builtin plugin were added by its stub.
+        if name == "pytest_addoption" and plugin in self._lazily_loaded:
+            return None
 
         opts = super().parse_hookimpl_opts(plugin, name)
         if opts is not None:
@@ -519,9 +562,41 @@ class PytestPluginManager(PluginManager):
                 self.consider_module(plugin)
         return plugin_name
 
+    def load_setuptools_entrypoints(
+        self, group: str, name: Optional[str] = None
+    ) -> int:
+        """:meta private:"""
+        if group != "pytest11" or self._cached_entry_points is None:
+            return super().load_setuptools_entrypoints(group, name)
+        count = 0
+        for ep, dist in self._cached_entry_points.entry_points():
+            if (
+                (name is not None and ep.name != name)
+                # already registered
+                or self.get_plugin(ep.name)
+                or self.is_blocked(ep.name)
+            ):
+                continue
+            with self._startup_profile.phase("plugin", ep.name):
+                plugin = ep.load()
+                self.register(plugin, name=ep.name)
+            self._cached_distinfo.append((plugin, dist))
+            count += 1
+        return count
+
+    def list_plugin_distinfo(self) -> List[Tuple[_PluggyPlugin, Any]]:
+        """:meta private:"""
+        return [*super().list_plugin_distinfo(), *self._cached_distinfo]
+
     def getplugin(self, name: str):
         # Support deprecated naming because plugins (xdist e.g.) use it.
         plugin: Optional[_PluggyPlugin] = self.get_plugin(name)
+        from _pytest.lazyplugins import LazyPlugin
+
+        if isinstance(plugin, LazyPlugin):
+            # Callers expect the plugin module itself.
+            plugin.load(self)
+            plugin = self.get_plugin(name)
         return plugin
 
     def hasplugin(self, name: str) -> bool:
@@ -714,12 +789,13 @@ class PytestPluginManager(PluginManager):
                 pass
 
         try:
-            mod = import_path(
-                conftestpath,
-                mode=importmode,
-                root=rootpath,
-                consider_namespace_packages=consider_namespace_packages,
-            )
+            with self._startup_profile.phase("conftest", str(conftestpath)):
+                mod = import_path(
+                    conftestpath,
+                    mode=importmode,
+                    root=rootpath,
+                    consider_namespace_packages=consider_namespace_packages,
+                )
         except Exception as e:
             assert e.__traceback__ is not None
             raise ConftestImportFailure(conftestpath, cause=e) from e
@@ -861,18 +937,19 @@ class PytestPluginManager(PluginManager):
             if loaded:
                 return
 
-        try:
-            __import__(importspec)
-        except ImportError as e:
-            raise ImportError(
-                f'Error importing plugin "{modname}": {e.args[0]}'
-            ).with_traceback(e.__traceback__) from e
-
-        except Skipped as e:
-            self.skipped_plugins.append((modname, e.msg or ""))
-        else:
-            mod = sys.modules[importspec]
-            self.register(mod, modname)
+        with self._startup_profile.phase("plugin", modname):
+            try:
+                __import__(importspec)
+            except ImportError as e:
+                raise ImportError(
+                    f'Error importing plugin "{modname}": {e.args[0]}'
+                ).with_traceback(e.__traceback__) from e
+
+            except Skipped as e:
+                self.skipped_plugins.append((modname, e.msg or ""))
+            else:
+                mod = sys.modules[importspec]
+                self.register(mod, modname)
 
 
 def _get_plugin_specs_as_list(
@@ -1084,6 +1161,7 @@ class Config:
         self._override_ini: Sequence[str] = ()
         self._opt2dest: Dict[str, str] = {}
         self._cleanup: List[Callable[[], None]] = []
+        self._rewritable_plugin_modules: Optional[List[str]] = None
         self.pluginmanager.register(self, "pytestconfig")
         self._configured = False
         self.hook.pytest_addoption.call_historic(
@@ -1125,7 +1203,13 @@ class Config:
     def _do_configure(self) -> None:
         assert not self._configured
         self._configured = True
-        with warnings.catch_warnings():
+        if getattr(self.option, "startup_profile", None):
+            timed: ContextManager[None] = self.pluginmanager._startup_profile.hookimpls(
+                "configure", self.pluginmanager.hook.pytest_configure
+            )
+        else:
+            timed = contextlib.nullcontext()
+        with warnings.catch_warnings(), timed:
             warnings.simplefilter("default")
             self.hook.pytest_configure.call_historic(kwargs=dict(config=self))
 
@@ -1295,16 +1379,43 @@ class Config:
             # We don't autoload from setuptools entry points, no need to continue.
             return
 
-        package_files = (
-            str(file)
-            for dist in importlib.metadata.distributions()
-            if any(ep.group == "pytest11" for ep in dist.entry_points)
-            for file in dist.files or []
-        )
-
-        for name in _iter_rewritable_modules(package_files):
+        for name in self._discover_plugin_entry_points():
             hook.mark_rewrite(name)
 
+    def _discover_plugin_entry_points(self) -> List[str]:
+        """Discover the plugins installed as entry points, and return the
+        modules of their distributions to rewrite.
+
+        They are taken from the cache when the installed distributions did not
+        change, unless disabled with ``--no-plugin-cache``. The plugin manager
+        then loads them from there.
+        """
+        if self._rewritable_plugin_modules is not None:
+            return self._rewritable_plugin_modules
+
+        cache = None
+        if not self.known_args_namespace.no_plugin_cache and not (
+            self.pluginmanager.is_blocked("cacheprovider")
+        ):
+            from _pytest.cacheprovider import Cache
+
+            cachedir = Cache.cache_dir_from_config(self, _ispytest=True)
+            cache = Cache(cachedir, self, _ispytest=True)
+            key = plugincache.environment_key()
+            entry_points = plugincache.load(cache, key)
+            if entry_points is not None:
+                self.pluginmanager._cached_entry_points = entry_points
+                self._rewritable_plugin_modules = entry_points.rewritable
+                return self._rewritable_plugin_modules
+
+        with self.pluginmanager._startup_profile.phase("entrypoints", "discovery"):
+            discovered, package_files = plugincache.discover()
+        self._rewritable_plugin_modules = list(_iter_rewritable_modules(package_files))
+        if cache is not None and discovered is not None:
+            discovered.rewritable = self._rewritable_plugin_modules
+            plugincache.save(cache, key, discovered)
+        return self._rewritable_plugin_modules
+
     def _validate_args(self, args: List[str], via: str) -> List[str]:
         """Validate known args."""
         self._parser._config_source_hint = via  # type: ignore
@@ -1370,27 +1481,33 @@ class Config:
                     self._validate_args(shlex.split(env_addopts), "via PYTEST_ADDOPTS")
                     + args
                 )
-        self._initini(args)
+        profile = self.pluginmanager._startup_profile
+        with profile.phase("ini", "configuration file"):
+            self._initini(args)
         if addopts:
             args[:] = (
                 self._validate_args(self.getini("addopts"), "via addopts config") + args
             )
 
-        self.known_args_namespace = self._parser.parse_known_args(
-            args, namespace=copy.copy(self.option)
-        )
+        with profile.phase("options", "early parse"):
+            self.known_args_namespace = self._parser.parse_known_args(
+                args, namespace=copy.copy(self.option)
+            )
         self._checkversion()
         self._consider_importhook(args)
         self.pluginmanager.consider_preparse(args, exclude_only=False)
         if not os.environ.get("PYTEST_DISABLE_PLUGIN_AUTOLOAD"):
             # Don't autoload from setuptools entry point. Only explicitly specified
             # plugins are going to be loaded.
-            self.pluginmanager.load_setuptools_entrypoints("pytest11")
+            self._discover_plugin_entry_points()
+            with profile.phase("entrypoints", "loading"):
+                self.pluginmanager.load_setuptools_entrypoints("pytest11")
         self.pluginmanager.consider_env()
 
-        self.known_args_namespace = self._parser.parse_known_args(
-            args, namespace=copy.copy(self.known_args_namespace)
-        )
+        with profile.phase("options", "early parse with plugins"):
+            self.known_args_namespace = self._parser.parse_known_args(
+                args, namespace=copy.copy(self.known_args_namespace)
+            )
 
         self._validate_plugins()
         self._warn_about_skipped_plugins()
@@ -1501,9 +1618,11 @@ class Config:
         self._preparse(args, addopts=addopts)
         self._parser.after_preparse = True  # type: ignore
         try:
-            args = self._parser.parse_setoption(
-                args, self.option, namespace=self.option
-            )
+            with self.pluginmanager._startup_profile.phase("options", "parse"):
+                args = self._parser.parse_setoption(
+                    args, self.option, namespace=self.option
+                )
+            self._load_lazy_plugins()
             self.args, self.args_source = self._decide_args(
                 args=args,
                 pyargs=self.known_args_namespace.pyargs,
@@ -1515,6 +1634,13 @@ class Config:
         except PrintHelp:
             pass
 
+    def _load_lazy_plugins(self) -> None:
+        """Import the builtin plugins registered as stubs which are needed by
+        the parsed options."""
+        from _pytest.lazyplugins import load_needed
+
+        load_needed(self)
+
     def issue_config_time_warning(self, warning: Warning, stacklevel: int) -> None:
         """Issue and handle a warning during the "configure" stage.
 
@@ -0,0 +1,157 @@
+"""Caching of the discovery of the plugins installed as ``pytest11`` entry points.
+
+Discovering them reads the entry points of every installed distribution, and
+the files of the distributions of the plugins to mark their modules for
+assertion rewriting, which takes a while in large environments. The result is
+kept in the cache directory, keyed on the modification times of the
+distribution metadata directories found on :data:`sys.path`.
+"""
+
+import dataclasses
+import hashlib
+import importlib.metadata
+import os
+import sys
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from _pytest.cacheprovider import Cache
+
+
+#: The cache key prefix of the discovered plugins, one value per interpreter.
+CACHE_KEY = "cache/plugins"
+
+
+class CachedDistribution:
+    """The distribution of a plugin loaded from the cache, as listed by
+    :meth:`PytestPluginManager.list_plugin_distinfo`.
+
+    Its name and version come from the cache, its other attributes are read
+    from the installed distribution on access.
+    """
+
+    def __init__(self, project_name: str, version: str) -> None:
+        self.project_name = project_name
+        self.version = version
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(importlib.metadata.distribution(self.project_name), attr)
+
+    def __repr__(self) -> str:
+        return f"<CachedDistribution {self.project_name}-{self.version}>"
+
+
+@dataclasses.dataclass
+class PluginEntryPoints:
+    """The ``pytest11`` entry points of the installed distributions."""
+
+    #: The name and value of each entry point, with the project name and
+    #: version of its distribution.
+    plugins: List[Tuple[str, str, str, str]]
+    #: The modules of the distributions of the plugins, to rewrite.
+    rewritable: List[str]
+
+    def entry_points(self) -> List[Tuple[importlib.metadata.EntryPoint, Any]]:
+        """Return each entry point with the distribution providing it."""
+        return [
+            (
+                importlib.metadata.EntryPoint(name, value, "pytest11"),
+                CachedDistribution(project_name, version),
+            )
+            for name, value, project_name, version in self.plugins
+        ]
+
+
+def environment_key() -> List[List[object]]:
+    """Return the path and modification times of the metadata directory of
+    each distribution on :data:`sys.path`, and of its entry points."""
+    key: List[List[object]] = []
+    for entry in sys.path:
+        try:
+            with os.scandir(entry or ".") as it:
+                names = sorted(
+                    e.name for e in it if e.name.endswith((".dist-info", ".egg-info"))
+                )
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(entry, name)
+            key.append(
+                [path, _mtime(path), _mtime(os.path.join(path, "entry_points.txt"))]
+            )
+    return key
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def discover() -> Tuple[Optional[PluginEntryPoints], List[str]]:
+    """Scan the installed distributions for ``pytest11`` entry points.
+
+    Return them, or None if they cannot be cached, e.g. because an entry point
+    is not a :class:`importlib.metadata.EntryPoint`, and the files of their
+    distributions.
+    """
+    plugins: List[Tuple[str, str, str, str]] = []
+    package_files: List[str] = []
+    cacheable = True
+    for dist in importlib.metadata.distributions():
+        entry_points = [ep for ep in dist.entry_points if ep.group == "pytest11"]
+        if not entry_points:
+            continue
+        package_files.extend(str(file) for file in dist.files or [])
+        try:
+            for ep in entry_points:
+                plugins.append((ep.name, ep.value, dist.metadata["name"], dist.version))
+        except (AttributeError, KeyError, TypeError):
+            cacheable = False
+    if not cacheable or not all(
+        isinstance(value, str) for plugin in plugins for value in plugin
+    ):
+        return None, package_files
+    return PluginEntryPoints(plugins, []), package_files
+
+
+def _cache_key() -> str:
+    digest = hashlib.sha256(sys.executable.encode()).hexdigest()[:16]
+    return f"{CACHE_KEY}/{digest}"
+
+
+def load(cache: "Cache", key: List[List[object]]) -> Optional[PluginEntryPoints]:
+    """Return the entry points cached for the environment ``key``, if any."""
+    value = cache.get(_cache_key(), None)
+    try:
+        if value["key"] != key:
+            return None
+        plugins = [tuple(plugin) for plugin in value["plugins"]]
+        rewritable = list(value["rewritable"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(len(plugin) == 4 for plugin in plugins) or not all(
+        isinstance(item, str) for items in (*plugins, rewritable) for item in items
+    ):
+        return None
+    return PluginEntryPoints(plugins, rewritable)  # type: ignore[arg-type]
+
+
+def save(
+    cache: "Cache", key: List[List[object]], entry_points: PluginEntryPoints
+) -> None:
+    """Cache the entry points for the environment ``key``."""
+    cache.set(
+        _cache_key(),
+        {
+            "key": key,
+            "plugins": entry_points.plugins,
+            "rewritable": entry_points.rewritable,
+        },
+    )
@@ -0,0 +1,112 @@
+"""Timing of the phases of the startup of pytest (--startup-profile).
+
+The phases are always recorded, as most of them run before the command line
+options are parsed, which only costs a couple of performance counter reads
+each. The report is made by the ``startupprofile`` plugin.
+"""
+
+import contextlib
+import dataclasses
+import functools
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from pluggy import HookCaller
+
+from _pytest import timing
+
+
+@dataclasses.dataclass
+class StartupPhase:
+    """The duration of one phase of the startup."""
+
+    #: What the phase does, e.g. "plugin" for the import of a plugin.
+    kind: str
+    #: What the phase acts on, e.g. the name of the plugin.
+    name: str
+    #: Seconds from the start of pytest to the start of the phase.
+    start: float
+    #: Duration of the phase, including its nested phases.
+    total: float = 0.0
+    #: Duration of the phase, excluding its nested phases.
+    own: float = 0.0
+
+
+class StartupProfile:
+    """Records the phases of the startup, from the creation of the plugin
+    manager to the start of the session."""
+
+    def __init__(self) -> None:
+        self.start = timing.perf_counter()
+        #: Seconds from the start to the end of the startup, once ended.
+        self.duration: Optional[float] = None
+        self.phases: List[StartupPhase] = []
+        # Time spent in nested phases, for each active phase.
+        self._nested: List[float] = []
+
+    @contextlib.contextmanager
+    def phase(self, kind: str, name: str) -> Iterator[None]:
+        """Time the phase run in the ``with`` block."""
+        if self.duration is not None:
+            yield
+            return
+        start = timing.perf_counter()
+        phase = StartupPhase(kind, name, start - self.start)
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = timing.perf_counter() - start
+            phase.total = elapsed
+            phase.own = elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            self.phases.append(phase)
+
+    @contextlib.contextmanager
+    def hookimpls(self, kind: str, hook: HookCaller) -> Iterator[None]:
+        """Time each plain implementation of ``hook`` called in the ``with``
+        block, as a phase named after its plugin."""
+
+        def timed(name: str, function: Callable[..., object]) -> Callable[..., object]:
+            @functools.wraps(function)
+            def wrapper(*args: object) -> object:
+                __tracebackhide__ = True
+                with self.phase(kind, name):
+                    return function(*args)
+
+            return wrapper
+
+        wrapped = [
+            (hookimpl, hookimpl.function)
+            for hookimpl in hook.get_hookimpls()
+            if not (hookimpl.wrapper or hookimpl.hookwrapper)
+        ]
+        for hookimpl, function in wrapped:
+            name = hookimpl.plugin_name
+            if name == str(id(hookimpl.plugin)):
+                # Registered without a name.
+                cls = type(hookimpl.plugin)
+                name = f"{cls.__module__}.{cls.__qualname__}"
+            hookimpl.function = timed(name, function)
+        try:
+            yield
+        finally:
+            for hookimpl, function in wrapped:
+                hookimpl.function = function
+
+    def end(self) -> None:
+        """Mark the end of the startup; later phases are not recorded."""
+        if self.duration is None:
+            self.duration = timing.perf_counter() - self.start
+
+    def sorted_phases(self) -> List[StartupPhase]:
+        """Return the phases, costliest first, with the time spent outside
+        of any phase as an "other" phase."""
+        phases = list(self.phases)
+        if self.duration is not None:
+            outside = self.duration - sum(p.own for p in self.phases)
+            phases.append(StartupPhase("other", "", 0.0, outside, outside))
+        return sorted(phases, key=lambda p: p.own, reverse=True)
@@ -0,0 +1,366 @@
+"""Run the tests from a warm daemon process (--daemon).
+
+The daemon loads the plugins, the initial conftest.py files and the modules
+they import once, and forks a child process for each run, which takes the
+arguments, working directory, environment and standard streams of the client.
+"""
+
+import array
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+import socket
+import struct
+import sys
+import tempfile
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NoReturn
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from _pytest import __version__
+from _pytest._options.daemon import pytest_addoption as pytest_addoption
+from _pytest.config import _prepareconfig
+from _pytest.config import console_main
+from _pytest.config import ExitCode
+from _pytest.config import main
+
+
+# Seconds without any run after which the daemon exits.
+IDLE_TIMEOUT = 30 * 60
+# Seconds to wait for a new daemon to load the plugins and conftest.py files.
+START_TIMEOUT = 120
+
+_HEADER = struct.Struct("!Q")
+
+
+def is_supported() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+def socket_path(cwd: str) -> str:
+    """Return the path of the socket of the daemon for ``cwd``, which is only
+    used by the same interpreter and version of pytest."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    directory = os.path.join(base, f"pytest-daemon-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"{directory} is not private to the current user")
+    key = "\0".join([sys.executable, __version__, cwd])
+    return os.path.join(directory, hashlib.sha1(key.encode()).hexdigest()[:16])
+
+
+def _send(
+    sock: socket.socket, message: Dict[str, Any], fds: Sequence[int] = ()
+) -> None:
+    payload = json.dumps(message).encode()
+    ancdata = []
+    if fds:
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+    sock.sendmsg([_HEADER.pack(len(payload))], ancdata)
+    sock.sendall(payload)
+
+
+def _receive(sock: socket.socket) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+    """Receive a message and the file descriptors sent with it, or None if the
+    connection was closed."""
+    fds = array.array("i")
+    header, ancdata, _, _ = sock.recvmsg(
+        _HEADER.size, socket.CMSG_LEN(3 * fds.itemsize)
+    )
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[: len(data) - len(data) % fds.itemsize])
+    if len(header) < _HEADER.size:
+        for fd in fds:
+            os.close(fd)
+        return None, []
+    (length,) = _HEADER.unpack(header)
+    payload = b""
+    while len(payload) < length:
+        chunk = sock.recv(length - len(payload))
+        if not chunk:
+            return None, list(fds)
+        payload += chunk
+    return json.loads(payload), list(fds)
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path + ".sock")
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _is_running(path: str) -> bool:
+    """Return whether a daemon holds the lock of ``path``."""
+    import fcntl
+
+    with open(path + ".lock", "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    return False
+
+
+def _start(path: str) -> Optional[socket.socket]:
+    """Start the daemon of ``path`` in the background and connect to it."""
+    import subprocess
+
+    with open(path + ".log", "wb") as log:
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from _pytest.daemon import serve; serve(sys.argv[1])",
+                path,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            check=False,
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        sock = _connect(path)
+        if sock is not None:
+            return sock
+        if not _is_running(path):
+            # Failed while loading the plugins or conftest.py files.
+            return None
+        time.sleep(0.05)
+    return None
+
+
+def _run_in_daemon(sock: socket.socket, args: List[str]) -> Optional[int]:
+    """Run ``args`` in a child of the daemon and return its exit code, or None
+    if the daemon is out of date and exited instead."""
+    with sock:
+        request = {"args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+        _send(sock, request, [0, 1, 2])
+        pid = None
+        while True:
+            try:
+                message, _ = _receive(sock)
+            except ConnectionResetError:
+                # The daemon exited before serving the run.
+                if pid is None:
+                    return None
+                message = None
+            except KeyboardInterrupt:
+                if pid is None:
+                    raise
+                import signal
+
+                os.kill(pid, signal.SIGINT)
+                continue
+            if message is None:
+                sys.stderr.write("pytest: the daemon test process died\n")
+                return ExitCode.INTERNAL_ERROR
+            if message.get("restart"):
+                return None
+            if "pid" in message:
+                pid = message["pid"]
+            if "exit" in message:
+                return int(message["exit"])
+
+
+def run(args: List[str]) -> Union[int, ExitCode]:
+    """Handle --daemon and --daemon-stop from the command line arguments,
+    before any plugin gets loaded."""
+    stop = "--daemon-stop" in args
+    args = [arg for arg in args if arg not in ("--daemon", "--daemon-stop")]
+    if not is_supported():
+        if stop:
+            return ExitCode.OK
+        sys.stderr.write("pytest: --daemon is not supported on this platform\n")
+        return main(args)
+    path = socket_path(os.getcwd())
+    if stop:
+        sock = _connect(path)
+        if sock is None:
+            sys.stdout.write("no pytest daemon running\n")
+            return ExitCode.OK
+        with sock:
+            _send(sock, {"stop": True})
+            _receive(sock)
+        sys.stdout.write("pytest daemon stopped\n")
+        return ExitCode.OK
+    for _ in range(2):
+        sock = _connect(path) or _start(path)
+        if sock is None:
+            sys.stderr.write(
+                f"pytest: could not start the daemon, see {path}.log; "
+                "running without it\n"
+            )
+            break
+        ret = _run_in_daemon(sock, args)
+        if ret is not None:
+            return ret
+    return main(args)
+
+
+class Daemon:
+    """Serves the runs of the clients from a warm process.
+
+    The daemon exits instead of serving a run when the configuration file or
+    any module it loaded from the rootdir changed, so that the client starts
+    a new one.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        #: Modification time of the files the warm state depends on.
+        self.watched: Dict[str, int] = {}
+
+    def warm_up(self) -> None:
+        os.environ["PYTEST_VERSION"] = __version__
+        config = _prepareconfig([])
+        try:
+            rootpath = config.rootpath
+            files = [str(config.inipath)] if config.inipath else []
+        finally:
+            config._ensure_unconfigure()
+            del os.environ["PYTEST_VERSION"]
+        root = str(rootpath) + os.sep
+        for module in list(sys.modules.values()):
+            filename = getattr(module, "__file__", None)
+            if (
+                filename
+                and filename.startswith(root)
+                and "site-packages" not in filename
+            ):
+                files.append(filename)
+        for filename in files:
+            with contextlib.suppress(OSError):
+                self.watched[filename] = os.stat(filename).st_mtime_ns
+
+    def is_stale(self) -> bool:
+        for filename, mtime_ns in self.watched.items():
+            try:
+                if os.stat(filename).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def serve_forever(self) -> None:
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path + ".sock")
+        listener.bind(self.path + ".sock")
+        listener.listen()
+        listener.settimeout(1)
+        last_run = time.monotonic()
+        try:
+            while True:
+                self._reap()
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    if time.monotonic() - last_run > IDLE_TIMEOUT:
+                        break
+                    continue
+                last_run = time.monotonic()
+                with conn:
+                    conn.settimeout(None)
+                    request, fds = _receive(conn)
+                    if request is None or len(fds) != 3:
+                        for fd in fds:
+                            os.close(fd)
+                        if request is not None and request.get("stop"):
+                            _send(conn, {"stopped": True})
+                            break
+                        continue
+                    if self.is_stale():
+                        for fd in fds:
+                            os.close(fd)
+                        # Stop accepting connections before the client retries,
+                        # or it may connect to this daemon again and be reset.
+                        listener.close()
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(self.path + ".sock")
+                        _send(conn, {"restart": True})
+                        break
+                    if os.fork() == 0:
+                        listener.close()
+                        _run_child(conn, request, fds)
+                    for fd in fds:
+                        os.close(fd)
+        finally:
+            # Once closed, the socket path may belong to a new daemon.
+            if listener.fileno() != -1:
+                listener.close()
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self.path + ".sock")
+
+    def _reap(self) -> None:
+        with contextlib.suppress(ChildProcessError):
+            while os.waitpid(-1, os.WNOHANG)[0]:
+                pass
+
+
+def _run_child(
+    conn: socket.socket, request: Dict[str, Any], fds: List[int]
+) -> NoReturn:
+    code: Union[int, ExitCode] = ExitCode.INTERNAL_ERROR
+    try:
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        for stream in (sys.stdout, sys.stderr):
+            stream.reconfigure(line_buffering=stream.isatty())  # type: ignore[attr-defined]
+        _send(conn, {"pid": os.getpid()})
+        sys.argv[1:] = request["args"]
+        code = console_main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else ExitCode.INTERNAL_ERROR
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        with contextlib.suppress(BaseException):
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _send(conn, {"exit": int(code)})
+        os._exit(0)
+
+
+def serve(path: str) -> None:
+    """Entry point of the daemon process, started by the client."""
+    import fcntl
+
+    lock = open(path + ".lock", "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # Another daemon is running or starting.
+        return
+    # The lock is held as long as the forked daemon keeps the file open.
+    if os.fork() != 0:
+        os._exit(0)
+    daemon = Daemon(path)
+    daemon.warm_up()
+    sys.stdout.write(f"pytest daemon serving {Path.cwd()}\n")
+    sys.stdout.flush()
+    daemon.serve_forever()
@@ -35,6 +35,13 @@ def pytest_configure(config: Config) -> None:
     config.stash[fault_handler_stderr_fd_key] = os.dup(stderr_fileno)
     faulthandler.enable(file=config.stash[fault_handler_stderr_fd_key])
 
+    # Only wrap the runtest protocol when there is a timeout to arm.
+    timeout = get_timeout_config_value(config)
+    if timeout > 0:
+        config.pluginmanager.register(
+            FaultHandlerTimeoutPlugin(timeout), "faulthandler-timeout"
+        )
+
 
 def pytest_unconfigure(config: Config) -> None:
     import faulthandler
@@ -69,20 +76,23 @@ def get_timeout_config_value(config: Config) -> float:
     return float(config.getini("faulthandler_timeout") or 0.0)
 
 
-@pytest.hookimpl(wrapper=True, trylast=True)
-def pytest_runtest_protocol(item: Item) -> Generator[None, object, object]:
-    timeout = get_timeout_config_value(item.config)
-    if timeout > 0:
+class FaultHandlerTimeoutPlugin:
+    """Dump the traceback of all threads if a test takes more than
+    ``faulthandler_timeout`` seconds to finish."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+
+    @pytest.hookimpl(wrapper=True, trylast=True)
+    def pytest_runtest_protocol(self, item: Item) -> Generator[None, object, object]:
         import faulthandler
 
         stderr = item.config.stash[fault_handler_stderr_fd_key]
-        faulthandler.dump_traceback_later(timeout, file=stderr)
+        faulthandler.dump_traceback_later(self.timeout, file=stderr)
         try:
             return (yield)
         finally:
             faulthandler.cancel_dump_traceback_later()
-    else:
-        return (yield)
 
 
 @pytest.hookimpl(tryfirst=True)
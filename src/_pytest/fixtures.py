@@ -56,6 +56,7 @@ from _pytest.config.argparsing import Parser
 from _pytest.deprecated import check_ispytest
 from _pytest.deprecated import MARKED_FIXTURE
 from _pytest.deprecated import YIELD_FIXTURE
+from _pytest.lazyplugins import load_fixture_plugin
 from _pytest.mark import Mark
 from _pytest.mark import ParameterSet
 from _pytest.mark.structures import MarkDecorator
@@ -1688,6 +1689,20 @@ class FixtureManager:
         if autouse:
             self._nodeid_autousenames.setdefault(nodeid or "", []).append(name)
 
+    def _unregister_fixtures(self, nodeid: str) -> None:
+        """Forget the fixtures registered by a node and its children, before
+        the node gets collected again (used by ``--watch``)."""
+        prefix = nodeid + "::"
+        for faclist in self._arg2fixturedefs.values():
+            faclist[:] = [
+                f
+                for f in faclist
+                if f.baseid != nodeid and not f.baseid.startswith(prefix)
+            ]
+        for key in list(self._nodeid_autousenames):
+            if key == nodeid or key.startswith(prefix):
+                del self._nodeid_autousenames[key]
+
     @overload
     def parsefactories(
         self,
@@ -1779,7 +1794,12 @@ class FixtureManager:
         try:
             fixturedefs = self._arg2fixturedefs[argname]
         except KeyError:
-            return None
+            # The fixture may be defined by a builtin plugin not loaded yet.
+            if not load_fixture_plugin(self.config.pluginmanager, argname):
+                return None
+            fixturedefs = self._arg2fixturedefs.get(argname)
+            if fixturedefs is None:
+                return None
         return tuple(self._matchfactories(fixturedefs, node))
 
     def _matchfactories(
@@ -73,6 +73,13 @@ def pytest_addoption(parser: Parser) -> None:
         "To avoid loading of plugins, use the `no:` prefix, e.g. "
         "`no:doctest`.",
     )
+    group.addoption(
+        "--no-plugin-cache",
+        action="store_true",
+        default=False,
+        help="Discover the plugins installed as entry points again, rather than "
+        "using the ones cached for the installed distributions",
+    )
     group.addoption(
         "--traceconfig",
         "--trace-config",
@@ -0,0 +1,400 @@
+"""Record the outcome and durations of tests over the last runs, in the cache
+directory, and flag the tests which became slower."""
+
+import dataclasses
+import fnmatch
+import json
+import os
+import statistics
+import time
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from _pytest._io import TerminalWriter
+from _pytest.cacheprovider import Cache
+from _pytest.config import Config
+from _pytest.config import ExitCode
+from _pytest.config import UsageError
+from _pytest.config.argparsing import Parser
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.reports import TestReport
+from _pytest.stash import StashKey
+from _pytest.terminal import TerminalReporter
+import pytest
+
+
+history_key = StashKey["ResultsHistory"]()
+#: Expected duration of an item in seconds, set on the collected items by
+#: :func:`stash_expected_durations`.
+expected_duration_key = StashKey[float]()
+
+# Minimum number of previous runs of a test before it can be flagged as slower.
+SLOWDOWN_MIN_RUNS = 5
+# Minimum slowdown, in seconds, for a test to be flagged as slower.
+SLOWDOWN_MIN_SECONDS = 0.05
+
+
+def pytest_addoption(parser: Parser) -> None:
+    group = parser.getgroup("general")
+    group.addoption(
+        "--history-show",
+        action="append",
+        nargs="?",
+        dest="historyshow",
+        help="Show the recorded results of the tests matching the optional "
+        "nodeid glob (default: '*'), don't perform collection or tests",
+    )
+    parser.addini(
+        "history_runs",
+        "Number of runs of which the outcome and durations of each test are "
+        "kept in the cache directory (0 disables the history)",
+        default="20",
+    )
+    parser.addini(
+        "history_slowdown_factor",
+        "Flag the tests which ran this many times slower than their median "
+        "duration over the recorded runs (0 disables the flags)",
+        default="3",
+    )
+
+
+def _get_int_ini(config: Config, name: str) -> int:
+    value = config.getini(name)
+    try:
+        return int(value)
+    except ValueError:
+        raise UsageError(f"{name} must be an integer, got {value!r}") from None
+
+
+def _get_float_ini(config: Config, name: str) -> float:
+    value = config.getini(name)
+    try:
+        return float(value)
+    except ValueError:
+        raise UsageError(f"{name} must be a number, got {value!r}") from None
+
+
+def pytest_configure(config: Config) -> None:
+    if getattr(config, "cache", None) is None:
+        return
+    runs = _get_int_ini(config, "history_runs")
+    if runs <= 0:
+        return
+    assert config.cache is not None
+    config.stash[history_key] = ResultsHistory(config.cache, runs)
+    if not config.option.historyshow:
+        config.pluginmanager.register(HistoryPlugin(config), "historyplugin")
+
+
+def pytest_cmdline_main(config: Config) -> Optional[Union[int, ExitCode]]:
+    if config.option.historyshow and not config.option.help:
+        from _pytest.main import wrap_session
+
+        return wrap_session(config, historyshow)
+    return None
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordedResult:
+    """The recorded result of one test in one run."""
+
+    #: Start time of the run, as seconds since the epoch.
+    time: float
+    #: One of "passed", "failed", "error", "skipped", "xfailed" or "xpassed".
+    outcome: str
+    setup: float
+    call: float
+    teardown: float
+
+    @property
+    def duration(self) -> float:
+        """Total duration of the setup, call and teardown phases."""
+        return self.setup + self.call + self.teardown
+
+
+class ResultsHistory:
+    """The results of the tests over the last runs.
+
+    Each run is stored as one JSON line appended to a file of the cache
+    directory at the end of the session; the file is compacted to the last
+    ``maxruns`` runs once it holds twice as many.
+    """
+
+    def __init__(self, cache: Cache, maxruns: int) -> None:
+        self.cache = cache
+        self.path = cache._cachedir.joinpath(
+            cache._CACHE_PREFIX_DIRS, "history", "runs.jsonl"
+        )
+        self.maxruns = maxruns
+        self._lines: Optional[List[str]] = None
+        self._results: Optional[Dict[str, List[RecordedResult]]] = None
+
+    def _read_lines(self) -> List[str]:
+        if self._lines is None:
+            try:
+                with self.path.open(encoding="utf-8") as f:
+                    self._lines = f.read().splitlines()
+            except OSError:
+                self._lines = []
+        return self._lines
+
+    def _load(self) -> Dict[str, List[RecordedResult]]:
+        if self._results is not None:
+            return self._results
+        self._results = {}
+        for line in self._read_lines()[-self.maxruns :]:
+            try:
+                run = json.loads(line)
+                started = float(run["time"])
+                results = [
+                    (
+                        nodeid,
+                        RecordedResult(
+                            started,
+                            str(outcome),
+                            float(setup),
+                            float(call),
+                            float(teardown),
+                        ),
+                    )
+                    for nodeid, (outcome, setup, call, teardown) in run["tests"].items()
+                ]
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # Partially written or corrupted run.
+                continue
+            for nodeid, result in results:
+                self._results.setdefault(nodeid, []).append(result)
+        return self._results
+
+    def last_run_time(self) -> Optional[float]:
+        """Return the start time of the last recorded run, if any."""
+        times = [results[-1].time for results in self._load().values()]
+        return max(times) if times else None
+
+    def nodeids(self) -> List[str]:
+        """Return the nodeids of the recorded tests."""
+        return list(self._load())
+
+    def results(self, nodeid: str) -> List[RecordedResult]:
+        """Return the recorded results of a test, oldest first."""
+        return self._load().get(nodeid, [])
+
+    def median_duration(self, nodeid: str) -> Optional[float]:
+        """Return the median duration of the recorded runs of a test in
+        which it was not skipped, or None if there is none."""
+        durations = [
+            r.duration
+            for r in self.results(nodeid)
+            if r.outcome not in ("skipped", "xfailed")
+        ]
+        if not durations:
+            return None
+        return statistics.median(durations)
+
+    def median_durations(self) -> Dict[str, float]:
+        """Return the median duration of every test which has one."""
+        medians = {}
+        for nodeid in self._load():
+            median = self.median_duration(nodeid)
+            if median is not None:
+                medians[nodeid] = median
+        return medians
+
+    def append(self, started: float, results: Dict[str, RecordedResult]) -> None:
+        """Add a run to the history file.
+
+        The results of the previous runs stay as they were before the call.
+        """
+        self._load()
+        run = {
+            "time": started,
+            "tests": {
+                nodeid: [
+                    r.outcome,
+                    round(r.setup, 6),
+                    round(r.call, 6),
+                    round(r.teardown, 6),
+                ]
+                for nodeid, r in results.items()
+            },
+        }
+        line = json.dumps(run, ensure_ascii=False, separators=(",", ":"))
+        lines = self._read_lines()
+        self.cache.mkdir("history")
+        if len(lines) + 1 >= 2 * self.maxruns:
+            lines[:] = [*lines[len(lines) + 1 - self.maxruns :], line]
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            tmp.write_text("".join(f"{x}\n" for x in lines), "utf-8")
+            os.replace(tmp, self.path)
+        else:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            lines.append(line)
+
+
+def expected_durations(config: Config, nodeids: Sequence[str]) -> Optional[List[float]]:
+    """Return the expected duration of each of the given tests, from their
+    median duration in the history.
+
+    Tests without history are expected to take the median duration of the
+    tests with history. Returns None if none of the tests has history.
+    """
+    history = config.stash.get(history_key, None)
+    if history is None:
+        return None
+    medians = [history.median_duration(nodeid) for nodeid in nodeids]
+    known = [m for m in medians if m is not None]
+    if not known:
+        return None
+    default = statistics.median(known)
+    return [default if m is None else m for m in medians]
+
+
+def stash_expected_durations(config: Config, items: Sequence[Item]) -> bool:
+    """Set the expected duration of each of ``items`` on their stash, from
+    :func:`expected_durations`, unless they already have it.
+
+    Called by the options which use the durations, so that the history is
+    only read when one of them is given. Return whether the items have
+    expected durations.
+    """
+    if not items:
+        return False
+    if expected_duration_key in items[0].stash:
+        return True
+    durations = expected_durations(config, [item.nodeid for item in items])
+    if durations is None:
+        return False
+    for item, duration in zip(items, durations):
+        item.stash[expected_duration_key] = duration
+    return True
+
+
+def _outcome(previous: Optional[str], report: TestReport) -> str:
+    xfail = hasattr(report, "wasxfail")
+    if report.failed:
+        return "failed" if report.when == "call" else "error"
+    if previous in ("failed", "error"):
+        return previous
+    if report.skipped:
+        return "xfailed" if xfail else "skipped"
+    if report.when == "call":
+        return "xpassed" if xfail else "passed"
+    return previous or "passed"
+
+
+class HistoryPlugin:
+    """Collects the results of the session and appends them to the history at
+    its end, without touching the disk while the tests run."""
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.history = config.stash[history_key]
+        self.started = time.time()
+        self.factor = _get_float_ini(config, "history_slowdown_factor")
+        self.current: Dict[str, RecordedResult] = {}
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        previous = self.current.get(report.nodeid)
+        durations = (
+            dataclasses.asdict(previous)
+            if previous is not None
+            else {"setup": 0.0, "call": 0.0, "teardown": 0.0}
+        )
+        durations[report.when] = report.duration
+        self.current[report.nodeid] = RecordedResult(
+            time=self.started,
+            outcome=_outcome(previous.outcome if previous else None, report),
+            setup=durations["setup"],
+            call=durations["call"],
+            teardown=durations["teardown"],
+        )
+
+    def slower_tests(self) -> List[Tuple[float, float, float, int, str]]:
+        """Return ``(factor, duration, median, runs, nodeid)`` for the tests
+        of this session which ran much slower than usual, slowest first."""
+        if self.factor <= 0:
+            return []
+        slower = []
+        for nodeid, result in self.current.items():
+            if result.outcome != "passed":
+                continue
+            previous = [
+                r for r in self.history.results(nodeid) if r.outcome == "passed"
+            ]
+            if len(previous) < SLOWDOWN_MIN_RUNS:
+                continue
+            median = statistics.median(r.duration for r in previous)
+            duration = result.duration
+            if (
+                duration >= self.factor * median
+                and duration - median >= SLOWDOWN_MIN_SECONDS
+            ):
+                ratio = duration / median if median else float("inf")
+                slower.append((ratio, duration, median, len(previous), nodeid))
+        slower.sort(reverse=True)
+        return slower
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        slower = self.slower_tests()
+        if not slower:
+            return
+        tr = terminalreporter
+        tr.write_sep("=", "slower than usual")
+        for ratio, duration, median, runs, nodeid in slower:
+            tr.write_line(
+                f"{nodeid} took {duration:.2f}s, {ratio:.1f}x its "
+                f"{runs}-run median of {median:.2f}s"
+            )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: Session) -> None:
+        config = self.config
+        if hasattr(config, "workerinput") or config.getoption("collectonly"):
+            return
+        if not self.current:
+            return
+        try:
+            self.history.append(self.started, self.current)
+        except OSError as exc:
+            assert config.cache is not None
+            config.cache.warn(
+                f"could not write the test history to {self.history.path}: {exc}",
+                _ispytest=True,
+            )
+
+
+def _summarize(results: Iterable[RecordedResult]) -> str:
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r.outcome] = counts.get(r.outcome, 0) + 1
+    return ", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+
+
+def historyshow(config: Config, session: Session) -> int:
+    history = config.stash.get(history_key, None)
+    tw = TerminalWriter()
+    if history is None:
+        tw.line("the test history is disabled")
+        return 0
+    glob = config.option.historyshow[0] or "*"
+    tw.line(f"history: {history.path}")
+    tw.sep("-", f"recorded results for {glob!r}")
+    nodeids = sorted(fnmatch.filter(history.nodeids(), glob))
+    if not nodeids:
+        tw.line("no recorded results")
+    for nodeid in nodeids:
+        results = history.results(nodeid)
+        median = history.median_duration(nodeid)
+        median_str = f"{median:.3f}s" if median is not None else "-"
+        tw.line(
+            f"{nodeid}: last {results[-1].outcome}, median {median_str} "
+            f"over {len(results)} runs ({_summarize(results)})"
+        )
+    return 0
@@ -999,10 +999,17 @@ def pytest_assertion_pass(item: "Item", lineno: int, orig: str, expl: str) -> No
     You need to **clean the .pyc** files in your project directory and interpreter libraries
     when enabling this option, as assertions will require to be re-written.
 
+    The explanation is formatted only when ``expl`` is first used as a string, so
+    implementations which do not use it cost little. Use it during the hook call
+    to get the same explanation as for a failed assertion. The
+    ``assertion_pass_sample_rate`` ini-file option calls the hook for a random
+    sample of the passing assertions only.
+
     :param item: pytest item object of current test.
     :param lineno: Line number of the assert statement.
     :param orig: String with the original assertion.
-    :param expl: String with the assert explanation.
+    :param expl: The assert explanation, a :class:`collections.UserString`
+        formatted when first used as a string.
 
     Use in conftest plugins
     =======================
@@ -0,0 +1,190 @@
+"""Timing of hook implementations (--hook-durations)."""
+
+import dataclasses
+import functools
+import json
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Tuple
+
+from pluggy import HookImpl
+
+from _pytest import timing
+from _pytest._options.hooktiming import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import PytestPluginManager
+from _pytest.terminal import TerminalReporter
+import pytest
+
+
+def pytest_configure(config: Config) -> None:
+    if (
+        config.getoption("hook_durations") is not None
+        or config.getoption("hook_durations_json") is not None
+    ):
+        config.pluginmanager.register(HookTimer(config), "hooktimer")
+
+
+@dataclasses.dataclass
+class HookImplStats:
+    """Accumulated timings of one hook implementation."""
+
+    hook: str
+    plugin: str
+    #: Number of calls.
+    calls: int = 0
+    #: Time spent in the implementation, including nested hook calls.
+    total: float = 0.0
+    #: Time spent in the implementation, excluding nested timed hook
+    #: implementations. For wrappers, only the code before and after the
+    #: ``yield`` counts.
+    own: float = 0.0
+
+
+class HookTimer:
+    """Replaces the function of every hook implementation with a timing shim.
+
+    The shims only read the performance counter and update a few counters,
+    which keeps the overhead low enough to leave on in CI.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.timings: Dict[Tuple[str, str], HookImplStats] = {}
+        # Time spent in nested timed calls, for each active timed call.
+        self._nested: List[float] = []
+        self._wrapped: List[Tuple[HookImpl, Callable[..., object]]] = []
+
+    def _record(self, stats: HookImplStats, start: float, count: bool) -> None:
+        elapsed = timing.perf_counter() - start
+        nested = self._nested.pop()
+        if count:
+            stats.calls += 1
+        stats.total += elapsed
+        stats.own += elapsed - nested
+        if self._nested:
+            self._nested[-1] += elapsed
+
+    def _time_function(
+        self, function: Callable[..., object], stats: HookImplStats
+    ) -> Callable[..., object]:
+        @functools.wraps(function)
+        def timed(*args: object) -> object:
+            __tracebackhide__ = True
+            start = timing.perf_counter()
+            self._nested.append(0.0)
+            try:
+                return function(*args)
+            finally:
+                self._record(stats, start, True)
+
+        return timed
+
+    def _time_generator(
+        self, function: Callable[..., Any], stats: HookImplStats
+    ) -> Callable[..., object]:
+        """Time a wrapper implementation, excluding the time it is suspended
+        at its ``yield``."""
+
+        @functools.wraps(function)
+        def timed(*args: object) -> Generator[object, object, object]:
+            __tracebackhide__ = True
+            start = timing.perf_counter()
+            self._nested.append(0.0)
+            try:
+                gen = function(*args)
+                value = next(gen)
+            finally:
+                self._record(stats, start, True)
+            while True:
+                try:
+                    sent = yield value
+                except GeneratorExit:
+                    gen.close()
+                    raise
+                except BaseException as exc:
+                    start = timing.perf_counter()
+                    self._nested.append(0.0)
+                    try:
+                        value = gen.throw(exc)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        self._record(stats, start, False)
+                else:
+                    start = timing.perf_counter()
+                    self._nested.append(0.0)
+                    try:
+                        value = gen.send(sent)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        self._record(stats, start, False)
+
+        return timed
+
+    def _wrap_plugin(self, plugin: object, manager: PytestPluginManager) -> None:
+        for hookcaller in manager.get_hookcallers(plugin) or ():
+            for hookimpl in hookcaller.get_hookimpls():
+                if hookimpl.plugin is not plugin:
+                    continue
+                key = (hookcaller.name, hookimpl.plugin_name)
+                stats = self.timings.get(key)
+                if stats is None:
+                    stats = self.timings[key] = HookImplStats(*key)
+                original = hookimpl.function
+                if hookimpl.wrapper or hookimpl.hookwrapper:
+                    hookimpl.function = self._time_generator(original, stats)
+                else:
+                    hookimpl.function = self._time_function(original, stats)
+                self._wrapped.append((hookimpl, original))
+
+    def _unwrap(self) -> None:
+        for hookimpl, original in reversed(self._wrapped):
+            hookimpl.function = original
+        self._wrapped.clear()
+
+    def sorted_timings(self) -> List[HookImplStats]:
+        """Return the timings of the called implementations, costliest first."""
+        return sorted(
+            (t for t in self.timings.values() if t.calls),
+            key=lambda t: t.own,
+            reverse=True,
+        )
+
+    def pytest_plugin_registered(
+        self, plugin: object, manager: PytestPluginManager
+    ) -> None:
+        # Historic hook: also called for every plugin registered before us.
+        if plugin is not self:
+            self._wrap_plugin(plugin, manager)
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        count = self.config.getoption("hook_durations")
+        if count is None:
+            return
+        tr = terminalreporter
+        timings = self.sorted_timings()
+        if count:
+            tr.write_sep("=", f"slowest {count} hook implementations")
+            timings = timings[:count]
+        else:
+            tr.write_sep("=", "slowest hook implementations")
+        tr.write_line(f"{'own':>8} {'total':>8} {'calls':>8}  hook  plugin")
+        for t in timings:
+            tr.write_line(
+                f"{t.own:7.3f}s {t.total:7.3f}s {t.calls:8d}  {t.hook}  {t.plugin}"
+            )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_unconfigure(self, config: Config) -> None:
+        self._unwrap()
+        path = config.getoption("hook_durations_json")
+        if path is not None:
+            data = [dataclasses.asdict(t) for t in self.sorted_timings()]
+            json_path = Path(config.invocation_params.dir, path)
+            json_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
@@ -0,0 +1,364 @@
+"""Only collect the test files which import changed modules (--changed-since),
+from a static import graph of the Python files under the rootdir."""
+
+import ast
+from collections import defaultdict
+import os
+from pathlib import Path
+import subprocess
+from typing import DefaultDict
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from _pytest import nodes
+from _pytest._options.importgraph import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import hookimpl
+from _pytest.config import UsageError
+from _pytest.main import _in_venv
+from _pytest.pathlib import fnmatch_ex
+from _pytest.python import Module
+from _pytest.reports import CollectReport
+
+
+IMPORTS_KEY = "importgraph/imports"
+# Prefix of the plugins named by ``pytest_plugins`` in the imports of a file.
+PLUGIN_PREFIX = "pytest_plugins:"
+
+
+def pytest_configure(config: Config) -> None:
+    value = config.getoption("changed_since")
+    if value is None:
+        return
+    changed = changed_files(config, value)
+    config.pluginmanager.register(ChangedSincePlugin(config, changed), "changedsince")
+
+
+def _git(rootpath: Path, *args: str) -> List[str]:
+    try:
+        output = subprocess.run(
+            ["git", *args],
+            cwd=rootpath,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    except FileNotFoundError as e:
+        raise UsageError(f"--changed-since: could not run git: {e}") from None
+    except subprocess.CalledProcessError as e:
+        raise UsageError(
+            f"--changed-since: git {' '.join(args)} failed: {e.stderr.strip()}"
+        ) from None
+    return [line for line in output.splitlines() if line]
+
+
+def changed_files(config: Config, value: str) -> Set[str]:
+    """Return the changed files, relative to the rootdir, from the value of
+    --changed-since.
+
+    The value is a list of files if it contains a comma or names an existing
+    path, and a git ref otherwise.
+    """
+    rootpath = config.rootpath
+    invocation_dir = config.invocation_params.dir
+    if "," in value or (invocation_dir / value).exists():
+        paths = [
+            invocation_dir / name.strip() for name in value.split(",") if name.strip()
+        ]
+    else:
+        # Committed, staged and unstaged changes, and new files.
+        names = _git(rootpath, "diff", "--name-only", "--relative", value, "--")
+        names += _git(rootpath, "ls-files", "--others", "--exclude-standard")
+        paths = [rootpath / name for name in names]
+    changed = set()
+    for path in paths:
+        path = Path(os.path.abspath(path))
+        try:
+            changed.add(path.relative_to(rootpath).as_posix())
+        except ValueError:
+            # Outside of the rootdir: cannot be imported by the tests.
+            continue
+    return changed
+
+
+def should_recurse(config: Config, path: Path) -> bool:
+    """Return whether a directory may contain source files, i.e. is not a
+    ``__pycache__`` directory, a virtual environment or in ``norecursedirs``."""
+    return (
+        path.name != "__pycache__"
+        and not any(fnmatch_ex(pat, path) for pat in config.getini("norecursedirs"))
+        and not _in_venv(path)
+    )
+
+
+def walk_source_dirs(config: Config) -> Iterator[Tuple[str, List[str]]]:
+    """Yield the directories under the rootdir which may contain source
+    files, with the names of their files."""
+    for dirpath, dirnames, filenames in os.walk(config.rootpath):
+        dirnames[:] = sorted(
+            d for d in dirnames if should_recurse(config, Path(dirpath, d))
+        )
+        yield dirpath, filenames
+
+
+def parse_imports(source: bytes, filename: str) -> List[str]:
+    """Return the modules imported by a Python file, and the plugins it
+    requires through ``pytest_plugins``, prefixed with ``PLUGIN_PREFIX``.
+
+    Relative imports keep their leading dots. ``from x import y`` gives both
+    ``x`` and ``x.y``, as ``y`` may be a module.
+    """
+    tree = ast.parse(source, filename)
+    imports: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module or "")
+            imports.append(base)
+            sep = "" if base.endswith(".") else "."
+            imports.extend(
+                f"{base}{sep}{alias.name}" for alias in node.names if alias.name != "*"
+            )
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if not any(
+                isinstance(t, ast.Name) and t.id == "pytest_plugins" for t in targets
+            ):
+                continue
+            value = node.value
+            if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                imports.append(PLUGIN_PREFIX + value.value)
+            elif isinstance(value, (ast.List, ast.Tuple)):
+                imports.extend(
+                    PLUGIN_PREFIX + elt.value
+                    for elt in value.elts
+                    if isinstance(elt, ast.Constant) and isinstance(elt.value, str)
+                )
+    return sorted(set(imports))
+
+
+def _module_parts(name: str) -> Tuple[str, ...]:
+    """Return the dotted name parts a file can be imported as, from its
+    innermost directory outwards, e.g. ``("a", "b", "c")`` for ``a/b/c.py``
+    and ``("a", "b")`` for ``a/b/__init__.py``."""
+    parts = name[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return tuple(parts)
+
+
+class ImportGraph:
+    """The imports between the Python files under the rootdir.
+
+    The imports of each file are cached with its modification time and size,
+    so only the changed files are parsed again. Imports are resolved by
+    matching the dotted names against the trailing parts of the file paths,
+    which handles any ``sys.path`` layout at the cost of a few extra edges.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.rootpath = config.rootpath
+        #: Imports of each file, relative to the rootdir.
+        self.imports: Dict[str, List[str]] = {}
+        self._by_suffix: DefaultDict[Tuple[str, ...], Set[str]] = defaultdict(set)
+        self._files: Set[str] = set()
+
+    def _walk(self) -> Iterable[Tuple[str, os.stat_result]]:
+        for dirpath, filenames in walk_source_dirs(self.config):
+            for filename in filenames:
+                if not filename.endswith(".py"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield Path(path).relative_to(self.rootpath).as_posix(), st
+
+    def build(self, extra_files: Iterable[str] = ()) -> None:
+        """Scan the rootdir, parsing the files which changed since the cached
+        graph was saved.
+
+        ``extra_files`` are indexed without being parsed, so that imports of
+        deleted files still resolve.
+        """
+        cache = getattr(self.config, "cache", None)
+        cached = cache.get(IMPORTS_KEY, {}) if cache is not None else {}
+        if not isinstance(cached, dict):
+            cached = {}
+        entries = {}
+        dirty = False
+        for name, st in self._walk():
+            entry = cached.get(name)
+            if (
+                isinstance(entry, list)
+                and len(entry) == 3
+                and entry[:2] == [st.st_mtime_ns, st.st_size]
+            ):
+                imports = entry[2]
+            else:
+                dirty = True
+                try:
+                    imports = parse_imports((self.rootpath / name).read_bytes(), name)
+                except (OSError, SyntaxError, ValueError):
+                    imports = []
+            entries[name] = [st.st_mtime_ns, st.st_size, imports]
+            self.imports[name] = imports
+        if cache is not None and (dirty or len(entries) != len(cached)):
+            cache.set(IMPORTS_KEY, entries)
+        for name in (*self.imports, *extra_files):
+            if name.endswith(".py"):
+                self._files.add(name)
+                parts = _module_parts(name)
+                for i in range(len(parts)):
+                    self._by_suffix[parts[i:]].add(name)
+
+    def resolve(self, importer: str, name: str) -> Set[str]:
+        """Return the files which ``importer`` may load by importing
+        ``name``, including the ``__init__.py`` of the parent packages."""
+        if name.startswith("."):
+            level = len(name) - len(name.lstrip("."))
+            base = importer.split("/")[:-1]
+            if level > 1:
+                base = base[: max(len(base) - (level - 1), 0)]
+            rest = [part for part in name[level:].split(".") if part]
+            candidates = [
+                "/".join([*base, *rest[:i], "__init__.py"])
+                for i in range(len(rest) + 1)
+            ]
+            if rest:
+                candidates.append("/".join([*base, *rest]) + ".py")
+            return {c for c in candidates if c in self._files}
+        parts = tuple(name.split("."))
+        found = set()
+        for i in range(1, len(parts) + 1):
+            found.update(self._by_suffix.get(parts[:i], ()))
+        return found
+
+    def plugins(self) -> Set[str]:
+        """Return the files loaded as plugins through ``pytest_plugins``."""
+        plugins = set()
+        for importer, imports in self.imports.items():
+            for name in imports:
+                if name.startswith(PLUGIN_PREFIX):
+                    plugins.update(self.resolve(importer, name[len(PLUGIN_PREFIX) :]))
+        return plugins
+
+    def dependents(self) -> Dict[str, Set[str]]:
+        """Return the files which depend on each file.
+
+        A file depends on the files it imports, and on the ``__init__.py``
+        files of its own packages.
+        """
+        dependents: Dict[str, Set[str]] = defaultdict(set)
+        for importer, imports in self.imports.items():
+            for name in imports:
+                if name.startswith(PLUGIN_PREFIX):
+                    name = name[len(PLUGIN_PREFIX) :]
+                for imported in self.resolve(importer, name):
+                    dependents[imported].add(importer)
+            parts = importer.split("/")[:-1]
+            while parts:
+                init = "/".join([*parts, "__init__.py"])
+                if init not in self.imports:
+                    break
+                if init != importer:
+                    dependents[init].add(importer)
+                parts.pop()
+        return dependents
+
+    def dependencies(self) -> Dict[str, Set[str]]:
+        """Return the files each file depends on, the reverse of
+        :meth:`dependents`."""
+        dependencies: Dict[str, Set[str]] = defaultdict(set)
+        for imported, importers in self.dependents().items():
+            for importer in importers:
+                dependencies[importer].add(imported)
+        return dependencies
+
+    def affected(self, changed: Iterable[str]) -> Set[str]:
+        """Return the changed files and the files which depend on them,
+        directly or not."""
+        return reachable(self.dependents(), changed)
+
+
+def reachable(edges: Dict[str, Set[str]], start: Iterable[str]) -> Set[str]:
+    """Return the files of ``start`` and the files reachable from them
+    through ``edges``, such as :meth:`ImportGraph.dependents`."""
+    found = set(start)
+    todo = list(found)
+    while todo:
+        for name in edges.get(todo.pop(), ()):
+            if name not in found:
+                found.add(name)
+                todo.append(name)
+    return found
+
+
+class ChangedSincePlugin:
+    """Implements the --changed-since option."""
+
+    def __init__(self, config: Config, changed: Set[str]) -> None:
+        self.config = config
+        self.changed = changed
+        self.skipped_files = 0
+        self.run_all = False
+        inipath = config.inipath
+        if inipath is not None:
+            try:
+                ininame = inipath.relative_to(config.rootpath).as_posix()
+            except ValueError:
+                ininame = None
+            # A configuration change may affect any test.
+            self.run_all = ininame in changed
+        self.affected: Set[str] = set()
+        if not self.run_all:
+            graph = ImportGraph(config)
+            graph.build(extra_files=changed)
+            self.affected = graph.affected(changed)
+            # Plugins apply to the whole session, whichever file names them.
+            self.run_all = not self.affected.isdisjoint(graph.plugins())
+
+    def is_affected(self, path: Path) -> bool:
+        """Return whether a test file, or one of the conftest.py files which
+        apply to it, is affected."""
+        try:
+            parts = path.relative_to(self.config.rootpath).parts
+        except ValueError:
+            return True
+        if "/".join(parts) in self.affected:
+            return True
+        for i in range(len(parts)):
+            if "/".join([*parts[:i], "conftest.py"]) in self.affected:
+                return True
+        return False
+
+    @hookimpl
+    def pytest_make_collect_report(
+        self, collector: nodes.Collector
+    ) -> Optional[CollectReport]:
+        if self.run_all or not isinstance(collector, Module):
+            return None
+        if self.is_affected(collector.path):
+            return None
+        self.skipped_files += 1
+        return CollectReport(collector.nodeid, "passed", longrepr=None, result=[])
+
+    def pytest_report_collectionfinish(self) -> Optional[str]:
+        if self.config.getoption("verbose") < 0:
+            return None
+        if self.run_all:
+            return (
+                f"changed-since: {len(self.changed)} changed files, running all tests"
+            )
+        return (
+            f"changed-since: {len(self.changed)} changed files, "
+            f"skipped {self.skipped_files} unaffected test files"
+        )
@@ -9,7 +9,6 @@ https://github.com/jenkinsci/xunit-plugin/blob/master/src/main/resources/org/jen
 """
 
 from datetime import datetime
-import functools
 import os
 import platform
 import re
@@ -26,9 +25,8 @@ from _pytest import nodes
 from _pytest import timing
 from _pytest._code.code import ExceptionRepr
 from _pytest._code.code import ReprFileLocation
+from _pytest._options.junitxml import pytest_addoption as pytest_addoption
 from _pytest.config import Config
-from _pytest.config import filename_arg
-from _pytest.config.argparsing import Parser
 from _pytest.fixtures import FixtureRequest
 from _pytest.reports import TestReport
 from _pytest.stash import StashKey
@@ -380,53 +378,6 @@ def record_testsuite_property(request: FixtureRequest) -> Callable[[str, object]
     return record_func
 
 
-def pytest_addoption(parser: Parser) -> None:
-    group = parser.getgroup("terminal reporting")
-    group.addoption(
-        "--junitxml",
-        "--junit-xml",
-        action="store",
-        dest="xmlpath",
-        metavar="path",
-        type=functools.partial(filename_arg, optname="--junitxml"),
-        default=None,
-        help="Create junit-xml style report file at given path",
-    )
-    group.addoption(
-        "--junitprefix",
-        "--junit-prefix",
-        action="store",
-        metavar="str",
-        default=None,
-        help="Prepend prefix to classnames in junit-xml output",
-    )
-    parser.addini(
-        "junit_suite_name", "Test suite name for JUnit report", default="pytest"
-    )
-    parser.addini(
-        "junit_logging",
-        "Write captured log messages to JUnit report: "
-        "one of no|log|system-out|system-err|out-err|all",
-        default="no",
-    )
-    parser.addini(
-        "junit_log_passing_tests",
-        "Capture log information for passing tests to JUnit report: ",
-        type="bool",
-        default=True,
-    )
-    parser.addini(
-        "junit_duration_report",
-        "Duration time to report: one of total|call",
-        default="total",
-    )  # choices=['total', 'call'])
-    parser.addini(
-        "junit_family",
-        "Emit XML for schema: one of legacy|xunit1|xunit2",
-        default="xunit2",
-    )
-
-
 def pytest_configure(config: Config) -> None:
     xmlpath = config.option.xmlpath
     # Prevent opening xmllog on worker nodes (xdist).
@@ -0,0 +1,144 @@
+"""Lazy loading of the builtin plugins which only act on their own options.
+
+Such a plugin is registered as a :class:`LazyPlugin` stub, which adds the
+command line options and ini keys of the plugin from its module in
+:mod:`_pytest._options`, so that they are parsed and listed by ``--help`` as
+usual, and the plugin module is only imported once one of them is set, or one
+of its fixtures is requested.
+"""
+
+import sys
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+from _pytest.config.argparsing import Parser
+
+
+if TYPE_CHECKING:
+    from _pytest.config import Config
+    from _pytest.config import PytestPluginManager
+
+
+#: The builtin plugins loaded lazily, with the fixtures they define and the
+#: lazy plugins they need to be loaded with.
+lazy_plugins: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "junitxml": (
+        ("record_property", "record_xml_attribute", "record_testsuite_property"),
+        (),
+    ),
+    "pastebin": ((), ()),
+    "sharding": ((), ()),
+    "ordering": ((), ()),
+    "timebudget": ((), ()),
+    "affected": ((), ()),
+    "importgraph": ((), ()),
+    "daemon": ((), ()),
+    "watch": ((), ()),
+    # --setupplan works by setting the options of setuponly.
+    "setuponly": ((), ()),
+    "setupplan": ((), ("setuponly",)),
+    "leaks": ((), ()),
+    "profiler": ((), ()),
+    "hooktiming": ((), ()),
+    "startupprofile": ((), ()),
+    "precompile": ((), ()),
+}
+
+
+class LazyPlugin:
+    """Stand-in for a builtin plugin until it is needed.
+
+    It is registered under the name of the plugin, so it can be blocked with
+    ``-p no:name`` as usual, and replaced by the plugin module on
+    :meth:`load`.
+
+    Until then, ``pluginmanager.get_plugin(name)`` returns the stub, while
+    :meth:`PytestPluginManager.getplugin()
+    <_pytest.config.PytestPluginManager.getplugin>` loads the plugin and
+    returns its module.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.fixtures, self.requires = lazy_plugins[name]
+        #: Destination and default value of the options of the plugin.
+        self._options: Dict[str, object] = {}
+        #: Names of the ini keys of the plugin.
+        self._ini: List[str] = []
+
+    def __repr__(self) -> str:
+        return f"<LazyPlugin {self.name!r}>"
+
+    def pytest_addoption(self, parser: Parser) -> None:
+        def dests() -> Set[str]:
+            groups = [*parser._groups, parser._anonymous]
+            return {option.dest for group in groups for option in group.options}
+
+        before = dests()
+        ini_before = set(parser._inidict)
+        modname = "_pytest._options." + self.name
+        __import__(modname)
+        sys.modules[modname].pytest_addoption(parser)
+        for group in [*parser._groups, parser._anonymous]:
+            for option in group.options:
+                if option.dest not in before:
+                    self._options[option.dest] = getattr(option, "default", None)
+        self._ini = [name for name in parser._inidict if name not in ini_before]
+
+    def is_needed(self, config: "Config") -> bool:
+        """Whether one of the options or ini keys of the plugin is set."""
+        for dest, default in self._options.items():
+            value = getattr(config.option, dest, None)
+            if value is not None and value is not False and value != default:
+                return True
+        return any(
+            name in config.inicfg or config._get_override_ini_value(name) is not None
+            for name in self._ini
+        )
+
+    def load(self, pluginmanager: "PytestPluginManager") -> None:
+        """Replace the stub by the plugin module, and the stubs of the plugins
+        it requires by theirs."""
+        if pluginmanager.get_plugin(self.name) is not self:
+            return
+        pluginmanager.unregister(self)
+        # Like import_plugin(), but builtin plugins are not marked for
+        # assertion rewriting, which warns once the rewrite hook is active.
+        modname = "_pytest." + self.name
+        __import__(modname)
+        module = sys.modules[modname]
+        pluginmanager._lazily_loaded.add(module)
+        pluginmanager.register(module, self.name)
+        for name in self.requires:
+            plugin = pluginmanager.get_plugin(name)
+            if isinstance(plugin, LazyPlugin):
+                plugin.load(pluginmanager)
+
+
+def load_needed(config: "Config") -> None:
+    """Load the lazy plugins needed by the parsed options of ``config``.
+
+    All of them are loaded to list the fixtures, with ``--fixtures`` and
+    ``--fixtures-per-test``.
+    """
+    load_all = getattr(config.option, "showfixtures", False) or getattr(
+        config.option, "show_fixtures_per_test", False
+    )
+    for name in lazy_plugins:
+        plugin = config.pluginmanager.get_plugin(name)
+        if isinstance(plugin, LazyPlugin) and (load_all or plugin.is_needed(config)):
+            plugin.load(config.pluginmanager)
+
+
+def load_fixture_plugin(pluginmanager: "PytestPluginManager", argname: str) -> bool:
+    """Load the lazy plugin defining the fixture ``argname``, returning whether
+    there was one."""
+    for name, (fixtures, _) in lazy_plugins.items():
+        plugin = pluginmanager.get_plugin(name)
+        if isinstance(plugin, LazyPlugin) and argname in fixtures:
+            plugin.load(pluginmanager)
+            return True
+    return False
@@ -0,0 +1,260 @@
+"""Detection of resources leaked by tests (--track-leaks), read from /proc."""
+
+import contextlib
+import os
+import tempfile
+import threading
+from typing import Dict
+from typing import FrozenSet
+from typing import Generator
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Set
+import warnings
+
+from _pytest._options.leaks import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import hookimpl
+from _pytest.config import UsageError
+from _pytest.fixtures import FixtureDef
+from _pytest.nodes import Item
+from _pytest.runner import register_runtest_phase_context
+from _pytest.scope import Scope
+from _pytest.stash import StashKey
+from _pytest.warning_types import PytestResourceLeakWarning
+
+
+LEAK_KINDS = ("fds", "threads", "children", "tmpfiles")
+
+leak_snapshot_key = StashKey["LeakSnapshot"]()
+
+
+def parse_leak_kinds(value: str) -> FrozenSet[str]:
+    kinds = {kind.strip() for kind in value.split(",") if kind.strip()}
+    if "all" in kinds:
+        kinds.discard("all")
+        kinds.update(LEAK_KINDS)
+    unknown = sorted(kinds.difference(LEAK_KINDS))
+    if unknown:
+        raise UsageError(
+            "--track-leaks: unknown kind(s) {}, expected some of: {}".format(
+                ", ".join(unknown), ", ".join(LEAK_KINDS)
+            )
+        )
+    if not kinds:
+        raise UsageError("--track-leaks: no kind given")
+    return frozenset(kinds)
+
+
+def pytest_configure(config: Config) -> None:
+    value = config.getoption("track_leaks")
+    if value is None:
+        return
+    kinds = parse_leak_kinds(value)
+    if not os.path.isdir("/proc/self"):
+        raise UsageError("--track-leaks requires a /proc filesystem (Linux)")
+    tracker = LeakTracker(kinds)
+    config.pluginmanager.register(tracker, "leaktracker")
+    register_runtest_phase_context(config, tracker.phase)
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _readlink(path: str) -> str:
+    try:
+        return os.readlink(path)
+    except OSError:
+        return "?"
+
+
+def _open_fds() -> FrozenSet[str]:
+    fds = []
+    for fd in _listdir("/proc/self/fd"):
+        # Skip the descriptor used for the listing itself, closed by now.
+        try:
+            os.fstat(int(fd))
+        except OSError:
+            continue
+        fds.append(fd)
+    return frozenset(fds)
+
+
+def _comm(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return "?"
+
+
+def _child_pids() -> Set[int]:
+    pids: Set[int] = set()
+    found = False
+    for tid in _listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{tid}/children", encoding="ascii") as f:
+                pids.update(int(pid) for pid in f.read().split())
+            found = True
+        except (OSError, ValueError):
+            pass
+    if found:
+        return pids
+    # Kernels without CONFIG_PROC_CHILDREN: scan the parent of every process.
+    mypid = os.getpid()
+    for entry in _listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name is in parentheses and may contain spaces.
+        fields = stat[stat.rfind(")") + 2 :].split()
+        if len(fields) > 1 and fields[1] == str(mypid):
+            pids.add(int(entry))
+    return pids
+
+
+class LeakSnapshot:
+    """The resources held by the process at the start of a test."""
+
+    def __init__(self, kinds: FrozenSet[str]) -> None:
+        self.fds: FrozenSet[str] = frozenset()
+        self.threads: FrozenSet[threading.Thread] = frozenset()
+        self.tids: FrozenSet[str] = frozenset()
+        self.children: FrozenSet[int] = frozenset()
+        self.tmpfiles: FrozenSet[str] = frozenset()
+        if "fds" in kinds:
+            self.fds = _open_fds()
+        if "threads" in kinds:
+            self.threads = frozenset(threading.enumerate())
+            self.tids = frozenset(_listdir("/proc/self/task"))
+        if "children" in kinds:
+            self.children = frozenset(_child_pids())
+        if "tmpfiles" in kinds:
+            self.tmpfiles = frozenset(_listdir(tempfile.gettempdir()))
+
+    def acquired_since(self, before: "LeakSnapshot") -> "LeakSnapshot":
+        """Return the resources of this snapshot which ``before`` lacks."""
+        acquired = LeakSnapshot(frozenset())
+        acquired.fds = self.fds - before.fds
+        acquired.threads = self.threads - before.threads
+        acquired.tids = self.tids - before.tids
+        acquired.children = self.children - before.children
+        acquired.tmpfiles = self.tmpfiles - before.tmpfiles
+        return acquired
+
+
+class LeakTracker:
+    """Snapshots the resources of the process when a test starts its setup
+    and warns about the ones left over at the end of its teardown.
+
+    The resources acquired by the setup of a fixture of a higher scope than
+    function belong to that fixture until it is torn down, so they are not
+    reported as leaks of the test which first used it.
+
+    Only directory listings of /proc are read for the common case of no leak,
+    so the check stays cheap enough to leave on for whole test suites.
+    """
+
+    def __init__(self, kinds: FrozenSet[str]) -> None:
+        self.kinds = kinds
+        #: Resources acquired by the setup of the active higher-scoped fixtures.
+        self.owned: Dict[FixtureDef[object], LeakSnapshot] = {}
+
+    @hookimpl(wrapper=True)
+    def pytest_fixture_setup(
+        self, fixturedef: FixtureDef[object]
+    ) -> Generator[None, object, object]:
+        if fixturedef._scope is Scope.Function:
+            return (yield)
+        before = LeakSnapshot(self.kinds)
+        try:
+            return (yield)
+        finally:
+            after = LeakSnapshot(self.kinds)
+            self.owned[fixturedef] = after.acquired_since(before)
+
+    def pytest_fixture_post_finalizer(self, fixturedef: FixtureDef[object]) -> None:
+        # Whatever the fixture left behind is now leaked by the test in
+        # whose teardown it was torn down.
+        self.owned.pop(fixturedef, None)
+
+    def leaks(self, before: LeakSnapshot) -> Dict[str, List[str]]:
+        """Return the descriptions of the resources acquired since
+        ``before``, by kind, except those owned by active fixtures."""
+        after = LeakSnapshot(self.kinds)
+        for owned in self.owned.values():
+            after = after.acquired_since(owned)
+        found: Dict[str, List[str]] = {}
+        if "fds" in self.kinds:
+            fds = [
+                f"{fd} -> {_readlink(f'/proc/self/fd/{fd}')}"
+                for fd in sorted(after.fds - before.fds, key=int)
+            ]
+            if fds:
+                found["fds"] = fds
+        if "threads" in self.kinds:
+            new_threads = [t for t in after.threads - before.threads if t.is_alive()]
+            threads = [repr(t) for t in sorted(new_threads, key=lambda t: t.name)]
+            python_tids = {
+                str(t.native_id) for t in after.threads if t.native_id is not None
+            }
+            for tid in sorted(after.tids - before.tids - python_tids, key=int):
+                comm = _comm(f"/proc/self/task/{tid}/comm")
+                if comm != "?":
+                    threads.append(f"native thread {tid} ({comm})")
+            if threads:
+                found["threads"] = threads
+        if "children" in self.kinds:
+            children = [
+                f"pid {pid} ({_comm(f'/proc/{pid}/comm')})"
+                for pid in sorted(after.children - before.children)
+            ]
+            if children:
+                found["children"] = children
+        if "tmpfiles" in self.kinds:
+            tmpdir = tempfile.gettempdir()
+            tmpfiles = [
+                os.path.join(tmpdir, name)
+                for name in sorted(after.tmpfiles - before.tmpfiles)
+                if not name.startswith("pytest-of-")
+            ]
+            if tmpfiles:
+                found["tmpfiles"] = tmpfiles
+        return found
+
+    @contextlib.contextmanager
+    def phase(
+        self, item: Item, when: Literal["setup", "call", "teardown"]
+    ) -> Generator[None, None, None]:
+        if when == "setup":
+            item.stash[leak_snapshot_key] = LeakSnapshot(self.kinds)
+        yield
+        if when != "teardown":
+            return
+        before: Optional[LeakSnapshot] = item.stash.get(leak_snapshot_key, None)
+        if before is None:
+            return
+        del item.stash[leak_snapshot_key]
+        found = self.leaks(before)
+        if found:
+            lines = [f"{item.nodeid} leaked resources:"]
+            for kind, descriptions in found.items():
+                lines.extend(f"  {kind}: {description}" for description in descriptions)
+            # Raised within the teardown phase, so that turning the warning
+            # into an error fails the teardown of the test.
+            lineno = item.location[1]
+            warnings.warn_explicit(
+                PytestResourceLeakWarning("\n".join(lines)),
+                PytestResourceLeakWarning,
+                filename=str(item.path),
+                lineno=0 if lineno is None else lineno + 1,
+            )
@@ -847,7 +847,19 @@ class LoggingPlugin:
     def pytest_runtest_call(self, item: nodes.Item) -> Generator[None, None, None]:
         self.log_cli_handler.set_when("call")
 
-        yield from self._runtest_for(item, "call")
+        if caplog_records_key in item.stash:
+            yield from self._runtest_for(item, "call")
+            return
+
+        # The item shares the setup of another item, as the cases of a
+        # batch do (see _pytest.batch).
+        empty: Dict[str, List[logging.LogRecord]] = {}
+        item.stash[caplog_records_key] = empty
+        try:
+            yield from self._runtest_for(item, "call")
+        finally:
+            del item.stash[caplog_records_key]
+            del item.stash[caplog_handler_key]
 
     @hookimpl(wrapper=True)
     def pytest_runtest_teardown(self, item: nodes.Item) -> Generator[None, None, None]:
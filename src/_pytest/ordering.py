@@ -0,0 +1,91 @@
+"""Reorder the collected tests from their expected durations (--order)."""
+
+from typing import Callable
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from _pytest._options.ordering import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.fixtures import get_parametrized_fixture_keys
+from _pytest.history import expected_duration_key
+from _pytest.history import stash_expected_durations
+from _pytest.nodes import Item
+from _pytest.nodes import Node
+from _pytest.python import Class
+from _pytest.python import Module
+from _pytest.python import Package
+from _pytest.scope import Scope
+import pytest
+
+
+def _node_scope(node: Node) -> Optional[Scope]:
+    if isinstance(node, Class):
+        return Scope.Class
+    if isinstance(node, Module):
+        return Scope.Module
+    if isinstance(node, Package):
+        return Scope.Package
+    return None
+
+
+def _level_key(item: Item, chain: Sequence[Node], level: int) -> Hashable:
+    """Return the key of the group of ``item`` at ``level`` of the ordering.
+
+    Level 0 groups by session-scoped fixture parameters; the following levels
+    by the collectors of the item, together with the fixture parameters of
+    their scope, and the last level by item.
+    """
+    if level == 0:
+        return tuple(get_parametrized_fixture_keys(item, Scope.Session))
+    # chain[0] is the session and chain[-1] the item itself.
+    if level >= len(chain) - 1:
+        return item
+    node = chain[level]
+    scope = _node_scope(node)
+    if scope is None:
+        return node
+    return (node, tuple(get_parametrized_fixture_keys(item, scope)))
+
+
+def order_by_cost(items: Sequence[Item], cost: Callable[[Item], float]) -> List[Item]:
+    """Order ``items`` costliest first, while keeping together the items
+    which share a collector or a higher-scoped fixture parameter.
+
+    The items are expected to be grouped as done by ``reorder_items``: runs of
+    consecutive items in the same group are reordered as a whole, from the
+    total cost of their items, so no fixture gets set up more often than in
+    the original order. Ties keep the original order.
+    """
+    chains = {item: item.listchain() for item in items}
+    costs = {item: cost(item) for item in items}
+
+    def order(group: List[Item], level: int) -> List[Item]:
+        if len(group) <= 1:
+            return group
+        runs: List[List[Item]] = []
+        last_key: Hashable = object()
+        for item in group:
+            key = _level_key(item, chains[item], level)
+            if not runs or key != last_key:
+                runs.append([])
+                last_key = key
+            runs[-1].append(item)
+        if len(runs) == 1:
+            return order(group, level + 1)
+        runs = [order(run, level + 1) for run in runs]
+        runs.sort(key=lambda run: -sum(costs[item] for item in run))
+        return [item for run in runs for item in run]
+
+    return order(list(items), 0)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(items: List[Item], config: Config) -> None:
+    if config.getoption("order") != "duration":
+        return
+    if not stash_expected_durations(config, items):
+        # No history to order by.
+        return
+    items[:] = order_by_cost(items, lambda item: item.stash[expected_duration_key])
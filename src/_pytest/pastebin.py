@@ -6,9 +6,9 @@ import tempfile
 from typing import IO
 from typing import Union
 
+from _pytest._options.pastebin import pytest_addoption as pytest_addoption
 from _pytest.config import Config
 from _pytest.config import create_terminal_writer
-from _pytest.config.argparsing import Parser
 from _pytest.stash import StashKey
 from _pytest.terminal import TerminalReporter
 import pytest
@@ -17,19 +17,6 @@ import pytest
 pastebinfile_key = StashKey[IO[bytes]]()
 
 
-def pytest_addoption(parser: Parser) -> None:
-    group = parser.getgroup("terminal reporting")
-    group._addoption(
-        "--pastebin",
-        metavar="mode",
-        action="store",
-        dest="pastebin",
-        default=None,
-        choices=["failed", "all"],
-        help="Send failed|all info to bpaste.net pastebin service",
-    )
-
-
 @pytest.hookimpl(trylast=True)
 def pytest_configure(config: Config) -> None:
     if config.option.pastebin == "all":
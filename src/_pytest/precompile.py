@@ -0,0 +1,220 @@
+"""Rewrite the asserts of the test modules and conftest.py files ahead of
+their collection, in a process pool (--precompile).
+
+The rewritten modules are cached as usual by the assertion rewriting hook,
+in their pycs or the rewrite archive, which it then only loads on import.
+"""
+
+from concurrent.futures.process import ProcessPoolExecutor
+import dataclasses
+import functools
+import marshal
+import os
+from pathlib import Path
+import sys
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from _pytest._options.precompile import pytest_addoption as pytest_addoption
+from _pytest.assertion.rewrite import _archive_key
+from _pytest.assertion.rewrite import _locate_pyc
+from _pytest.assertion.rewrite import _read_pyc
+from _pytest.assertion.rewrite import _rewrite_key
+from _pytest.assertion.rewrite import _rewrite_test
+from _pytest.assertion.rewrite import _write_pyc
+from _pytest.assertion.rewrite import AssertionRewritingHook
+from _pytest.assertion.rewrite import assertstate_key
+from _pytest.assertion.rewrite import REWRITE_INI
+from _pytest.assertion.rewrite import try_makedirs
+from _pytest.config import Config
+from _pytest.config import ExitCode
+from _pytest.config import hookimpl
+from _pytest.config import UsageError
+from _pytest.main import _in_venv
+from _pytest.main import Session
+from _pytest.pathlib import absolutepath
+from _pytest.pathlib import CouldNotResolvePathError
+from _pytest.pathlib import fnmatch_ex
+from _pytest.pathlib import resolve_pkg_root_and_module_name
+from _pytest.pathlib import visit
+
+
+@hookimpl(tryfirst=True)
+def pytest_cmdline_main(config: Config) -> Optional[Union[int, ExitCode]]:
+    if config.option.precompile:
+        from _pytest.main import wrap_session
+
+        assertstate = config.stash.get(assertstate_key, None)
+        if assertstate is None or assertstate.hook is None:
+            raise UsageError("--precompile requires --assert=rewrite")
+        if sys.dont_write_bytecode:
+            raise UsageError(
+                "--precompile cannot cache the rewritten modules, "
+                "as writing bytecode is disabled (PYTHONDONTWRITEBYTECODE)"
+            )
+
+        return wrap_session(config, _precompile_main)
+    return None
+
+
+def _precompile_main(config: Config, session: Session) -> None:
+    found, rewritten = precompile(config)
+    config.get_terminal_writer().line(
+        f"rewrote {rewritten} of {found} modules, the others were cached"
+    )
+
+
+@hookimpl(trylast=True)
+def pytest_sessionstart(session: Session) -> None:
+    config = session.config
+    if config.getini("assert_rewrite_precompile") and not config.option.precompile:
+        precompile(config)
+
+
+@dataclasses.dataclass
+class RewriteSettings:
+    """What the worker processes need to rewrite and cache modules like the
+    assertion rewriting hook of the config."""
+
+    #: The values of the ini options the rewritten code depends on, as
+    #: :func:`_rewrite_test` only reads those from the config.
+    ini: Dict[str, object]
+    pyc_dir: Optional[Path]
+    rewrite_key: Optional[bytes]
+
+    def getini(self, name: str) -> object:
+        return self.ini[name]
+
+    def trace(self, message: str) -> None:
+        """Stand-in for the trace of the assertion state when writing pycs."""
+
+
+def precompile(config: Config) -> Tuple[int, int]:
+    """Rewrite the modules found by :func:`find_modules` whose pycs are not
+    cached, in a process pool.
+
+    Return the number of modules found and of modules rewritten.
+    """
+    assertstate = config.stash.get(assertstate_key, None)
+    hook = assertstate.hook if assertstate is not None else None
+    if hook is None or sys.dont_write_bytecode:
+        return 0, 0
+    found = list(find_modules(config, hook))
+    archive = hook._archive
+    stale = []
+    for fn in found:
+        if archive is not None:
+            key = _archive_key(fn, hook._rewrite_key, hook._config_key)[0]
+            cached = key in archive
+        else:
+            pyc, _, source_hash = _locate_pyc(fn, hook._pyc_dir, hook._rewrite_key)
+            cached = _read_pyc(fn, pyc, assertstate.trace, source_hash) is not None
+        if not cached:
+            stale.append(fn)
+    assertstate.trace(f"precompiling {len(stale)} of {len(found)} modules")
+
+    settings = RewriteSettings(
+        {name: config.getini(name) for name in REWRITE_INI},
+        hook._pyc_dir,
+        hook._rewrite_key,
+    )
+    rewrite: Callable[[Path], object] = functools.partial(
+        rewrite_module if archive is None else rewrite_archived_module, settings
+    )
+    workers = min(len(stale), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [rewrite(fn) for fn in stale]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            chunksize = max(1, len(stale) // (workers * 4))
+            results = list(executor.map(rewrite, stale, chunksize=chunksize))
+    if archive is not None:
+        # Saved with the modules rewritten during the session.
+        for fn, result in zip(stale, results):
+            if result is not None:
+                key, data = result  # type: ignore[misc]
+                archive.add(key, str(fn), data)
+    return len(found), sum(1 for result in results if result)
+
+
+def find_modules(config: Config, hook: AssertionRewritingHook) -> Iterator[Path]:
+    """Yield the files in the paths of ``config.args`` which the hook would
+    rewrite on import and has not imported yet: the test modules, conftest.py
+    files and modules marked for rewrite, and the files given explicitly."""
+    state = config.stash[assertstate_key]
+    norecursedirs = config.getini("norecursedirs")
+
+    def recurse(entry: "os.DirEntry[str]") -> bool:
+        path = Path(entry.path)
+        return (
+            entry.name != "__pycache__"
+            and not _in_venv(path)
+            and not any(fnmatch_ex(pat, path) for pat in norecursedirs)
+        )
+
+    seen = set(hook._rewritten_names.values())
+    for arg in config.args:
+        path = absolutepath(config.invocation_params.dir / arg.split("::")[0])
+        files: List[Path]
+        if path.is_file():
+            files = [path]
+        elif path.is_dir():
+            files = [Path(e.path) for e in visit(path, recurse) if e.is_file()]
+        else:
+            continue
+        for fn in files:
+            if fn.suffix != ".py" or fn in seen:
+                continue
+            seen.add(fn)
+            if fn == path or hook._should_rewrite(_module_name(fn), str(fn), state):
+                yield fn
+
+
+def _module_name(fn: Path) -> str:
+    try:
+        return resolve_pkg_root_and_module_name(fn)[1]
+    except CouldNotResolvePathError:
+        return fn.stem
+
+
+def rewrite_module(settings: RewriteSettings, fn: Path) -> bool:
+    """Rewrite ``fn`` and cache its pyc, returning whether it was written.
+
+    Run in the worker processes. Modules which fail to rewrite are left for
+    their import to report the error.
+    """
+    try:
+        pyc, source, source_hash = _locate_pyc(
+            fn, settings.pyc_dir, settings.rewrite_key
+        )
+        if not try_makedirs(pyc.parent):
+            return False
+        source_stat, co = _rewrite_test(fn, settings, source)  # type: ignore[arg-type]
+    except (OSError, SyntaxError, ValueError):
+        return False
+    return _write_pyc(settings, co, source_stat, pyc, source_hash)  # type: ignore[arg-type]
+
+
+def rewrite_archived_module(
+    settings: RewriteSettings, fn: Path
+) -> Optional[Tuple[bytes, bytes]]:
+    """Rewrite ``fn``, returning its key in the rewrite archive and its
+    marshalled code, for the main process to add them to the archive.
+
+    Run in the worker processes, like :func:`rewrite_module`.
+    """
+    try:
+        key, source = _archive_key(
+            fn,
+            settings.rewrite_key,
+            _rewrite_key(settings),  # type: ignore[arg-type]
+        )
+        _, co = _rewrite_test(fn, settings, source)  # type: ignore[arg-type]
+    except (OSError, SyntaxError, ValueError):
+        return None
+    return key, marshal.dumps(co)
@@ -0,0 +1,188 @@
+"""Low-overhead sampling profiler attributing samples to tests (--profile-sample)."""
+
+from collections import Counter
+import contextlib
+import hashlib
+import os
+from pathlib import Path
+import re
+import signal
+from types import CodeType
+from types import FrameType
+from typing import Any
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Tuple
+
+from _pytest._options.profiler import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import UsageError
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.runner import register_runtest_phase_context
+from _pytest.terminal import TerminalReporter
+import pytest
+
+
+# Label of samples taken outside of any test phase (startup, collection...).
+SESSION_LABEL = "<session>"
+
+
+def pytest_configure(config: Config) -> None:
+    hz = config.getoption("profile_sample")
+    if hz is None:
+        return
+    if hz <= 0:
+        raise UsageError(f"--profile-sample must be a positive integer, got {hz}")
+    if not hasattr(signal, "setitimer") or not hasattr(signal, "SIGPROF"):
+        raise UsageError("--profile-sample is not supported on this platform")
+    if hasattr(config, "workerinput"):
+        # Each xdist worker profiles the tests it runs into its own directory.
+        subdir: Optional[str] = config.workerinput["workerid"]  # type: ignore[attr-defined]
+    else:
+        subdir = None
+    outdir = Path(config.invocation_params.dir, config.getoption("profile_sample_dir"))
+    if subdir is not None:
+        outdir = outdir / subdir
+    profiler = SamplingProfiler(config, hz, outdir)
+    register_runtest_phase_context(config, profiler.phase)
+    config.pluginmanager.register(profiler, "sampling-profiler")
+
+
+def format_code(code: CodeType) -> str:
+    """Format a code object as a frame of a collapsed stack."""
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def profile_filename(nodeid: str) -> str:
+    """Return the name of the collapsed stacks file of the given test."""
+    name = re.sub(r"[^\w.-]+", "_", nodeid).strip("_")[:100]
+    digest = hashlib.sha1(nodeid.encode("utf-8")).hexdigest()[:8]
+    return f"{name}-{digest}.collapsed"
+
+
+class SamplingProfiler:
+    """Samples the Python stack on SIGPROF and records the samples against the
+    running test and phase.
+
+    The signal handler only walks the frames and counts the tuple of code
+    objects; formatting is deferred to the end of the session.
+    """
+
+    def __init__(self, config: Config, hz: int, outdir: Path) -> None:
+        self.config = config
+        self.interval = 1.0 / hz
+        self.outdir = outdir
+        self.top = config.getoption("profile_sample_top")
+        self._label: Tuple[str, str] = (SESSION_LABEL, "")
+        # (nodeid, phase) -> stack -> count.
+        self._samples: Dict[Tuple[str, str], Counter[Tuple[CodeType, ...]]] = {}
+        self._old_handler: Any = None
+        self._running = False
+
+    def _sample(self, signum: int, frame: Optional[FrameType]) -> None:
+        codes: List[CodeType] = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        samples = self._samples.get(self._label)
+        if samples is None:
+            samples = self._samples[self._label] = Counter()
+        samples[tuple(codes)] += 1
+
+    def start(self) -> None:
+        try:
+            self._old_handler = signal.signal(signal.SIGPROF, self._sample)
+        except ValueError as e:
+            # Not called from the main thread.
+            raise UsageError(f"--profile-sample cannot be used here: {e}") from e
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self._running = True
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._old_handler)
+        self._running = False
+
+    @contextlib.contextmanager
+    def phase(
+        self, item: Item, when: Literal["setup", "call", "teardown"]
+    ) -> Generator[None, None, None]:
+        previous = self._label
+        self._label = (item.nodeid, when)
+        try:
+            yield
+        finally:
+            self._label = previous
+
+    def samples_per_test(self) -> Dict[str, int]:
+        """Return the number of samples of each test, over all its phases."""
+        counts: Dict[str, int] = {}
+        for (nodeid, _), samples in self._samples.items():
+            if nodeid != SESSION_LABEL:
+                counts[nodeid] = counts.get(nodeid, 0) + sum(samples.values())
+        return counts
+
+    def write(self) -> None:
+        """Write the collapsed stacks of each test and of the whole session."""
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        labels: Dict[CodeType, str] = {}
+
+        def collapse(stack: Tuple[CodeType, ...]) -> str:
+            frames = []
+            for code in stack:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = format_code(code).replace(";", ":")
+                frames.append(label)
+            return ";".join(frames)
+
+        per_test: Dict[str, List[str]] = {}
+        session_total: Counter[str] = Counter()
+        for (nodeid, when), samples in self._samples.items():
+            lines = per_test.setdefault(nodeid, [])
+            for stack, count in samples.items():
+                collapsed = collapse(stack)
+                session_total[collapsed] += count
+                if nodeid != SESSION_LABEL:
+                    lines.append(f"{when};{collapsed} {count}")
+        for nodeid, lines in per_test.items():
+            if nodeid == SESSION_LABEL or not lines:
+                continue
+            path = self.outdir / profile_filename(nodeid)
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        path = self.outdir / "session.collapsed"
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in session_total.items()),
+            encoding="utf-8",
+        )
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionstart(self, session: Session) -> None:
+        self.start()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: Session) -> None:
+        self.stop()
+        self.write()
+
+    def pytest_unconfigure(self) -> None:
+        self.stop()
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        tr = terminalreporter
+        counts = self.samples_per_test()
+        total = sum(sum(samples.values()) for samples in self._samples.values())
+        tr.write_sep("=", f"sampled profile: top {self.top} tests")
+        for nodeid, count in sorted(counts.items(), key=lambda x: -x[1])[: self.top]:
+            tr.write_line(f"{count * self.interval:.2f}s {count:>7} samples {nodeid}")
+        tr.write_line(
+            f"{total} samples at {1 / self.interval:g} Hz written to "
+            f"{os.path.relpath(self.outdir, self.config.invocation_params.dir)}"
+        )
@@ -268,6 +268,7 @@ class TestReport(BaseReport):
         start: float = 0,
         stop: float = 0,
         user_properties: Optional[Iterable[Tuple[str, object]]] = None,
+        resources: Optional[Mapping[str, Optional[float]]] = None,
         **extra,
     ) -> None:
         #: Normalized collection nodeid.
@@ -311,6 +312,12 @@ class TestReport(BaseReport):
         #: The system time when the call ended, in seconds since the epoch.
         self.stop: float = stop
 
+        #: The resources used by the phase if ``--resource-usage`` is enabled,
+        #: as a dict with the fields of ``CallInfo.resources``, otherwise None.
+        #:
+        #: .. versionadded:: 8.2
+        self.resources = dict(resources) if resources is not None else None
+
         self.__dict__.update(extra)
 
     def __repr__(self) -> str:
@@ -379,6 +386,7 @@ class TestReport(BaseReport):
             start,
             stop,
             user_properties=item.user_properties,
+            resources=call.resources.to_dict() if call.resources else None,
         )
 
 
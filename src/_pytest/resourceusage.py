@@ -0,0 +1,128 @@
+"""Per-phase resource accounting of tests (CPU time, RSS growth, GC pauses)."""
+
+import dataclasses
+import gc
+import sys
+import time
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from _pytest import timing
+
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows.
+    resource = None  # type: ignore[assignment]
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceUsage:
+    """Resources used by a test phase, recorded with ``--resource-usage``."""
+
+    #: CPU time spent in user mode, in seconds.
+    cpu_user: float
+    #: CPU time spent in system mode, in seconds.
+    cpu_system: float
+    #: Growth of the peak resident set size of the process, in bytes.
+    #: Zero where not available.
+    maxrss_delta: int
+    #: Number of garbage collections.
+    gc_collections: int
+    #: Time spent in garbage collections, in seconds.
+    gc_pause: float
+    #: Peak size of the memory blocks traced by :mod:`tracemalloc`, in bytes,
+    #: if ``--resource-usage-tracemalloc`` is given.
+    tracemalloc_peak: Optional[int] = None
+
+    @property
+    def cpu(self) -> float:
+        """Total CPU time, in seconds."""
+        return self.cpu_user + self.cpu_system
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return dataclasses.asdict(self)
+
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class ResourceMeter:
+    """Takes snapshots of the process resource counters.
+
+    Garbage collections are tracked through :data:`gc.callbacks` while the
+    meter is started.
+    """
+
+    def __init__(self, trace_malloc: bool = False) -> None:
+        self.trace_malloc = trace_malloc
+        self.gc_collections = 0
+        self.gc_pause = 0.0
+        self._gc_start: Optional[float] = None
+        self._started_tracemalloc = False
+
+    def _gc_callback(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._gc_start = timing.perf_counter()
+        elif self._gc_start is not None:
+            self.gc_collections += 1
+            self.gc_pause += timing.perf_counter() - self._gc_start
+            self._gc_start = None
+
+    def start(self) -> None:
+        gc.callbacks.append(self._gc_callback)
+        if self.trace_malloc:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _counters(self) -> Tuple[float, float, int, int, float]:
+        if resource is None:
+            return (time.process_time(), 0.0, 0, self.gc_collections, self.gc_pause)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return (
+            usage.ru_utime,
+            usage.ru_stime,
+            usage.ru_maxrss,
+            self.gc_collections,
+            self.gc_pause,
+        )
+
+    def snapshot(self) -> Tuple[float, float, int, int, float]:
+        """Return the current counters, to be passed to :meth:`since`."""
+        if self.trace_malloc and sys.version_info >= (3, 9):
+            import tracemalloc
+
+            tracemalloc.reset_peak()
+        return self._counters()
+
+    def since(self, snapshot: Tuple[float, float, int, int, float]) -> ResourceUsage:
+        """Return the resources used since ``snapshot`` was taken."""
+        tracemalloc_peak = None
+        if self.trace_malloc:
+            import tracemalloc
+
+            tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+        user, system, maxrss, gc_collections, gc_pause = self._counters()
+        return ResourceUsage(
+            cpu_user=user - snapshot[0],
+            cpu_system=system - snapshot[1],
+            maxrss_delta=(maxrss - snapshot[2]) * _MAXRSS_UNIT,
+            gc_collections=gc_collections - snapshot[3],
+            gc_pause=gc_pause - snapshot[4],
+            tracemalloc_peak=tracemalloc_peak,
+        )
@@ -2,11 +2,13 @@
 """Basic collect and runtest protocol implementations."""
 
 import bdb
+import contextlib
 import dataclasses
 import os
 import sys
 from typing import Callable
 from typing import cast
+from typing import ContextManager
 from typing import Dict
 from typing import final
 from typing import Generic
@@ -27,6 +29,7 @@ from _pytest import timing
 from _pytest._code.code import ExceptionChainRepr
 from _pytest._code.code import ExceptionInfo
 from _pytest._code.code import TerminalRepr
+from _pytest.config import Config
 from _pytest.config.argparsing import Parser
 from _pytest.deprecated import check_ispytest
 from _pytest.nodes import Collector
@@ -37,6 +40,9 @@ from _pytest.outcomes import Exit
 from _pytest.outcomes import OutcomeException
 from _pytest.outcomes import Skipped
 from _pytest.outcomes import TEST_OUTCOME
+from _pytest.resourceusage import ResourceMeter
+from _pytest.resourceusage import ResourceUsage
+from _pytest.stash import StashKey
 
 
 if sys.version_info[:2] < (3, 11):
@@ -46,6 +52,34 @@ if TYPE_CHECKING:
     from _pytest.main import Session
     from _pytest.terminal import TerminalReporter
 
+resource_meter_key = StashKey[ResourceMeter]()
+
+#: Context manager factories entered around every runtest phase, see
+#: :func:`register_runtest_phase_context`.
+runtest_phase_contexts_key = StashKey[
+    List[Callable[[Item, Literal["setup", "call", "teardown"]], ContextManager[None]]]
+]()
+
+
+def register_runtest_phase_context(
+    config: Config,
+    factory: Callable[
+        [Item, Literal["setup", "call", "teardown"]], ContextManager[None]
+    ],
+) -> None:
+    """Register a context manager factory entered around each runtest phase.
+
+    ``factory(item, when)`` is called for the setup, call and teardown phases
+    of every item, and the context manager it returns wraps the corresponding
+    ``pytest_runtest_*`` hook call. Exceptions raised on exit are reported as
+    part of the phase, like exceptions raised by the hook itself.
+
+    This is a cheaper alternative to implementing the three runtest hooks as
+    hook wrappers, for plugins which only need to wrap every phase.
+    """
+    config.stash.setdefault(runtest_phase_contexts_key, []).append(factory)
+
+
 #
 # pytest plugin hooks.
 
@@ -69,11 +103,75 @@ def pytest_addoption(parser: Parser) -> None:
         help="Minimal duration in seconds for inclusion in slowest list. "
         "Default: 0.005.",
     )
+    group.addoption(
+        "--durations-by",
+        action="store",
+        default="wall",
+        choices=["wall", "cpu", "rss", "gc"],
+        help="Sort --durations by wall time (the default), CPU time, peak RSS "
+        "growth or GC pause time. Implies --resource-usage unless wall.",
+    )
+    group.addoption(
+        "--resource-usage",
+        action="store_true",
+        default=False,
+        help="Record the CPU time, peak RSS growth and garbage collections of "
+        "each test phase in the test reports",
+    )
+    group.addoption(
+        "--resource-usage-tracemalloc",
+        action="store_true",
+        default=False,
+        help="Also record the tracemalloc peak of each test phase. "
+        "Implies --resource-usage.",
+    )
+
+
+def pytest_configure(config: Config) -> None:
+    trace_malloc = config.getoption("resource_usage_tracemalloc")
+    if (
+        config.getoption("resource_usage")
+        or trace_malloc
+        or config.getoption("durations_by") != "wall"
+    ):
+        meter = ResourceMeter(trace_malloc=trace_malloc)
+        meter.start()
+        config.stash[resource_meter_key] = meter
+        config.add_cleanup(meter.stop)
+
+
+def _duration_cost(rep: TestReport, durations_by: str) -> float:
+    """Return the cost of a report by which ``--durations`` sorts."""
+    if durations_by == "wall":
+        return rep.duration
+    resources = getattr(rep, "resources", None)
+    if not resources:
+        return 0.0
+    if durations_by == "cpu":
+        return resources["cpu_user"] + resources["cpu_system"]
+    elif durations_by == "rss":
+        return resources["maxrss_delta"]
+    elif durations_by == "gc":
+        return resources["gc_pause"]
+    assert False, f"Unhandled --durations-by value: {durations_by}"
+
+
+def _format_duration_cost(rep: TestReport, durations_by: str, cost: float) -> str:
+    if durations_by == "wall":
+        return f"{cost:02.2f}s"
+    elif durations_by == "cpu":
+        return f"{cost:02.2f}s cpu"
+    elif durations_by == "rss":
+        return f"{cost / 2**20:.1f}MiB rss"
+    else:
+        assert rep.resources
+        return f"{cost:02.3f}s gc ({rep.resources['gc_collections']} collections)"
 
 
 def pytest_terminal_summary(terminalreporter: "TerminalReporter") -> None:
     durations = terminalreporter.config.option.durations
     durations_min = terminalreporter.config.option.durations_min
+    durations_by = terminalreporter.config.option.durations_by
     verbose = terminalreporter.config.getvalue("verbose")
     if durations is None:
         return
@@ -82,24 +180,27 @@ def pytest_terminal_summary(terminalreporter: "TerminalReporter") -> None:
     for replist in tr.stats.values():
         for rep in replist:
             if hasattr(rep, "duration"):
-                dlist.append(rep)
+                dlist.append((_duration_cost(rep, durations_by), rep))
     if not dlist:
         return
-    dlist.sort(key=lambda x: x.duration, reverse=True)
+    dlist.sort(key=lambda x: x[0], reverse=True)
+    title = "durations" if durations_by == "wall" else f"durations by {durations_by}"
     if not durations:
-        tr.write_sep("=", "slowest durations")
+        tr.write_sep("=", f"slowest {title}")
     else:
-        tr.write_sep("=", "slowest %s durations" % durations)
+        tr.write_sep("=", f"slowest {durations} {title}")
         dlist = dlist[:durations]
 
-    for i, rep in enumerate(dlist):
-        if verbose < 2 and rep.duration < durations_min:
+    for i, (cost, rep) in enumerate(dlist):
+        # The minimum is in seconds, it does not apply to memory.
+        if verbose < 2 and durations_by != "rss" and cost < durations_min:
             tr.write_line("")
             tr.write_line(
                 f"({len(dlist) - i} durations < {durations_min:g}s hidden.  Use -vv to show these durations.)"
             )
             break
-        tr.write_line(f"{rep.duration:02.2f}s {rep.when:<8} {rep.nodeid}")
+        cost_str = _format_duration_cost(rep, durations_by, cost)
+        tr.write_line(f"{cost_str} {rep.when:<8} {rep.nodeid}")
 
 
 def pytest_sessionstart(session: "Session") -> None:
@@ -237,9 +338,27 @@ def call_and_report(
     reraise: Tuple[Type[BaseException], ...] = (Exit,)
     if not item.config.getoption("usepdb", False):
         reraise += (KeyboardInterrupt,)
-    call = CallInfo.from_call(
-        lambda: runtest_hook(item=item, **kwds), when=when, reraise=reraise
-    )
+    phase_contexts = item.config.stash.get(runtest_phase_contexts_key, None)
+    if phase_contexts:
+
+        def call_runtest_hook() -> None:
+            with contextlib.ExitStack() as stack:
+                for factory in phase_contexts:
+                    stack.enter_context(factory(item, when))
+                runtest_hook(item=item, **kwds)
+
+    else:
+
+        def call_runtest_hook() -> None:
+            runtest_hook(item=item, **kwds)
+
+    meter = item.config.stash.get(resource_meter_key, None)
+    if meter is not None:
+        snapshot = meter.snapshot()
+        call = CallInfo.from_call(call_runtest_hook, when=when, reraise=reraise)
+        call.resources = meter.since(snapshot)
+    else:
+        call = CallInfo.from_call(call_runtest_hook, when=when, reraise=reraise)
     report: TestReport = ihook.pytest_runtest_makereport(item=item, call=call)
     if log:
         ihook.pytest_runtest_logreport(report=report)
@@ -282,6 +401,10 @@ class CallInfo(Generic[TResult]):
     duration: float
     #: The context of invocation: "collect", "setup", "call" or "teardown".
     when: Literal["collect", "setup", "call", "teardown"]
+    #: The resources used by the call, if ``--resource-usage`` is enabled.
+    #:
+    #: .. versionadded:: 8.2
+    resources: Optional[ResourceUsage]
 
     def __init__(
         self,
@@ -292,6 +415,7 @@ class CallInfo(Generic[TResult]):
         duration: float,
         when: Literal["collect", "setup", "call", "teardown"],
         *,
+        resources: Optional[ResourceUsage] = None,
         _ispytest: bool = False,
     ) -> None:
         check_ispytest(_ispytest)
@@ -301,6 +425,7 @@ class CallInfo(Generic[TResult]):
         self.stop = stop
         self.duration = duration
         self.when = when
+        self.resources = resources
 
     @property
     def result(self) -> TResult:
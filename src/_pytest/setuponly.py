@@ -3,31 +3,15 @@ from typing import Optional
 from typing import Union
 
 from _pytest._io.saferepr import saferepr
+from _pytest._options.setuponly import pytest_addoption as pytest_addoption
 from _pytest.config import Config
 from _pytest.config import ExitCode
-from _pytest.config.argparsing import Parser
 from _pytest.fixtures import FixtureDef
 from _pytest.fixtures import SubRequest
 from _pytest.scope import Scope
 import pytest
 
 
-def pytest_addoption(parser: Parser) -> None:
-    group = parser.getgroup("debugconfig")
-    group.addoption(
-        "--setuponly",
-        "--setup-only",
-        action="store_true",
-        help="Only setup fixtures, do not execute tests",
-    )
-    group.addoption(
-        "--setupshow",
-        "--setup-show",
-        action="store_true",
-        help="Show setup of fixtures while executing tests",
-    )
-
-
 @pytest.hookimpl(wrapper=True)
 def pytest_fixture_setup(
     fixturedef: FixtureDef[object], request: SubRequest
@@ -1,25 +1,14 @@
 from typing import Optional
 from typing import Union
 
+from _pytest._options.setupplan import pytest_addoption as pytest_addoption
 from _pytest.config import Config
 from _pytest.config import ExitCode
-from _pytest.config.argparsing import Parser
 from _pytest.fixtures import FixtureDef
 from _pytest.fixtures import SubRequest
 import pytest
 
 
-def pytest_addoption(parser: Parser) -> None:
-    group = parser.getgroup("debugconfig")
-    group.addoption(
-        "--setupplan",
-        "--setup-plan",
-        action="store_true",
-        help="Show what fixtures and tests would be executed but "
-        "don't execute anything",
-    )
-
-
 @pytest.hookimpl(tryfirst=True)
 def pytest_fixture_setup(
     fixturedef: FixtureDef[object], request: SubRequest
@@ -0,0 +1,130 @@
+"""Split the collected tests into balanced shards (--shard=K/N)."""
+
+import heapq
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from _pytest._options.sharding import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import UsageError
+from _pytest.fixtures import FixtureArgKey
+from _pytest.fixtures import get_parametrized_fixture_keys
+from _pytest.history import expected_duration_key
+from _pytest.history import stash_expected_durations
+from _pytest.nodes import Item
+from _pytest.scope import HIGH_SCOPES
+from _pytest.scope import Scope
+from _pytest.stash import StashKey
+import pytest
+
+
+shard_key = StashKey[Tuple[int, int]]()
+# Estimated duration of the selected shard, if known from the history.
+shard_duration_key = StashKey[float]()
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index_str, count_str = value.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise UsageError(f"--shard must be of the form K/N, got {value!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise UsageError(f"--shard: K must be between 1 and N, got {value!r}")
+    return index, count
+
+
+def pytest_configure(config: Config) -> None:
+    value = config.getoption("shard")
+    if value is not None:
+        config.stash[shard_key] = parse_shard(value)
+
+
+def fixture_groups(items: Sequence[Item]) -> List[List[int]]:
+    """Group the indices of the items which share a parametrized fixture of
+    package, module or class scope, in the order of their first item.
+
+    Session-scoped parameters do not join items, since every shard runs in its
+    own session anyway.
+    """
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_with_key: Dict[FixtureArgKey, int] = {}
+    for scope in HIGH_SCOPES:
+        if scope is Scope.Session:
+            continue
+        for i, item in enumerate(items):
+            for key in get_parametrized_fixture_keys(item, scope):
+                j = first_with_key.setdefault(key, i)
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def assign_shards(
+    costs: Sequence[float], groups: List[List[int]], count: int
+) -> List[int]:
+    """Assign each group to one of ``count`` shards, returning the shard index
+    of each group.
+
+    Groups are placed costliest first on the least loaded shard; ties are
+    broken on the group and shard order, so the assignment only depends on
+    its inputs.
+    """
+    group_costs = [sum(costs[i] for i in group) for group in groups]
+    order = sorted(range(len(groups)), key=lambda g: (-group_costs[g], g))
+    loads: List[Tuple[float, int]] = [(0.0, shard) for shard in range(count)]
+    assignment = [0] * len(groups)
+    for g in order:
+        load, shard = heapq.heappop(loads)
+        assignment[g] = shard
+        heapq.heappush(loads, (load + group_costs[g], shard))
+    return assignment
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(items: List[Item], config: Config) -> None:
+    shard = config.stash.get(shard_key, None)
+    if shard is None:
+        return
+    index, count = shard
+    has_durations = stash_expected_durations(config, items)
+    # Without history, balance the number of tests.
+    costs = [item.stash.get(expected_duration_key, 1.0) for item in items]
+    groups = fixture_groups(items)
+    assignment = assign_shards(costs, groups, count)
+    selected = set()
+    for group, group_shard in zip(groups, assignment):
+        if group_shard == index - 1:
+            selected.update(group)
+    remaining = [item for i, item in enumerate(items) if i in selected]
+    deselected = [item for i, item in enumerate(items) if i not in selected]
+    if has_durations:
+        config.stash[shard_duration_key] = sum(costs[i] for i in sorted(selected))
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = remaining
+
+
+def pytest_report_collectionfinish(config: Config) -> Optional[str]:
+    shard = config.stash.get(shard_key, None)
+    if shard is None or config.getoption("verbose") < 0:
+        return None
+    duration = config.stash.get(shard_duration_key, None)
+    if duration is None:
+        return "shard {}/{}: balanced by test count".format(*shard)
+    return "shard {}/{}: estimated duration {:.2f}s".format(*shard, duration)
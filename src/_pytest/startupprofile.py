@@ -0,0 +1,51 @@
+"""Report of the time taken by each phase of the startup (--startup-profile).
+
+The phases are recorded by the plugin manager and the config, see
+:mod:`_pytest.config.startupprofile`.
+"""
+
+import dataclasses
+import json
+import os
+from pathlib import Path
+
+from _pytest._options.startupprofile import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.main import Session
+from _pytest.pathlib import bestrelpath
+from _pytest.terminal import TerminalReporter
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session: Session) -> None:
+    if session.config.getoption("startup_profile") is not None:
+        session.config.pluginmanager._startup_profile.end()
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter, config: Config) -> None:
+    profile = config.pluginmanager._startup_profile
+    if profile.duration is None:
+        return
+    tr = terminalreporter
+    tr.write_sep("=", f"startup phases ({profile.duration:.3f}s)")
+    tr.write_line(f"{'own':>8} {'total':>8}  kind  name")
+    for phase in profile.sorted_phases():
+        name = phase.name
+        if os.path.isabs(name):
+            # A conftest.py file.
+            name = bestrelpath(config.rootpath, Path(name))
+        tr.write_line(f"{phase.own:7.3f}s {phase.total:7.3f}s  {phase.kind}  {name}")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config: Config) -> None:
+    profile = config.pluginmanager._startup_profile
+    if profile.duration is None:
+        return
+    data = {
+        "duration": profile.duration,
+        "phases": [dataclasses.asdict(p) for p in profile.sorted_phases()],
+    }
+    json_path = Path(config.invocation_params.dir, config.getoption("startup_profile"))
+    json_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
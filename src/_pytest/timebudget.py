@@ -0,0 +1,175 @@
+"""Run the most valuable tests which fit in a time budget (--time-budget)."""
+
+import os
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Optional
+from typing import Set
+
+from _pytest import timing
+from _pytest._options.timebudget import pytest_addoption as pytest_addoption
+from _pytest.config import Config
+from _pytest.config import UsageError
+from _pytest.history import expected_duration_key
+from _pytest.history import history_key
+from _pytest.history import stash_expected_durations
+from _pytest.nodes import Item
+from _pytest.ordering import order_by_cost
+from _pytest.terminal import TerminalReporter
+import pytest
+
+
+# Value of a test, on top of 1, if it is new, failed in the last run, has
+# changed since the last run, and per failure rate over the test history.
+NEW_VALUE = 4.0
+LAST_FAILED_VALUE = 4.0
+CHANGED_VALUE = 2.0
+FAILURE_RATE_VALUE = 2.0
+
+# Duration assumed for tests recorded with a zero duration.
+MIN_DURATION = 0.001
+
+
+def pytest_configure(config: Config) -> None:
+    budget = config.getoption("time_budget")
+    if budget is None:
+        return
+    if budget <= 0:
+        raise UsageError(f"--time-budget must be positive, got {budget}")
+    config.pluginmanager.register(TimeBudgetPlugin(config, budget), "timebudgetplugin")
+
+
+class TimeBudgetPlugin:
+    """Selects the tests by value per expected second at collection, and stops
+    running tests once the budget is used up, deselecting the rest."""
+
+    def __init__(self, config: Config, budget: float) -> None:
+        self.config = config
+        self.budget = budget
+        self.start = timing.perf_counter()
+        self.value: Dict[str, float] = {}
+        self.selected_duration: Optional[float] = None
+        self.deselected_at_collection: List[Item] = []
+        self.deselected_at_runtime: List[Item] = []
+        self._exhausted = False
+
+    def elapsed(self) -> float:
+        return timing.perf_counter() - self.start
+
+    def _values(self, items: List[Item]) -> Dict[str, float]:
+        config = self.config
+        nf = config.pluginmanager.get_plugin("nfplugin")
+        known: Set[str] = nf.cached_nodeids if nf is not None else set()
+        lf = config.pluginmanager.get_plugin("lfplugin")
+        lastfailed: Dict[str, bool] = lf.lastfailed if lf is not None else {}
+        history = config.stash.get(history_key, None)
+        last_run = history.last_run_time() if history is not None else None
+        mtimes: Dict[object, float] = {}
+        values = {}
+        for item in items:
+            value = 1.0
+            if known and item.nodeid not in known:
+                value += NEW_VALUE
+            if item.nodeid in lastfailed:
+                value += LAST_FAILED_VALUE
+            if last_run is not None:
+                mtime = mtimes.get(item.path)
+                if mtime is None:
+                    try:
+                        mtime = os.stat(item.path).st_mtime
+                    except OSError:
+                        mtime = 0.0
+                    mtimes[item.path] = mtime
+                if mtime > last_run:
+                    value += CHANGED_VALUE
+            if history is not None:
+                results = history.results(item.nodeid)
+                if results:
+                    failures = sum(r.outcome in ("failed", "error") for r in results)
+                    value += FAILURE_RATE_VALUE * failures / len(results)
+            values[item.nodeid] = value
+        return values
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_collection_modifyitems(
+        self, items: List[Item]
+    ) -> Generator[None, None, None]:
+        # Runs after the other implementations, but before the known tests of
+        # the cache are updated with the new ones.
+        res = yield
+        if not items:
+            return res
+        self.value = values = self._values(items)
+        if not stash_expected_durations(self.config, items):
+            # Without history, only order by value and stop at the budget.
+            items[:] = order_by_cost(items, lambda item: values[item.nodeid])
+            return res
+
+        def density(item: Item) -> float:
+            duration = max(item.stash[expected_duration_key], MIN_DURATION)
+            return values[item.nodeid] / duration
+
+        left = self.budget - self.elapsed()
+        total = 0.0
+        selected = set()
+        for item in sorted(items, key=density, reverse=True):
+            duration = item.stash[expected_duration_key]
+            if total + duration <= left:
+                selected.add(item)
+                total += duration
+        self.selected_duration = total
+        remaining = [item for item in items if item in selected]
+        deselected = [item for item in items if item not in selected]
+        if deselected:
+            self.deselected_at_collection = deselected
+            self.config.hook.pytest_deselected(items=deselected)
+        items[:] = order_by_cost(remaining, density)
+        return res
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item: Item) -> Optional[bool]:
+        if self._exhausted:
+            return True
+        if self.elapsed() < self.budget:
+            return None
+        self._exhausted = True
+        session = item.session
+        self.deselected_at_runtime = list(session.items[session.items.index(item) :])
+        self.config.hook.pytest_deselected(items=self.deselected_at_runtime)
+        return True
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        tr = terminalreporter
+        tr.write_sep("=", f"time budget of {self.budget:g}s")
+        if self.selected_duration is not None:
+            tr.write_line(
+                "selected tests expected to take "
+                f"{self.selected_duration:.2f}s, used {self.elapsed():.2f}s"
+            )
+        else:
+            tr.write_line(
+                f"no recorded durations, tests ordered by value, "
+                f"used {self.elapsed():.2f}s"
+            )
+        deselected = self.deselected_at_collection
+        if deselected:
+            expected = sum(item.stash[expected_duration_key] for item in deselected)
+            tr.write_line(
+                f"{len(deselected)} tests deselected for time, expected to take "
+                f"{expected:.2f}s{self._describe(deselected)}"
+            )
+        if self.deselected_at_runtime:
+            tr.write_line(
+                f"{len(self.deselected_at_runtime)} tests not run after the "
+                f"budget was used up{self._describe(self.deselected_at_runtime)}"
+            )
+        if tr.verbosity > 0:
+            for item in deselected + self.deselected_at_runtime:
+                tr.write_line(f"not run: {item.nodeid}")
+
+    def _describe(self, items: List[Item]) -> str:
+        valuable = sum(self.value.get(item.nodeid, 1.0) > 1.0 for item in items)
+        if not valuable:
+            return ""
+        return f" ({valuable} new, recently failed or changed)"
@@ -1,13 +1,18 @@
+from contextlib import contextmanager
 import sys
 import traceback
 from types import TracebackType
 from typing import Any
 from typing import Callable
 from typing import Generator
+from typing import Literal
 from typing import Optional
 from typing import Type
 import warnings
 
+from _pytest.config import Config
+from _pytest.nodes import Item
+from _pytest.runner import register_runtest_phase_context
 import pytest
 
 
@@ -59,7 +64,10 @@ class catch_unraisable_exception:
         del self.unraisable
 
 
-def unraisable_exception_runtest_hook() -> Generator[None, None, None]:
+@contextmanager
+def unraisable_exception_runtest_hook(
+    item: Item, when: Literal["setup", "call", "teardown"]
+) -> Generator[None, None, None]:
     with catch_unraisable_exception() as cm:
         try:
             yield
@@ -80,16 +88,5 @@ def unraisable_exception_runtest_hook() -> Generator[None, None, None]:
                 warnings.warn(pytest.PytestUnraisableExceptionWarning(msg))
 
 
-@pytest.hookimpl(wrapper=True, tryfirst=True)
-def pytest_runtest_setup() -> Generator[None, None, None]:
-    yield from unraisable_exception_runtest_hook()
-
-
-@pytest.hookimpl(wrapper=True, tryfirst=True)
-def pytest_runtest_call() -> Generator[None, None, None]:
-    yield from unraisable_exception_runtest_hook()
-
-
-@pytest.hookimpl(wrapper=True, tryfirst=True)
-def pytest_runtest_teardown() -> Generator[None, None, None]:
-    yield from unraisable_exception_runtest_hook()
+def pytest_configure(config: Config) -> None:
+    register_runtest_phase_context(config, unraisable_exception_runtest_hook)
@@ -55,6 +55,17 @@ class PytestRemovedIn9Warning(PytestDeprecationWarning):
     __module__ = "pytest"
 
 
+@final
+class PytestResourceLeakWarning(PytestWarning):
+    """A test left open file descriptors, threads, child processes or
+    temporary files behind.
+
+    See :ref:`track-leaks` for details.
+    """
+
+    __module__ = "pytest"
+
+
 class PytestReturnNotNoneWarning(PytestWarning):
     """Warning emitted when a test function is returning value other than None."""
 
@@ -0,0 +1,410 @@
+"""Re-run the tests affected by each change to the files under the rootdir
+(--watch)."""
+
+import ctypes
+import importlib
+import linecache
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+from typing import Callable
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Union
+
+from _pytest import nodes
+from _pytest import timing
+from _pytest._options.watch import pytest_addoption as pytest_addoption
+from _pytest.batch import assign_run_batches
+from _pytest.config import Config
+from _pytest.config import hookimpl
+from _pytest.config import UsageError
+from _pytest.importgraph import ImportGraph
+from _pytest.importgraph import should_recurse
+from _pytest.importgraph import walk_source_dirs
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.python import Package
+from _pytest.reports import TestReport
+from _pytest.terminal import TerminalReporter
+
+
+# Seconds between two scans of the files, without inotify.
+POLL_INTERVAL = 0.5
+# Seconds to wait for more changes after one, as editors may write a file in
+# several steps, or several files at once.
+DEBOUNCE = 0.2
+
+
+def pytest_configure(config: Config) -> None:
+    if not config.getoption("watch") or hasattr(config, "workerinput"):
+        return
+    for option, name in (("shard", "--shard"), ("time_budget", "--time-budget")):
+        if config.getoption(option, None) is not None:
+            raise UsageError(
+                f"--watch cannot be combined with {name}, which selects the "
+                "tests of a single run"
+            )
+    # Broken test files are collected again once fixed.
+    config.option.continue_on_collection_errors = True
+    config.pluginmanager.register(WatchPlugin(config), "watchplugin")
+
+
+class PollingWatcher:
+    """Finds the changed files by comparing their modification times and
+    sizes every ``POLL_INTERVAL`` seconds."""
+
+    def __init__(self, config: Config, is_relevant: Callable[[str], bool]) -> None:
+        self.config = config
+        self.is_relevant = is_relevant
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, object]:
+        snapshot: Dict[str, object] = {}
+        for dirpath, filenames in walk_source_dirs(self.config):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if self.is_relevant(path):
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self) -> Set[str]:
+        """Wait for changes, returning the changed, created and deleted
+        files since the previous call."""
+        changed: Set[str] = set()
+        while True:
+            time.sleep(DEBOUNCE if changed else POLL_INTERVAL)
+            snapshot = self._scan()
+            new = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed and not new:
+                return changed
+            changed |= new
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Finds the changed files with inotify, on Linux."""
+
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, config: Config, is_relevant: Callable[[str], bool]) -> None:
+        self.config = config
+        self.is_relevant = is_relevant
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.dirs: Dict[int, str] = {}
+        for dirpath, _ in walk_source_dirs(config):
+            self._add(dirpath)
+
+    def _add(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.dirs[wd] = path
+
+    def _read(self) -> Set[str]:
+        changed: Set[str] = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and should_recurse(
+                    self.config, Path(path)
+                ):
+                    self._add(path)
+                    # Files may have been created before the watch was added.
+                    for dirpath, dirnames, filenames in os.walk(path):
+                        dirnames[:] = [
+                            d
+                            for d in dirnames
+                            if should_recurse(self.config, Path(dirpath, d))
+                        ]
+                        for d in dirnames:
+                            self._add(os.path.join(dirpath, d))
+                        changed.update(os.path.join(dirpath, f) for f in filenames)
+                continue
+            changed.add(path)
+        return {path for path in changed if self.is_relevant(path)}
+
+    def wait(self) -> Set[str]:
+        """Wait for changes, returning the changed, created and deleted
+        files since the previous call."""
+        changed: Set[str] = set()
+        while True:
+            ready, _, _ = select.select(
+                [self.fd], [], [], DEBOUNCE if changed else None
+            )
+            if not ready:
+                return changed
+            changed |= self._read()
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(
+    config: Config, is_relevant: Callable[[str], bool]
+) -> Union[InotifyWatcher, PollingWatcher]:
+    """Return an inotify watcher if available, or a polling watcher."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(config, is_relevant)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(config, is_relevant)
+
+
+def _restart(reason: str) -> None:
+    """Replace the process by a new pytest run with the same arguments."""
+    sys.stdout.write(f"\nwatch: {reason}, restarting\n")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    argv = getattr(sys, "orig_argv", None)
+    if argv is None:
+        argv = [sys.executable, "-m", "pytest", *sys.argv[1:]]
+    os.execv(sys.executable, argv)
+
+
+class WatchPlugin:
+    """Keeps the collected tree between the runs, and collects again only the
+    test files affected by a change, from the import graph of the rootdir.
+
+    Changes to the configuration file, to a conftest.py file or a plugin, or
+    to what they import, restart the process instead, as their effects on the
+    registered hooks and fixtures cannot be undone.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        #: The collectors of the files and directories, by path.
+        self.files: Dict[Path, nodes.File] = {}
+        self.dirs: Dict[Path, nodes.Directory] = {}
+        #: The selected items of each file, in order.
+        self.items: Dict[Path, List[Item]] = {}
+        self.failed: Set[str] = set()
+
+    def pytest_collectstart(self, collector: nodes.Collector) -> None:
+        if isinstance(collector, nodes.File):
+            self.files[collector.path] = collector
+        elif isinstance(collector, nodes.Directory):
+            self.dirs[collector.path] = collector
+
+    def pytest_collection_finish(self, session: Session) -> None:
+        self.items = self._group(session.items)
+
+    def _group(self, items: List[Item]) -> Dict[Path, List[Item]]:
+        grouped: Dict[Path, List[Item]] = {}
+        for item in items:
+            file = item.getparent(nodes.File)
+            grouped.setdefault(file.path if file else item.path, []).append(item)
+        return grouped
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        self.failed.discard(nodeid)
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if report.failed:
+            self.failed.add(report.nodeid)
+
+    @hookimpl(wrapper=True)
+    def pytest_runtestloop(self, session: Session) -> Generator[None, object, object]:
+        tr: Optional[TerminalReporter] = self.config.pluginmanager.get_plugin(
+            "terminalreporter"
+        )
+        try:
+            result = yield
+        except (session.Failed, session.Interrupted):
+            # -x and --maxfail only stop the current run.
+            result = True
+        if self.config.option.collectonly:
+            return result
+        if tr is not None:
+            self._summary(session, tr)
+        rootpath = self.config.rootpath
+        inipath = self.config.inipath
+
+        def is_relevant(path: str) -> bool:
+            return (
+                path.endswith(".py")
+                or Path(path) in self.files
+                or (inipath is not None and Path(path) == inipath)
+            )
+
+        watcher = make_watcher(self.config, is_relevant)
+        try:
+            while True:
+                if tr is not None:
+                    tr.write_sep("-", "watching for changes, press Ctrl-C to stop")
+                try:
+                    changed = {Path(path) for path in watcher.wait()}
+                except KeyboardInterrupt:
+                    break
+                changed = {path for path in changed if rootpath in path.parents}
+                if changed:
+                    self.rerun(session, changed, tr)
+        finally:
+            watcher.close()
+        return result
+
+    def rerun(
+        self, session: Session, changed: Set[Path], tr: Optional[TerminalReporter]
+    ) -> None:
+        """Collect the test files affected by ``changed`` again, and run their
+        tests together with the failed ones."""
+        config = self.config
+        rootpath = config.rootpath
+        if config.inipath in changed:
+            _restart(f"{config.inipath.name} changed")
+        names = {path.relative_to(rootpath).as_posix() for path in changed}
+        graph = ImportGraph(config)
+        graph.build(extra_files=names)
+        affected = {rootpath / name for name in graph.affected(names)}
+        plugins = {rootpath / name for name in graph.plugins()}
+        for path in sorted(affected):
+            if path.name == "conftest.py" or path in plugins:
+                _restart(f"{path.relative_to(rootpath)} is affected")
+            if path.name == "__init__.py" and isinstance(
+                self.dirs.get(path.parent), Package
+            ):
+                _restart(f"{path.relative_to(rootpath)} is affected")
+        affected |= {path for path in changed if path in self.files}
+
+        self._reset(session, tr)
+        self._unload(affected)
+        recollected = self._recollect(session, affected)
+        # The selection plugins see the whole new list at once, as they did
+        # for the first run.
+        all_items = [
+            item
+            for file_items in {**self.items, **recollected}.values()
+            for item in file_items
+        ]
+        config.hook.pytest_collection_modifyitems(
+            session=session, config=config, items=all_items
+        )
+        self.items = self._group(all_items)
+        items = [
+            item
+            for path, file_items in self.items.items()
+            for item in file_items
+            if path in recollected or item.nodeid in self.failed
+        ]
+        if tr is not None:
+            tr.write_sep(
+                "=",
+                f"watch: {len(changed)} changed files, running {len(items)} tests",
+            )
+        session.items = items
+        session.testscollected = len(items)
+        # The items which were not collected again keep the batches of the
+        # previous run, which may not match this one.
+        if config.pluginmanager.has_plugin("batch"):
+            assign_run_batches(config, items)
+        for i, item in enumerate(items):
+            nextitem = items[i + 1] if i + 1 < len(items) else None
+            item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+            if session.shouldfail or session.shouldstop:
+                break
+        if tr is not None and (items or tr.stats):
+            self._summary(session, tr)
+
+    def _summary(self, session: Session, tr: TerminalReporter) -> None:
+        tr.write_line("")
+        tr.summary_errors()
+        tr.summary_failures()
+        tr.short_test_summary()
+        reason = session.shouldfail or session.shouldstop
+        if reason:
+            tr.write_sep("!", str(reason), red=True)
+        tr.summary_stats()
+
+    def _reset(self, session: Session, tr: Optional[TerminalReporter]) -> None:
+        """Reset the counters and statistics of the session for a new run."""
+        session.testsfailed = 0
+        session.shouldfail = False
+        session.shouldstop = False
+        if tr is not None:
+            tr.stats.clear()
+            tr._progress_nodeids_reported.clear()
+            tr._main_color = None
+            tr._known_types = None
+            tr._sessionstarttime = timing.time()
+            tr.currentfspath = None
+
+    def _unload(self, paths: Set[Path]) -> None:
+        """Remove the modules of ``paths`` from :data:`sys.modules`, so the
+        next imports load their new code."""
+        filenames = {os.path.normcase(str(path)) for path in paths}
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, "__file__", None)
+            if filename and os.path.normcase(os.path.abspath(filename)) in filenames:
+                del sys.modules[name]
+        importlib.invalidate_caches()
+        linecache.checkcache()
+
+    def _recollect(self, session: Session, paths: Set[Path]) -> Dict[Path, List[Item]]:
+        """Collect the test files among ``paths`` again, and return their new
+        items, before any selection, by file."""
+        config = self.config
+        recollected: Dict[Path, List[Item]] = {}
+        for path in sorted(paths):
+            old = self.files.pop(path, None)
+            parent = old.parent if old is not None else self.dirs.get(path.parent)
+            if not isinstance(parent, nodes.Directory):
+                # Not a test file: only its dependents are collected again.
+                continue
+            if old is not None:
+                session._fixturemanager._unregister_fixtures(old.nodeid)
+                prefix = old.nodeid + "::"
+                for node in list(session._collection_cache):
+                    if node.nodeid == old.nodeid or node.nodeid.startswith(prefix):
+                        del session._collection_cache[node]
+            items: List[Item] = []
+            if path.is_file() and not parent.ihook.pytest_ignore_collect(
+                collection_path=path, config=config
+            ):
+                for collector in parent.ihook.pytest_collect_file(
+                    file_path=path, parent=parent
+                ):
+                    items.extend(session.genitems(collector))
+            if old is not None or items:
+                recollected[path] = items
+        return recollected
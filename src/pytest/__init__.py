@@ -1,89 +1,99 @@
 # PYTHON_ARGCOMPLETE_OK
 """pytest: unit and functional testing with Python."""
 
+from operator import attrgetter
+import sys
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import TYPE_CHECKING
+
 from _pytest import __version__
 from _pytest import version_tuple
-from _pytest._code import ExceptionInfo
-from _pytest.assertion import register_assert_rewrite
-from _pytest.cacheprovider import Cache
-from _pytest.capture import CaptureFixture
-from _pytest.config import cmdline
-from _pytest.config import Config
-from _pytest.config import console_main
-from _pytest.config import ExitCode
-from _pytest.config import hookimpl
-from _pytest.config import hookspec
-from _pytest.config import main
-from _pytest.config import PytestPluginManager
-from _pytest.config import UsageError
-from _pytest.config.argparsing import OptionGroup
-from _pytest.config.argparsing import Parser
-from _pytest.debugging import pytestPDB as __pytestPDB
-from _pytest.doctest import DoctestItem
-from _pytest.fixtures import fixture
-from _pytest.fixtures import FixtureDef
-from _pytest.fixtures import FixtureLookupError
-from _pytest.fixtures import FixtureRequest
-from _pytest.fixtures import yield_fixture
-from _pytest.freeze_support import freeze_includes
-from _pytest.legacypath import TempdirFactory
-from _pytest.legacypath import Testdir
-from _pytest.logging import LogCaptureFixture
-from _pytest.main import Dir
-from _pytest.main import Session
-from _pytest.mark import Mark
-from _pytest.mark import MARK_GEN as mark
-from _pytest.mark import MarkDecorator
-from _pytest.mark import MarkGenerator
-from _pytest.mark import param
-from _pytest.monkeypatch import MonkeyPatch
-from _pytest.nodes import Collector
-from _pytest.nodes import Directory
-from _pytest.nodes import File
-from _pytest.nodes import Item
-from _pytest.outcomes import exit
-from _pytest.outcomes import fail
-from _pytest.outcomes import importorskip
-from _pytest.outcomes import skip
-from _pytest.outcomes import xfail
-from _pytest.pytester import HookRecorder
-from _pytest.pytester import LineMatcher
-from _pytest.pytester import Pytester
-from _pytest.pytester import RecordedHookCall
-from _pytest.pytester import RunResult
-from _pytest.python import Class
-from _pytest.python import Function
-from _pytest.python import Metafunc
-from _pytest.python import Module
-from _pytest.python import Package
-from _pytest.python_api import approx
-from _pytest.python_api import raises
-from _pytest.recwarn import deprecated_call
-from _pytest.recwarn import WarningsRecorder
-from _pytest.recwarn import warns
-from _pytest.reports import CollectReport
-from _pytest.reports import TestReport
-from _pytest.runner import CallInfo
-from _pytest.stash import Stash
-from _pytest.stash import StashKey
-from _pytest.terminal import TestShortLogReport
-from _pytest.tmpdir import TempPathFactory
-from _pytest.warning_types import PytestAssertRewriteWarning
-from _pytest.warning_types import PytestCacheWarning
-from _pytest.warning_types import PytestCollectionWarning
-from _pytest.warning_types import PytestConfigWarning
-from _pytest.warning_types import PytestDeprecationWarning
-from _pytest.warning_types import PytestExperimentalApiWarning
-from _pytest.warning_types import PytestRemovedIn9Warning
-from _pytest.warning_types import PytestReturnNotNoneWarning
-from _pytest.warning_types import PytestUnhandledCoroutineWarning
-from _pytest.warning_types import PytestUnhandledThreadExceptionWarning
-from _pytest.warning_types import PytestUnknownMarkWarning
-from _pytest.warning_types import PytestUnraisableExceptionWarning
-from _pytest.warning_types import PytestWarning
 
 
-set_trace = __pytestPDB.set_trace
+if TYPE_CHECKING:
+    from _pytest._code import ExceptionInfo
+    from _pytest.assertion import register_assert_rewrite
+    from _pytest.cacheprovider import Cache
+    from _pytest.capture import CaptureFixture
+    from _pytest.config import cmdline
+    from _pytest.config import Config
+    from _pytest.config import console_main
+    from _pytest.config import ExitCode
+    from _pytest.config import hookimpl
+    from _pytest.config import hookspec
+    from _pytest.config import main
+    from _pytest.config import PytestPluginManager
+    from _pytest.config import UsageError
+    from _pytest.config.argparsing import OptionGroup
+    from _pytest.config.argparsing import Parser
+    from _pytest.debugging import pytestPDB
+    from _pytest.doctest import DoctestItem
+    from _pytest.fixtures import fixture
+    from _pytest.fixtures import FixtureDef
+    from _pytest.fixtures import FixtureLookupError
+    from _pytest.fixtures import FixtureRequest
+    from _pytest.fixtures import yield_fixture
+    from _pytest.freeze_support import freeze_includes
+    from _pytest.legacypath import TempdirFactory
+    from _pytest.legacypath import Testdir
+    from _pytest.logging import LogCaptureFixture
+    from _pytest.main import Dir
+    from _pytest.main import Session
+    from _pytest.mark import Mark
+    from _pytest.mark import MARK_GEN as mark
+    from _pytest.mark import MarkDecorator
+    from _pytest.mark import MarkGenerator
+    from _pytest.mark import param
+    from _pytest.monkeypatch import MonkeyPatch
+    from _pytest.nodes import Collector
+    from _pytest.nodes import Directory
+    from _pytest.nodes import File
+    from _pytest.nodes import Item
+    from _pytest.outcomes import exit
+    from _pytest.outcomes import fail
+    from _pytest.outcomes import importorskip
+    from _pytest.outcomes import skip
+    from _pytest.outcomes import xfail
+    from _pytest.pytester import HookRecorder
+    from _pytest.pytester import LineMatcher
+    from _pytest.pytester import Pytester
+    from _pytest.pytester import RecordedHookCall
+    from _pytest.pytester import RunResult
+    from _pytest.python import Class
+    from _pytest.python import Function
+    from _pytest.python import Metafunc
+    from _pytest.python import Module
+    from _pytest.python import Package
+    from _pytest.python_api import approx
+    from _pytest.python_api import raises
+    from _pytest.recwarn import deprecated_call
+    from _pytest.recwarn import WarningsRecorder
+    from _pytest.recwarn import warns
+    from _pytest.reports import CollectReport
+    from _pytest.reports import TestReport
+    from _pytest.runner import CallInfo
+    from _pytest.stash import Stash
+    from _pytest.stash import StashKey
+    from _pytest.terminal import TestShortLogReport
+    from _pytest.tmpdir import TempPathFactory
+    from _pytest.warning_types import PytestAssertRewriteWarning
+    from _pytest.warning_types import PytestCacheWarning
+    from _pytest.warning_types import PytestCollectionWarning
+    from _pytest.warning_types import PytestConfigWarning
+    from _pytest.warning_types import PytestDeprecationWarning
+    from _pytest.warning_types import PytestExperimentalApiWarning
+    from _pytest.warning_types import PytestRemovedIn9Warning
+    from _pytest.warning_types import PytestResourceLeakWarning
+    from _pytest.warning_types import PytestReturnNotNoneWarning
+    from _pytest.warning_types import PytestUnhandledCoroutineWarning
+    from _pytest.warning_types import PytestUnhandledThreadExceptionWarning
+    from _pytest.warning_types import PytestUnknownMarkWarning
+    from _pytest.warning_types import PytestUnraisableExceptionWarning
+    from _pytest.warning_types import PytestWarning
+
+    set_trace = pytestPDB.set_trace
 
 
 __all__ = [
@@ -139,6 +149,7 @@ __all__ = [
     "PytestDeprecationWarning",
     "PytestExperimentalApiWarning",
     "PytestRemovedIn9Warning",
+    "PytestResourceLeakWarning",
     "PytestReturnNotNoneWarning",
     "Pytester",
     "PytestPluginManager",
@@ -168,3 +179,106 @@ __all__ = [
     "xfail",
     "yield_fixture",
 ]
+
+#: The module defining each name of the namespace, imported on first access,
+#: so that ``import pytest`` only imports the modules which are used.
+_lazy_attrs: Dict[str, str] = {
+    "ExceptionInfo": "_pytest._code",
+    "register_assert_rewrite": "_pytest.assertion",
+    "Cache": "_pytest.cacheprovider",
+    "CaptureFixture": "_pytest.capture",
+    "cmdline": "_pytest.config",
+    "Config": "_pytest.config",
+    "console_main": "_pytest.config",
+    "ExitCode": "_pytest.config",
+    "hookimpl": "_pytest.config",
+    "hookspec": "_pytest.config",
+    "main": "_pytest.config",
+    "PytestPluginManager": "_pytest.config",
+    "UsageError": "_pytest.config",
+    "OptionGroup": "_pytest.config.argparsing",
+    "Parser": "_pytest.config.argparsing",
+    "DoctestItem": "_pytest.doctest",
+    "fixture": "_pytest.fixtures",
+    "FixtureDef": "_pytest.fixtures",
+    "FixtureLookupError": "_pytest.fixtures",
+    "FixtureRequest": "_pytest.fixtures",
+    "yield_fixture": "_pytest.fixtures",
+    "freeze_includes": "_pytest.freeze_support",
+    "TempdirFactory": "_pytest.legacypath",
+    "Testdir": "_pytest.legacypath",
+    "LogCaptureFixture": "_pytest.logging",
+    "Dir": "_pytest.main",
+    "Session": "_pytest.main",
+    "Mark": "_pytest.mark",
+    "mark": "_pytest.mark",
+    "MarkDecorator": "_pytest.mark",
+    "MarkGenerator": "_pytest.mark",
+    "param": "_pytest.mark",
+    "MonkeyPatch": "_pytest.monkeypatch",
+    "Collector": "_pytest.nodes",
+    "Directory": "_pytest.nodes",
+    "File": "_pytest.nodes",
+    "Item": "_pytest.nodes",
+    "exit": "_pytest.outcomes",
+    "fail": "_pytest.outcomes",
+    "importorskip": "_pytest.outcomes",
+    "skip": "_pytest.outcomes",
+    "xfail": "_pytest.outcomes",
+    "HookRecorder": "_pytest.pytester",
+    "LineMatcher": "_pytest.pytester",
+    "Pytester": "_pytest.pytester",
+    "RecordedHookCall": "_pytest.pytester",
+    "RunResult": "_pytest.pytester",
+    "Class": "_pytest.python",
+    "Function": "_pytest.python",
+    "Metafunc": "_pytest.python",
+    "Module": "_pytest.python",
+    "Package": "_pytest.python",
+    "approx": "_pytest.python_api",
+    "raises": "_pytest.python_api",
+    "deprecated_call": "_pytest.recwarn",
+    "WarningsRecorder": "_pytest.recwarn",
+    "warns": "_pytest.recwarn",
+    "CollectReport": "_pytest.reports",
+    "TestReport": "_pytest.reports",
+    "CallInfo": "_pytest.runner",
+    "Stash": "_pytest.stash",
+    "StashKey": "_pytest.stash",
+    "TestShortLogReport": "_pytest.terminal",
+    "TempPathFactory": "_pytest.tmpdir",
+    "PytestAssertRewriteWarning": "_pytest.warning_types",
+    "PytestCacheWarning": "_pytest.warning_types",
+    "PytestCollectionWarning": "_pytest.warning_types",
+    "PytestConfigWarning": "_pytest.warning_types",
+    "PytestDeprecationWarning": "_pytest.warning_types",
+    "PytestExperimentalApiWarning": "_pytest.warning_types",
+    "PytestRemovedIn9Warning": "_pytest.warning_types",
+    "PytestResourceLeakWarning": "_pytest.warning_types",
+    "PytestReturnNotNoneWarning": "_pytest.warning_types",
+    "PytestUnhandledCoroutineWarning": "_pytest.warning_types",
+    "PytestUnhandledThreadExceptionWarning": "_pytest.warning_types",
+    "PytestUnknownMarkWarning": "_pytest.warning_types",
+    "PytestUnraisableExceptionWarning": "_pytest.warning_types",
+    "PytestWarning": "_pytest.warning_types",
+    "set_trace": "_pytest.debugging",
+}
+
+#: The names of the namespace which differ from their name in their module.
+_renamed_attrs = {"mark": "MARK_GEN", "set_trace": "pytestPDB.set_trace"}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        modname = _lazy_attrs[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    __import__(modname)
+    attr = _renamed_attrs.get(name, name)
+    value = attrgetter(attr)(sys.modules[modname])
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
@@ -1042,6 +1042,51 @@ class TestDurationsWithFixture:
         )
 
 
+class TestDurationsByResource:
+    source = """
+        import time
+
+        def test_idle():
+            time.sleep(0.1)
+
+        def test_busy():
+            end = time.process_time() + 0.2
+            while time.process_time() < end:
+                pass
+
+        def test_garbage():
+            import gc
+            gc.collect()
+    """
+
+    def test_cpu(self, pytester: Pytester) -> None:
+        pytester.makepyfile(self.source)
+        result = pytester.runpytest_inprocess("--durations=1", "--durations-by=cpu")
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(
+            ["*slowest 1 durations by cpu*", "*s cpu call *test_busy"]
+        )
+
+    def test_gc(self, pytester: Pytester) -> None:
+        pytester.makepyfile(self.source)
+        result = pytester.runpytest_inprocess(
+            "--durations=1", "--durations-by=gc", "-vv"
+        )
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(
+            [
+                "*slowest 1 durations by gc*",
+                "*s gc (* collections) call *test_garbage",
+            ]
+        )
+
+    def test_rss(self, pytester: Pytester) -> None:
+        pytester.makepyfile(self.source)
+        result = pytester.runpytest_inprocess("--durations=0", "--durations-by=rss")
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(["*slowest durations by rss*", "*MiB rss *"])
+
+
 def test_zipimport_hook(pytester: Pytester) -> None:
     """Test package loader is being used correctly (see #1837)."""
     zipapp = pytest.importorskip("zipapp")
@@ -404,3 +404,40 @@ class DataclassWithTwoItems:
 )
 def test_consistent_pretty_printer(data: Any, expected: str) -> None:
     assert PrettyPrinter().pformat(data) == textwrap.dedent(expected).strip()
+
+
+def test_budget_elides_items() -> None:
+    data = {"a": list(range(100)), "b": set(range(100))}
+    assert PrettyPrinter(max_lines=4).pformat(data) == textwrap.dedent(
+        """\
+        {
+            'a': [
+                0,
+                1,
+                ...(98 more items)
+            ],
+            ...(1 more item)
+        }"""
+    )
+
+
+def test_budget_sorts_first_items() -> None:
+    data = {3: "c", 1: "a", 2: "b", 0: "z"}
+    assert PrettyPrinter(max_lines=3).pformat(data) == textwrap.dedent(
+        """\
+        {
+            0: 'z',
+            1: 'a',
+            ...(2 more items)
+        }"""
+    )
+
+
+def test_budget_chars() -> None:
+    lines = PrettyPrinter(max_chars=50).pformat(["x" * 20] * 10).splitlines()
+    assert lines[-2:] == ["    ...(8 more items)", "]"]
+
+
+def test_budget_not_exhausted() -> None:
+    data = [1, 2]
+    assert PrettyPrinter(max_lines=10).pformat(data) == PrettyPrinter().pformat(data)
@@ -1,4 +1,6 @@
 # mypy: allow-untyped-defs
+import reprlib
+
 from _pytest._io.saferepr import DEFAULT_REPR_MAX_SIZE
 from _pytest._io.saferepr import saferepr
 from _pytest._io.saferepr import saferepr_unlimited
@@ -190,3 +192,21 @@ def test_saferepr_unlimited_exc():
     assert saferepr_unlimited(A()).startswith(
         "<[ValueError(42) raised in repr()] A object at 0x"
     )
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {k: str(k) for k in range(100, 0, -1)},
+        set(range(100, 0, -1)),
+        frozenset(range(100, 0, -1)),
+        # Not sortable, in insertion order.
+        {k: k for k in [*range(10), "a"]},
+        {*range(10), "a"},
+    ],
+)
+def test_large_dicts_and_sets(obj) -> None:
+    """Only their first items are sorted, as reprlib shows."""
+    expected = reprlib.Repr()
+    expected.maxstring = DEFAULT_REPR_MAX_SIZE
+    assert saferepr(obj) == expected.repr(obj)
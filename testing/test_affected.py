@@ -0,0 +1,150 @@
+import json
+import os
+
+from _pytest.pytester import Pytester
+
+
+def touch(pytester: Pytester, name: str, content: str) -> None:
+    path = pytester.path.joinpath(name)
+    path.write_text(content, "utf-8")
+    # Make sure the change is seen even on filesystems with coarse mtimes.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_affected(pytester: Pytester) -> None:
+    pytester.syspathinsert()
+    pytester.makepyfile(
+        mod_a="def a(): return 1",
+        mod_b="def b(): return 2",
+        test_a="""
+        from mod_a import a
+
+        def test_a():
+            assert a() == 1
+        """,
+        test_b="""
+        from mod_b import b
+
+        def test_b():
+            assert b() == 2
+
+        def test_nothing():
+            pass
+        """,
+    )
+    result = pytester.runpytest("--record-deps")
+    result.assert_outcomes(passed=3)
+    deps = json.loads(
+        pytester.path.joinpath(".pytest_cache", "v", "affected", "deps").read_text(
+            "utf-8"
+        )
+    )
+    files = [name for name, *_ in deps["files"]]
+    assert {
+        nodeid: [files[i] for i in indexes] for nodeid, indexes in deps["tests"].items()
+    } == {
+        "test_a.py::test_a": ["mod_a.py", "test_a.py"],
+        "test_b.py::test_b": ["mod_b.py", "test_b.py"],
+        # Imported by its file.
+        "test_b.py::test_nothing": ["mod_b.py", "test_b.py"],
+    }
+
+    result = pytester.runpytest("--affected")
+    result.assert_outcomes()
+    result.stdout.fnmatch_lines(
+        ["affected: 0 changed files, skipped 2 unaffected files"]
+    )
+
+    touch(pytester, "mod_b.py", "def b(): return 3")
+    result = pytester.runpytest("--affected", "-v")
+    result.assert_outcomes(failed=1, passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "affected: 1 changed files, skipped 1 unaffected files",
+            "*::test_b FAILED*",
+        ]
+    )
+
+    # The failed test is selected until it passes again.
+    touch(pytester, "mod_b.py", "def b(): return 2")
+    result = pytester.runpytest("--affected", "--record-deps")
+    result.assert_outcomes(passed=1, deselected=1)
+    result = pytester.runpytest("--affected")
+    result.assert_outcomes()
+
+
+def test_affected_by_import_time_code(pytester: Pytester) -> None:
+    """Code which only runs while the test files are collected, such as the
+    values given to parametrize, makes their tests affected."""
+    pytester.syspathinsert()
+    pytester.makepyfile(
+        params_cases="CASES = [1, 2]",
+        params_dynamic="def cases(): return [1, 2]",
+        conftest="from params_cases import CASES",
+        test_params_static="""
+        import pytest
+        from params_cases import CASES
+
+        @pytest.mark.parametrize("x", CASES)
+        def test_params_static(x):
+            assert x < 3
+        """,
+        test_params_conftest="def test_params_conftest(): pass",
+        test_params_dynamic="""
+        import importlib
+        import pytest
+
+        @pytest.mark.parametrize("x", importlib.import_module("params_dynamic").cases())
+        def test_params_dynamic(x):
+            assert x < 3
+        """,
+    )
+    pytester.runpytest("--record-deps").assert_outcomes(passed=5)
+
+    touch(pytester, "params_dynamic.py", "def cases(): return [1, 3]")
+    result = pytester.runpytest("--affected", "--record-deps")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        ["affected: 1 changed files, skipped 2 unaffected files"]
+    )
+
+    touch(pytester, "params_cases.py", "CASES = [1, 2, 3]")
+    result = pytester.runpytest("--affected")
+    # Imported by the conftest.py file of all the tests.
+    result.assert_outcomes(passed=4, failed=2)
+    result.stdout.fnmatch_lines(
+        ["affected: 1 changed files, skipped 0 unaffected files"]
+    )
+
+
+def test_affected_new_tests(pytester: Pytester) -> None:
+    pytester.makepyfile(test_a="def test_a(): pass")
+    pytester.runpytest("--record-deps")
+    pytester.makepyfile(test_new="def test_new(): pass")
+    result = pytester.runpytest("--affected", "-v")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*::test_new PASSED*"])
+
+
+def test_affected_without_record(pytester: Pytester) -> None:
+    pytester.makepyfile(test_a="def test_a(): pass")
+    result = pytester.runpytest("--affected")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        ["affected: no recorded dependencies, running all tests"]
+    )
+
+
+def test_record_partial_run(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        test_a="""
+        def test_1(): pass
+        def test_2(): pass
+        """
+    )
+    pytester.runpytest("--record-deps", "-k", "test_1")
+    # test_2 was never recorded, so its file cannot be skipped.
+    result = pytester.runpytest("--affected", "-v")
+    result.assert_outcomes(passed=1, deselected=1)
+    result.stdout.fnmatch_lines(["*::test_2 PASSED*"])
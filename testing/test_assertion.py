@@ -536,6 +536,39 @@ class TestAssert_reprcompare:
         result = pytester.runpytest()
         result.stdout.fnmatch_lines(["E         Use -v to get more diff"])
 
+    def test_large_iterables_elided(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.delenv("CI", raising=False)
+        monkeypatch.delenv("BUILD_NUMBER", raising=False)
+        left = list(range(10_000))
+        right = [*range(9_999), -1]
+        expl = callequal(left, right, verbose=1)
+        assert expl is not None
+        assert len(expl) < 200
+        assert expl[-2:] == ["      ...(9921 more items)", "  ]"]
+        expl = callequal(left, right, verbose=2)
+        assert expl is not None
+        assert len(expl) > 10_000
+
+    def test_large_sets_and_dicts_elided(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.delenv("CI", raising=False)
+        monkeypatch.delenv("BUILD_NUMBER", raising=False)
+        expl = callequal(set(range(1000)), set(), verbose=1)
+        assert expl is not None
+        assert expl[1:3] == ["", "Extra items in the left set:"]
+        assert expl[83] == "...(920 more items)"
+        assert len(expl) < 200
+        left = {i: i for i in range(1000)}
+        expl = callequal(left, {i: -i for i in range(1, 1001)}, verbose=1)
+        assert expl is not None
+        assert "...(919 more items)" in expl
+        assert "Left contains 1 more item:" in expl
+        assert "Right contains 1 more item:" in expl
+        expl = callequal(left, {}, verbose=1)
+        assert expl is not None
+        assert expl[2:5] == ["Left contains 1000 more items:", "{0: 0,", " 1: 1,"]
+        assert "...(920 more items)" in expl
+        assert len(expl) < 200
+
     def test_list_different_lengths(self) -> None:
         expl = callequal([0, 1], [0, 1, 2])
         assert expl is not None
@@ -24,8 +24,10 @@ import zipfile
 import _pytest._code
 from _pytest._io.saferepr import DEFAULT_REPR_MAX_SIZE
 from _pytest.assertion import util
+from _pytest.assertion.archive import RewriteArchive
 from _pytest.assertion.rewrite import _get_assertion_exprs
 from _pytest.assertion.rewrite import _get_maxsize_for_saferepr
+from _pytest.assertion.rewrite import ARCHIVE_NAME
 from _pytest.assertion.rewrite import AssertionRewritingHook
 from _pytest.assertion.rewrite import get_cache_dir
 from _pytest.assertion.rewrite import PYC_TAIL
@@ -33,6 +35,7 @@ from _pytest.assertion.rewrite import PYTEST_TAG
 from _pytest.assertion.rewrite import rewrite_asserts
 from _pytest.config import Config
 from _pytest.config import ExitCode
+from _pytest.monkeypatch import MonkeyPatch
 from _pytest.pathlib import make_numbered_dir
 from _pytest.pytester import Pytester
 import pytest
@@ -1693,6 +1696,35 @@ class TestEarlyRewriteBailout:
         assert hook.find_spec("foobar") is not None
         assert self.find_spec_calls == ["conftest", "test_foo", "foobar"]
 
+    def test_bailout_cached(
+        self, pytester: Pytester, hook: AssertionRewritingHook
+    ) -> None:
+        """The modules found not to be rewritten are not checked again, until
+        what they are checked against changes."""
+        pytester.makepyfile(bar="def bar(): pass")
+        with mock.patch.object(
+            hook, "_early_rewrite_bailout", wraps=hook._early_rewrite_bailout
+        ) as bailout:
+            assert hook.find_spec("bar") is None
+            assert hook.find_spec("bar") is None
+            assert bailout.call_count == 1
+
+            hook.mark_rewrite("bar")
+            assert hook.find_spec("bar") is not None
+            assert bailout.call_count == 2
+
+        hook._must_rewrite.clear()
+        hook._marked_for_rewrite_cache.clear()
+        assert hook.find_spec("bar") is None
+        with mock.patch.object(hook, "fnpats", ["bar.py"]):
+            assert hook.find_spec("bar") is not None
+
+        assert hook.find_spec("bar") is None
+        assert hook.session is not None
+        self.initial_paths.add(pytester.path / "bar.py")
+        hook.set_session(hook.session)
+        assert hook.find_spec("bar") is not None
+
     def test_pattern_contains_subdirectories(
         self, pytester: Pytester, hook: AssertionRewritingHook
     ) -> None:
@@ -1855,6 +1887,82 @@ class TestAssertionPass:
         result = pytester.runpytest()
         result.assert_outcomes(passed=1)
 
+    def test_lazy_explanation(self, pytester: Pytester, flag_on) -> None:
+        pytester.makeconftest(
+            """\
+            explanations = []
+
+            def pytest_assertion_pass(item, lineno, orig, expl):
+                explanations.append(expl)
+            """
+        )
+        pytester.makepyfile(
+            """\
+            import conftest
+
+            class Value:
+                reprs = 0
+
+                def __repr__(self):
+                    Value.reprs += 1
+                    return "Value()"
+
+            def test_lazy():
+                v = Value()
+                assert v is not None and [v]
+                assert Value.reprs == 0
+                (expl,) = conftest.explanations[:1]
+                assert str(expl) == "(Value() is not None and [Value()])"
+                assert expl.startswith("(Value()")
+                assert Value.reprs > 0
+            """
+        )
+        result = pytester.runpytest()
+        result.assert_outcomes(passed=1)
+
+    @pytest.mark.parametrize("rate", ["0", "0.5", "1"])
+    def test_sample_rate(self, pytester: Pytester, flag_on, rate: str) -> None:
+        pytester.makeini(
+            "[pytest]\nenable_assertion_pass_hook = true\n"
+            f"assertion_pass_sample_rate = {rate}"
+        )
+        pytester.makeconftest(
+            """\
+            calls = []
+
+            def pytest_assertion_pass(item, lineno, orig, expl):
+                calls.append(lineno)
+
+            def pytest_terminal_summary(terminalreporter):
+                terminalreporter.write_line(f"calls: {len(calls)}")
+            """
+        )
+        pytester.makepyfile(
+            """\
+            def test_many():
+                for i in range(1000):
+                    assert i >= 0
+            """
+        )
+        result = pytester.runpytest()
+        result.assert_outcomes(passed=1)
+        (line,) = (line for line in result.outlines if line.startswith("calls:"))
+        calls = int(line.split()[1])
+        if rate == "0":
+            assert calls == 0
+        elif rate == "1":
+            assert calls == 1000
+        else:
+            assert 0 < calls < 1000
+
+    def test_sample_rate_usage_error(self, pytester: Pytester) -> None:
+        pytester.makepyfile("def test(): pass")
+        result = pytester.runpytest("-o", "assertion_pass_sample_rate=2")
+        assert result.ret == ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(
+            ["*assertion_pass_sample_rate must be a number between 0 and 1, got '2'"]
+        )
+
 
 # fmt: off
 @pytest.mark.parametrize(
@@ -2038,6 +2146,335 @@ class TestPyCacheDir:
         assert bar_init_pyc.is_file()
 
 
+class TestHashValidatedPycs:
+    @pytest.fixture(autouse=True)
+    def write_bytecode(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(sys, "dont_write_bytecode", False)
+        monkeypatch.setattr(sys, "pycache_prefix", None, raising=False)
+
+    def test_validated_by_hash(self, pytester: Pytester) -> None:
+        pytester.makeini("[pytest]\nassert_rewrite_validation = hash")
+        test_foo = pytester.makepyfile(test_foo="def test_foo(): assert 1")
+        pyc = get_cache_dir(test_foo) / ("test_foo" + PYC_TAIL)
+        pytester.runpytest().assert_outcomes(passed=1)
+        assert pyc.read_bytes()[4:8] == b"\x03\x00\x00\x00"
+        written = pyc.stat().st_mtime_ns
+
+        # A new modification time, as in a fresh checkout, keeps the pyc.
+        os.utime(test_foo, ns=(written + 10**10, written + 10**10))
+        pytester.runpytest().assert_outcomes(passed=1)
+        assert pyc.stat().st_mtime_ns == written
+
+        # But not a new source.
+        test_foo.write_text("def test_foo(): assert 0", encoding="utf-8")
+        pytester.runpytest().assert_outcomes(failed=1)
+
+    def test_shared_cache_dir(self, pytester: Pytester) -> None:
+        cache_dir = pytester.path / "pycs"
+        source = "def test_foo():\n    assert 0\n"
+        for checkout in ("a", "b"):
+            pytester.mkdir(checkout).joinpath("test_foo.py").write_text(
+                source, encoding="utf-8"
+            )
+
+        args = ["-o", f"assert_rewrite_cache_dir={cache_dir}", "--rootdir=."]
+        result = pytester.runpytest("a", *args)
+        result.assert_outcomes(failed=1)
+        (pyc,) = cache_dir.iterdir()
+        assert pyc.name.endswith(PYC_TAIL)
+        assert not get_cache_dir(pytester.path / "a/test_foo.py").exists()
+        written = pyc.stat().st_mtime_ns
+
+        # The other checkout reuses the pyc, with its own file name.
+        result = pytester.runpytest("b", *args)
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["b/test_foo.py:2: AssertionError"])
+        assert list(cache_dir.iterdir()) == [pyc]
+        assert pyc.stat().st_mtime_ns == written
+
+        # The rewrite configuration is part of the hash.
+        result = pytester.runpytest(
+            "b", *args, "-o", "enable_assertion_pass_hook=true"
+        )
+        result.assert_outcomes(failed=1)
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_relative_cache_dir(self, pytester: Pytester) -> None:
+        pytester.makeini("[pytest]\nassert_rewrite_cache_dir = .pycs")
+        pytester.makepyfile(test_foo="def test_foo(): assert 1")
+        pytester.runpytest().assert_outcomes(passed=1)
+        assert len(list(pytester.path.joinpath(".pycs").iterdir())) == 1
+
+    def test_invalid_validation(self, pytester: Pytester) -> None:
+        pytester.makepyfile(test_foo="def test_foo(): pass")
+        result = pytester.runpytest("-o", "assert_rewrite_validation=size")
+        assert result.ret == ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(
+            ["*assert_rewrite_validation must be mtime or hash, got 'size'"]
+        )
+
+    def test_read_pyc_hash(self, tmp_path: Path, pytester: Pytester) -> None:
+        from _pytest.assertion import AssertionState
+        from _pytest.assertion.rewrite import _read_pyc
+        from _pytest.assertion.rewrite import _rewrite_test
+        from _pytest.assertion.rewrite import _write_pyc
+
+        config = pytester.parseconfig()
+        state = AssertionState(config, "rewrite")
+        fn = tmp_path / "source.py"
+        fn.write_text("def test(): assert True", encoding="utf-8")
+        source_stat, co = _rewrite_test(fn, config)
+
+        pyc = tmp_path / "hash.pyc"
+        _write_pyc(state, co, source_stat, pyc, b"12345678")
+        assert _read_pyc(fn, pyc, state.trace, b"12345678") is not None
+        assert _read_pyc(fn, pyc, state.trace, b"87654321") is None
+        assert _read_pyc(fn, pyc, state.trace) is None
+
+        pyc = tmp_path / "mtime.pyc"
+        _write_pyc(state, co, source_stat, pyc)
+        assert _read_pyc(fn, pyc, state.trace) is not None
+        assert _read_pyc(fn, pyc, state.trace, b"12345678") is None
+
+
+class TestRewriteArchive:
+    @pytest.fixture(autouse=True)
+    def write_bytecode(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(sys, "dont_write_bytecode", False)
+        monkeypatch.setattr(sys, "pycache_prefix", None, raising=False)
+
+    def archive(self, path: Path) -> RewriteArchive:
+        archive = RewriteArchive(path / ARCHIVE_NAME)
+        archive._open()
+        return archive
+
+    def test_archive(self, pytester: Pytester) -> None:
+        pytester.makeini("[pytest]\nassert_rewrite_storage = archive")
+        test_foo = pytester.makepyfile(test_foo="def test_foo(): assert 1")
+        pytester.runpytest().assert_outcomes(passed=1)
+        assert not get_cache_dir(test_foo).exists()
+        archive_dir = pytester.path / ".pytest_cache/d/assertion-rewrite"
+        assert pytester.path.joinpath(".pytest_cache/.gitignore").is_file()
+        archive = self.archive(archive_dir)
+        assert len(archive._open()) == 1
+        archive.close()
+        written = archive.path.stat().st_mtime_ns
+
+        pytester.runpytest().assert_outcomes(passed=1)
+        assert archive.path.stat().st_mtime_ns == written
+
+        test_foo.write_text("def test_foo(): assert 0", encoding="utf-8")
+        pytester.runpytest().assert_outcomes(failed=1)
+        archive = self.archive(archive_dir)
+        paths = sorted(Path(path).name for path, _, _ in archive._open().values())
+        assert paths == ["test_foo.py"]
+        archive.close()
+
+    def test_archive_rewrite_options(self, pytester: Pytester) -> None:
+        """The code archived for other rewrite options is not reused."""
+        pytester.makeini("[pytest]\nassert_rewrite_storage = archive")
+        pytester.makeconftest(
+            """
+            def pytest_assertion_pass(item, lineno, orig, expl):
+                print("passed:", orig)
+            """
+        )
+        pytester.makepyfile(test_foo="def test_foo(): assert 1 == 1")
+        result = pytester.runpytest("-s")
+        result.assert_outcomes(passed=1)
+        result.stdout.no_fnmatch_line("passed:*")
+
+        result = pytester.runpytest("-s", "-o", "enable_assertion_pass_hook=true")
+        result.assert_outcomes(passed=1)
+        result.stdout.fnmatch_lines(["*passed: 1 == 1"])
+
+        result = pytester.runpytest("-s", "-o", "assert_rewrite_mode=lazy")
+        result.assert_outcomes(passed=1)
+        result.stdout.no_fnmatch_line("passed:*")
+        archive = self.archive(pytester.path / ".pytest_cache/d/assertion-rewrite")
+        # The code rewritten for the last options replaced the others.
+        assert len(archive._open()) == 2
+        archive.close()
+
+    def test_shared_cache_dir(self, pytester: Pytester) -> None:
+        cache_dir = pytester.path / "pycs"
+        for checkout in ("a", "b"):
+            pytester.mkdir(checkout).joinpath("test_foo.py").write_text(
+                "def test_foo():\n    assert 0\n", encoding="utf-8"
+            )
+        args = [
+            "-o",
+            f"assert_rewrite_cache_dir={cache_dir}",
+            "-o",
+            "assert_rewrite_storage=archive",
+            "--rootdir=.",
+            "-p",
+            "no:cacheprovider",
+        ]
+        pytester.runpytest("a", *args).assert_outcomes(failed=1)
+        assert [p.name for p in cache_dir.iterdir()] == [ARCHIVE_NAME]
+        written = cache_dir.joinpath(ARCHIVE_NAME).stat().st_mtime_ns
+
+        result = pytester.runpytest("b", *args)
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["b/test_foo.py:2: AssertionError"])
+        assert cache_dir.joinpath(ARCHIVE_NAME).stat().st_mtime_ns == written
+
+    def test_merge(self, tmp_path: Path) -> None:
+        """Archives saved concurrently keep the entries of one another, but
+        for the other versions of the modules they add."""
+        first = RewriteArchive(tmp_path / ARCHIVE_NAME)
+        first.add(b"a" * 16, "a.py", b"code a")
+        first.add(b"b" * 16, "b.py", b"code b")
+        assert first.save()
+
+        first = RewriteArchive(tmp_path / ARCHIVE_NAME)
+        second = RewriteArchive(tmp_path / ARCHIVE_NAME)
+        assert first.get(b"a" * 16) == b"code a"
+        assert second.get(b"b" * 16) == b"code b"
+        first.add(b"c" * 16, "c.py", b"code c")
+        second.add(b"B" * 16, "b.py", b"new code b")
+        assert first.save()
+        assert second.save()
+
+        archive = RewriteArchive(tmp_path / ARCHIVE_NAME)
+        assert archive.get(b"a" * 16) == b"code a"
+        assert archive.get(b"b" * 16) is None
+        assert archive.get(b"B" * 16) == b"new code b"
+        assert archive.get(b"c" * 16) == b"code c"
+        archive.close()
+
+    def test_invalid_archive(self, tmp_path: Path) -> None:
+        path = tmp_path / ARCHIVE_NAME
+        archive = RewriteArchive(path)
+        archive.add(b"a" * 16, "a.py", b"code a")
+        assert archive.save()
+        path.write_bytes(path.read_bytes()[:-1])
+        assert RewriteArchive(path).get(b"a" * 16) is None
+        path.write_bytes(b"")
+        assert RewriteArchive(path).get(b"a" * 16) is None
+
+    def test_usage_errors(self, pytester: Pytester) -> None:
+        pytester.makepyfile(test_foo="def test_foo(): pass")
+        result = pytester.runpytest("-o", "assert_rewrite_storage=zip")
+        assert result.ret == ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(
+            ["*assert_rewrite_storage must be files or archive, got 'zip'"]
+        )
+        result = pytester.runpytest(
+            "-o", "assert_rewrite_storage=archive", "-p", "no:cacheprovider"
+        )
+        assert result.ret == ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(["*needs the cacheprovider plugin*"])
+
+
+class TestLazyRewriteMode:
+    def test_same_explanation(self, pytester: Pytester) -> None:
+        pytester.makepyfile(
+            test_foo="""
+            def f(x):
+                return x
+
+            def test_compare():
+                assert f([1, 2]) == [1, 3]
+
+            def test_boolop():
+                x = 1
+                assert x == 1 and f(x) > 2, "message"
+
+            def test_pass():
+                for i in range(3):
+                    assert i < 3
+            """
+        )
+
+        def explanations(*args: str) -> List[str]:
+            result = pytester.runpytest(*args)
+            result.assert_outcomes(passed=1, failed=2)
+            return [line for line in result.outlines if line.startswith("E ")]
+
+        full = explanations()
+        assert "E        +  where 1 = f(1)" in full
+        assert explanations("-o", "assert_rewrite_mode=lazy") == full
+
+    def test_evaluated_again_on_failure(self, pytester: Pytester) -> None:
+        pytester.makeini("[pytest]\nassert_rewrite_mode = lazy")
+        pytester.makepyfile(
+            test_foo="""
+            calls = []
+
+            def f(x):
+                calls.append(x)
+                return x
+
+            def test_pass():
+                assert f(1) == 1
+                assert calls == [1]
+
+            def test_fail():
+                try:
+                    assert f(2) == 3
+                finally:
+                    assert calls == [1, 2, 2]
+            """
+        )
+        result = pytester.runpytest()
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(["E * assert 2 == 3"])
+
+    def test_passed_when_evaluated_again(self, pytester: Pytester) -> None:
+        pytester.makeini("[pytest]\nassert_rewrite_mode = lazy")
+        pytester.makepyfile(
+            test_foo="""
+            def test_foo():
+                it = iter([1, 2])
+                assert next(it) == 2, "message"
+            """
+        )
+        result = pytester.runpytest()
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(
+            [
+                "E       AssertionError: message",
+                "E       assert next(it) == 2",
+                "E         (the assertion passed when evaluated again *)",
+            ]
+        )
+
+    def test_assertion_pass_hook(self, pytester: Pytester) -> None:
+        pytester.makeini(
+            "[pytest]\nassert_rewrite_mode = lazy\nenable_assertion_pass_hook = true"
+        )
+        pytester.makeconftest(
+            """
+            def pytest_assertion_pass(item, lineno, orig, expl):
+                print("passed:", orig, "|", expl)
+            """
+        )
+        pytester.makepyfile(
+            test_foo="""
+            def test_pass():
+                x = 1
+                assert x == 1
+
+            def test_fail():
+                x = 1
+                assert x == 2
+            """
+        )
+        result = pytester.runpytest("-s")
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(["*passed: x == 1 | 1 == 1", "E       assert 1 == 2"])
+
+    def test_usage_error(self, pytester: Pytester) -> None:
+        pytester.makepyfile(test_foo="def test_foo(): pass")
+        result = pytester.runpytest("-o", "assert_rewrite_mode=fast")
+        assert result.ret == ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(
+            ["*assert_rewrite_mode must be full or lazy, got 'fast'"]
+        )
+
+
 class TestReprSizeVerbosity:
     """
     Check that verbosity also controls the string length threshold to shorten it using
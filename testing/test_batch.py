@@ -0,0 +1,213 @@
+from _pytest.pytester import Pytester
+import pytest
+
+
+def test_batch_shares_fixture_setup(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        setups = []
+
+        @pytest.fixture
+        def resource():
+            setups.append(1)
+            yield len(setups)
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3, 4])
+        def test_case(resource, x):
+            assert x != 3
+
+        def test_setups():
+            assert setups == [1]
+        """
+    )
+    result = pytester.runpytest("-v")
+    result.assert_outcomes(passed=4, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*::test_case[[]1[]] PASSED*",
+            "*::test_case[[]2[]] PASSED*",
+            "*::test_case[[]3[]] FAILED*",
+            "*::test_case[[]4[]] PASSED*",
+            "*::test_setups PASSED*",
+        ]
+    )
+
+
+def test_batch_split_by_fixture_params(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        setups = []
+
+        @pytest.fixture(scope="module", params=["a", "b"])
+        def resource(request):
+            setups.append(request.param)
+            return request.param
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_case(resource, x):
+            pass
+
+        def test_setups():
+            assert setups == ["a", "b"]
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=7)
+
+
+def test_batch_not_used_when_fixture_depends_on_param(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture
+        def doubled(x):
+            return x * 2
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_case(doubled, x):
+            assert doubled == x * 2
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=3)
+
+
+def test_batch_case_marks(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize(
+            "x", [1, pytest.param(2, marks=pytest.mark.skip), 3]
+        )
+        def test_case(x):
+            pass
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, skipped=1)
+
+
+def test_batch_reports(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_case(x):
+            assert x != 2
+        """
+    )
+    result = pytester.runpytest("--junit-xml=junit.xml")
+    result.assert_outcomes(passed=2, failed=1)
+    xml = pytester.path.joinpath("junit.xml").read_text("utf-8")
+    assert xml.count("<testcase ") == 3
+    assert xml.count("<failure ") == 1
+
+    result = pytester.runpytest("--lf", "-v")
+    result.assert_outcomes(passed=0, failed=1)
+    result.stdout.fnmatch_lines(["*::test_case[[]2[]] FAILED*"])
+
+
+def test_batch_exitfirst(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_case(x):
+            assert x != 2
+        """
+    )
+    result = pytester.runpytest("-x")
+    result.assert_outcomes(passed=1, failed=1)
+
+
+def test_batch_cases_run_again(pytester: Pytester) -> None:
+    """The cases of a batch run again when their protocol is called again,
+    as is done by plugins re-running the tests."""
+    pytester.makeconftest(
+        """
+        import pytest
+
+        @pytest.hookimpl(wrapper=True)
+        def pytest_runtestloop(session):
+            yield
+            for item in session.items:
+                item.ihook.pytest_runtest_protocol(item=item, nextitem=None)
+            return True
+        """
+    )
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_case(x):
+            assert x != 2
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=4, failed=2)
+
+
+def test_batch_not_used_with_request_bound_fixtures(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2, 3])
+        def test_prop(record_property, x):
+            record_property("x", x)
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2])
+        def test_tmp_path(tmp_path, x):
+            assert not list(tmp_path.iterdir())
+            tmp_path.joinpath("file").touch()
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2])
+        def test_request(request, x):
+            assert request.node.name == f"test_request[{x}]"
+        """
+    )
+    result = pytester.runpytest("--junit-xml=junit.xml", "-o", "junit_family=xunit1")
+    result.assert_outcomes(passed=7)
+    xml = pytester.path.joinpath("junit.xml").read_text("utf-8")
+    for x in (1, 2, 3):
+        assert f'<property name="x" value="{x}" />' in xml
+
+
+@pytest.mark.filterwarnings("default::UserWarning")
+def test_batch_warnings(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import warnings
+        import pytest
+
+        @pytest.mark.batch
+        @pytest.mark.parametrize("x", [1, 2])
+        def test_case(x):
+            warnings.warn(UserWarning(f"case {x}"))
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, warnings=2)
+    for x in (1, 2):
+        result.stdout.fnmatch_lines(
+            [f"*::test_case[[]{x}[]]", f"*UserWarning: case {x}"]
+        )
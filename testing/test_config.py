@@ -28,6 +28,7 @@ from _pytest.config.exceptions import UsageError
 from _pytest.config.findpaths import determine_setup
 from _pytest.config.findpaths import get_common_ancestor
 from _pytest.config.findpaths import locate_config
+from _pytest.config.plugincache import CachedDistribution
 from _pytest.monkeypatch import MonkeyPatch
 from _pytest.pathlib import absolutepath
 from _pytest.pytester import Pytester
@@ -1253,6 +1254,74 @@ def test_disable_plugin_autoload(
         assert PseudoPlugin.attrs_used == []
 
 
+class TestPluginCache:
+    @pytest.fixture
+    def dist_info(self, pytester: Pytester, monkeypatch: MonkeyPatch) -> Path:
+        """An installed distribution with a pytest11 entry point."""
+        monkeypatch.delenv("PYTEST_DISABLE_PLUGIN_AUTOLOAD", raising=False)
+        pytester.makepyfile(myplugin_module="x = 42")
+        dist_info = pytester.mkdir("myplugin-1.0.dist-info")
+        dist_info.joinpath("METADATA").write_text(
+            "Metadata-Version: 2.1\nName: myplugin\nVersion: 1.0\n", encoding="utf-8"
+        )
+        dist_info.joinpath("RECORD").write_text(
+            "myplugin_module.py,,\n", encoding="utf-8"
+        )
+        dist_info.joinpath("entry_points.txt").write_text(
+            "[pytest11]\nmyplugin = myplugin_module\n", encoding="utf-8"
+        )
+        pytester.syspathinsert()
+        return dist_info
+
+    def test_cached(
+        self, pytester: Pytester, monkeypatch: MonkeyPatch, dist_info: Path
+    ) -> None:
+        config = pytester.parseconfig()
+        assert config.pluginmanager.get_plugin("myplugin").x == 42
+        assert "myplugin_module" in config._rewritable_plugin_modules
+        assert config.pluginmanager._cached_entry_points is None
+
+        def distributions():
+            assert False, "the entry points should come from the cache"
+
+        with monkeypatch.context() as mp:
+            mp.setattr(importlib.metadata, "distributions", distributions)
+            config = pytester.parseconfig()
+        assert config.pluginmanager.get_plugin("myplugin").x == 42
+        assert "myplugin_module" in config._rewritable_plugin_modules
+        [(plugin, dist)] = [
+            (plugin, dist)
+            for plugin, dist in config.pluginmanager.list_plugin_distinfo()
+            if dist.project_name == "myplugin"
+        ]
+        assert isinstance(dist, CachedDistribution)
+        assert dist.version == "1.0"
+        assert dist.metadata["Name"] == "myplugin"
+
+    def test_invalidated(self, pytester: Pytester, dist_info: Path) -> None:
+        pytester.parseconfig()
+        pytester.makepyfile(otherplugin_module="y = 1")
+        entry_points = dist_info.joinpath("entry_points.txt")
+        entry_points.write_text(
+            "[pytest11]\nmyplugin = otherplugin_module\n", encoding="utf-8"
+        )
+        os.utime(entry_points, ns=(0, 0))
+        config = pytester.parseconfig()
+        assert config.pluginmanager._cached_entry_points is None
+        assert config.pluginmanager.get_plugin("myplugin").y == 1
+
+    @pytest.mark.parametrize(
+        "args", [("--no-plugin-cache",), ("-p", "no:cacheprovider")]
+    )
+    def test_disabled(
+        self, pytester: Pytester, dist_info: Path, args: Tuple[str, ...]
+    ) -> None:
+        pytester.parseconfig()
+        config = pytester.parseconfig(*args)
+        assert config.pluginmanager._cached_entry_points is None
+        assert config.pluginmanager.get_plugin("myplugin").x == 42
+
+
 def test_plugin_loading_order(pytester: Pytester) -> None:
     """Test order of plugin loading with `-p`."""
     p1 = pytester.makepyfile(
@@ -0,0 +1,67 @@
+import os
+
+from _pytest import daemon
+from _pytest.config import ExitCode
+from _pytest.pytester import Pytester
+import pytest
+
+
+pytestmark = pytest.mark.skipif(
+    not daemon.is_supported(), reason="requires fork and Unix sockets"
+)
+
+
+@pytest.fixture
+def project(pytester: Pytester) -> Pytester:
+    pytester.makepyfile(
+        helper="""
+            with open("imports.txt", "a") as f:
+                f.write("helper\\n")
+            state = []
+        """,
+        conftest="import helper",
+        test_daemon="""
+            import helper
+
+            def test_passing():
+                # Each run starts from the state of the daemon.
+                assert helper.state == []
+                helper.state.append(1)
+
+            def test_failing():
+                assert 0
+        """,
+    )
+    yield pytester
+    pytester.runpytest_subprocess("--daemon-stop")
+
+
+def test_daemon(project: Pytester) -> None:
+    result = project.runpytest_subprocess("--daemon")
+    assert result.ret == ExitCode.TESTS_FAILED
+    result.stdout.fnmatch_lines(["*test_failing*", "* 1 failed, 1 passed in *"])
+
+    result = project.runpytest_subprocess("--daemon", "-k", "passing")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["* 1 passed, 1 deselected in *"])
+    assert project.path.joinpath("imports.txt").read_text() == "helper\n"
+
+    # A change to a module loaded by the daemon starts a new one.
+    helper = project.path / "helper.py"
+    st = helper.stat()
+    os.utime(helper, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    result = project.runpytest_subprocess("--daemon", "-k", "passing")
+    assert result.ret == ExitCode.OK
+    assert project.path.joinpath("imports.txt").read_text() == "helper\n" * 2
+
+
+def test_daemon_stop(project: Pytester) -> None:
+    result = project.runpytest_subprocess("--daemon-stop")
+    result.stdout.fnmatch_lines(["no pytest daemon running"])
+
+    project.runpytest_subprocess("--daemon", "-k", "passing")
+    result = project.runpytest_subprocess("--daemon-stop")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["pytest daemon stopped"])
+    result = project.runpytest_subprocess("--daemon-stop")
+    result.stdout.fnmatch_lines(["no pytest daemon running"])
@@ -0,0 +1,141 @@
+import json
+
+from _pytest.config import ExitCode
+from _pytest.pytester import Pytester
+
+
+def history_path(pytester: Pytester):
+    return pytester.path.joinpath(".pytest_cache", "d", "history", "runs.jsonl")
+
+
+def test_records_outcomes(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture
+        def broken():
+            raise RuntimeError()
+
+        def test_pass():
+            pass
+
+        def test_fail():
+            assert 0
+
+        def test_error(broken):
+            pass
+
+        def test_skip():
+            pytest.skip()
+
+        @pytest.mark.xfail
+        def test_xfail():
+            assert 0
+        """
+    )
+    pytester.runpytest()
+    pytester.runpytest()
+    lines = history_path(pytester).read_text("utf-8").splitlines()
+    assert len(lines) == 2
+    run = json.loads(lines[0])
+    assert {nodeid: result[0] for nodeid, result in run["tests"].items()} == {
+        "test_records_outcomes.py::test_pass": "passed",
+        "test_records_outcomes.py::test_fail": "failed",
+        "test_records_outcomes.py::test_error": "error",
+        "test_records_outcomes.py::test_skip": "skipped",
+        "test_records_outcomes.py::test_xfail": "xfailed",
+    }
+    assert pytester.path.joinpath(".pytest_cache", ".gitignore").is_file()
+
+    result = pytester.runpytest("--history-show", "*::test_[ps]*")
+    assert result.ret == 0
+    result.stdout.fnmatch_lines(
+        [
+            "*- recorded results for '*::test_[[]ps[]]*' -*",
+            "test_records_outcomes.py::test_pass: last passed, median *s "
+            "over 2 runs (2 passed)",
+            "test_records_outcomes.py::test_skip: last skipped, median - "
+            "over 2 runs (2 skipped)",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_fail*")
+    # Showing the history does not record a run.
+    assert len(history_path(pytester).read_text("utf-8").splitlines()) == 2
+
+
+def test_compaction(pytester: Pytester) -> None:
+    pytester.makeini("[pytest]\nhistory_runs = 2")
+    pytester.makepyfile("def test_pass(): pass")
+    for _ in range(5):
+        pytester.runpytest()
+        assert len(history_path(pytester).read_text("utf-8").splitlines()) <= 3
+    result = pytester.runpytest("--history-show")
+    result.stdout.fnmatch_lines(["*::test_pass: last passed, * over 2 runs*"])
+
+
+def test_disabled(pytester: Pytester) -> None:
+    pytester.makeini("[pytest]\nhistory_runs = 0")
+    pytester.makepyfile("def test_pass(): pass")
+    pytester.runpytest()
+    assert not history_path(pytester).exists()
+    result = pytester.runpytest("--history-show")
+    result.stdout.fnmatch_lines(["the test history is disabled"])
+
+
+def test_slower_than_usual(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def test_slow():
+            time.sleep(0.2)
+
+        def test_fast():
+            pass
+        """
+    )
+    path = history_path(pytester)
+    path.parent.mkdir(parents=True)
+    run = {
+        "time": 0.0,
+        "tests": {
+            "test_slower_than_usual.py::test_slow": ["passed", 0.0, 0.01, 0.0],
+            "test_slower_than_usual.py::test_fast": ["passed", 0.0, 0.01, 0.0],
+        },
+    }
+    path.write_text(f"{json.dumps(run)}\n" * 5, "utf-8")
+    result = pytester.runpytest()
+    result.stdout.fnmatch_lines(
+        [
+            "*= slower than usual =*",
+            "test_slower_than_usual.py::test_slow took *s, *x its 5-run median "
+            "of 0.01s",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_fast took*")
+
+    result = pytester.runpytest("-o", "history_slowdown_factor=0")
+    result.stdout.no_fnmatch_line("*slower than usual*")
+
+
+def test_malformed_entries_skipped(pytester: Pytester) -> None:
+    pytester.makepyfile("def test_pass(): pass")
+    path = history_path(pytester)
+    path.parent.mkdir(parents=True)
+    bad_run = {"time": 0.0, "tests": {"test_malformed_entries_skipped.py::x": [1]}}
+    path.write_text(f"{json.dumps(bad_run)}\nnot json\n", "utf-8")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+    result = pytester.runpytest("--history-show")
+    result.stdout.fnmatch_lines(["*::test_pass: last passed, * over 1 runs*"])
+    result.stdout.no_fnmatch_line("*::x*")
+
+
+def test_invalid_slowdown_factor(pytester: Pytester) -> None:
+    pytester.makepyfile("def test_pass(): pass")
+    result = pytester.runpytest("-o", "history_slowdown_factor=fast")
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(
+        ["*history_slowdown_factor must be a number, got 'fast'"]
+    )
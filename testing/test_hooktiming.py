@@ -0,0 +1,64 @@
+import json
+
+from _pytest.pytester import Pytester
+
+
+def test_hook_durations(pytester: Pytester) -> None:
+    pytester.makeconftest(
+        """
+        import time
+
+        import pytest
+
+        def pytest_runtest_setup(item):
+            time.sleep(0.05)
+
+        @pytest.hookimpl(wrapper=True)
+        def pytest_runtest_call(item):
+            time.sleep(0.01)
+            return (yield)
+
+        @pytest.hookimpl(hookwrapper=True)
+        def pytest_runtest_makereport(item, call):
+            outcome = yield
+            outcome.get_result().user_properties.append(("wrapped", True))
+
+        def pytest_runtest_logreport(report):
+            if report.when == "call":
+                assert report.user_properties == [("wrapped", True)]
+        """
+    )
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def test_pass():
+            pass
+
+        def test_fail():
+            assert False
+        """
+    )
+    result = pytester.runpytest("--hook-durations=3")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*= slowest 3 hook implementations =*",
+            "*own*total*calls  hook  plugin",
+            "*s *s        2  pytest_runtest_setup  *conftest.py",
+        ]
+    )
+
+
+def test_hook_durations_json(pytester: Pytester) -> None:
+    pytester.makepyfile("def test(): pass")
+    result = pytester.runpytest("--hook-durations-json=hooks.json")
+    result.assert_outcomes(passed=1)
+    result.stdout.no_fnmatch_line("*slowest*hook implementations*")
+    data = json.loads(pytester.path.joinpath("hooks.json").read_text("utf-8"))
+    assert data
+    entry = next(d for d in data if d["hook"] == "pytest_runtest_protocol")
+    assert entry["calls"] == 1
+    assert entry["total"] >= entry["own"] >= 0
+    assert set(entry) == {"hook", "plugin", "calls", "total", "own"}
+    assert [d["own"] for d in data] == sorted((d["own"] for d in data), reverse=True)
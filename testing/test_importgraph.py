@@ -0,0 +1,116 @@
+import subprocess
+
+from _pytest.importgraph import parse_imports
+from _pytest.pytester import Pytester
+import pytest
+
+
+def test_parse_imports() -> None:
+    source = b"""
+import a.b
+from c import d, e as f
+from . import g
+from ..h import i
+from j import *
+pytest_plugins = ["k.plugin", "l"]
+"""
+    assert parse_imports(source, "x.py") == [
+        ".",
+        "..h",
+        "..h.i",
+        ".g",
+        "a.b",
+        "c",
+        "c.d",
+        "c.e",
+        "j",
+        "pytest_plugins:k.plugin",
+        "pytest_plugins:l",
+    ]
+
+
+@pytest.fixture
+def project(pytester: Pytester) -> Pytester:
+    pytester.makepyfile(
+        **{
+            "pkg/__init__.py": "",
+            "pkg/core.py": "def core(): return 1",
+            "pkg/util.py": "from .core import core",
+            "pkg/other.py": "def other(): return 2",
+            "helpers/__init__.py": "",
+            "helpers/fixtures.py": "from pkg.other import other",
+            "helpers/plugin.py": "",
+            "conftest.py": "pytest_plugins = 'helpers.plugin'",
+            "tests/test_util.py": """
+                from pkg.util import core
+                def test_util(): assert core() == 1
+            """,
+            "tests/test_other.py": """
+                from pkg import other
+                def test_other(): assert other.other() == 2
+            """,
+            "tests/fixtures/conftest.py": "from helpers.fixtures import *",
+            "tests/fixtures/test_fixtures.py": "def test_fixtures(): pass",
+            "tests/test_alone.py": "def test_alone(): pass",
+        }
+    )
+    pytester.makeini("[pytest]\npythonpath = .")
+    return pytester
+
+
+def test_changed_files(project: Pytester) -> None:
+    result = project.runpytest("--changed-since=pkg/core.py", "-v")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "changed-since: 1 changed files, skipped 3 unaffected test files",
+            "tests/test_util.py::test_util PASSED*",
+        ]
+    )
+
+    result = project.runpytest("--changed-since=pkg/other.py,README.txt", "-v")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "changed-since: 2 changed files, skipped 2 unaffected test files",
+            "tests/fixtures/test_fixtures.py::test_fixtures PASSED*",
+            "tests/test_other.py::test_other PASSED*",
+        ]
+    )
+
+    # pkg/__init__.py runs whenever pkg is imported.
+    result = project.runpytest("--changed-since=pkg/__init__.py")
+    result.assert_outcomes(passed=3)
+
+    result = project.runpytest("--changed-since=tests/fixtures/conftest.py")
+    result.assert_outcomes(passed=1)
+
+    # Plugins apply to all tests.
+    result = project.runpytest("--changed-since=helpers/plugin.py")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["changed-since: 1 changed files, running all tests"])
+
+    result = project.runpytest("--changed-since=tox.ini")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(["changed-since: 1 changed files, running all tests"])
+
+
+def test_changed_since_git_ref(project: Pytester) -> None:
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", *args], cwd=project.path, check=True, capture_output=True
+        )
+
+    try:
+        git("init", "-q")
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("git is not available")
+    git("add", ".")
+    git("-c", "user.name=a", "-c", "user.email=a@b", "commit", "-qm", "initial")
+    project.path.joinpath("pkg", "core.py").write_text("def core(): return 3")
+    result = project.runpytest("--changed-since=HEAD")
+    result.assert_outcomes(failed=1)
+
+    result = project.runpytest("--changed-since=no-such-ref")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["ERROR: --changed-since: git diff * failed: *"])
@@ -0,0 +1,83 @@
+from _pytest.config import ExitCode
+from _pytest.lazyplugins import LazyPlugin
+from _pytest.pytester import Pytester
+import pytest
+
+
+@pytest.fixture
+def loaded(pytester: Pytester) -> Pytester:
+    """A project whose test reports which lazy plugins got loaded."""
+    pytester.makeconftest(
+        """
+        from _pytest.lazyplugins import LazyPlugin
+
+        def pytest_sessionfinish(session):
+            pm = session.config.pluginmanager
+            loaded = [
+                name
+                for name in ("junitxml", "pastebin", "setuponly", "setupplan")
+                if pm.get_plugin(name) is not None
+                and not isinstance(pm.get_plugin(name), LazyPlugin)
+            ]
+            print("loaded:", ",".join(loaded) or "none")
+        """
+    )
+    return pytester
+
+
+def test_not_loaded_by_default(loaded: Pytester) -> None:
+    loaded.makepyfile("def test_it(): pass")
+    result = loaded.runpytest("-s")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["*loaded: none"])
+
+
+def test_loaded_by_option(loaded: Pytester) -> None:
+    loaded.makepyfile("def test_it(): pass")
+    result = loaded.runpytest("-s", "--junit-xml=junit.xml", "--setup-plan")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["*loaded: junitxml,setuponly,setupplan"])
+    assert loaded.path.joinpath("junit.xml").exists()
+
+
+def test_loaded_by_ini(loaded: Pytester) -> None:
+    loaded.makepyfile("def test_it(): pass")
+    result = loaded.runpytest("-s", "-o", "junit_family=legacy")
+    result.stdout.fnmatch_lines(["*loaded: junitxml"])
+
+
+def test_loaded_by_fixture(loaded: Pytester) -> None:
+    loaded.makepyfile(
+        """
+        def test_it(record_property):
+            record_property("key", "value")
+        """
+    )
+    result = loaded.runpytest("-s")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["*loaded: junitxml"])
+
+
+def test_blocked(pytester: Pytester) -> None:
+    pytester.makepyfile("def test_it(record_property): pass")
+    result = pytester.runpytest("-p", "no:junitxml")
+    result.stdout.fnmatch_lines(["*fixture 'record_property' not found"])
+    result = pytester.runpytest("-p", "no:junitxml", "--junit-xml=junit.xml")
+    result.stderr.fnmatch_lines(["*unrecognized arguments: --junit-xml=junit.xml"])
+
+
+def test_help_and_fixtures(pytester: Pytester) -> None:
+    result = pytester.runpytest("--help")
+    result.stdout.fnmatch_lines(["*--junit-xml=path*", "*junit_family*"])
+    result = pytester.runpytest("--fixtures")
+    result.stdout.fnmatch_lines(["record_property*"])
+
+
+def test_getplugin_loads(pytester: Pytester) -> None:
+    config = pytester.parseconfig()
+    pm = config.pluginmanager
+    assert isinstance(pm.get_plugin("pastebin"), LazyPlugin)
+    assert pm.hasplugin("pastebin")
+    plugin = pm.getplugin("pastebin")
+    assert plugin.__name__ == "_pytest.pastebin"
+    assert pm.get_plugin("pastebin") is plugin
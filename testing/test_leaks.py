@@ -0,0 +1,199 @@
+import os
+import sys
+
+from _pytest.pytester import Pytester
+import pytest
+
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or not os.path.isdir("/proc/self"),
+    reason="--track-leaks reads /proc",
+)
+
+
+# The inner runs inherit the "error" filter of the outer run.
+leak_warnings_default = pytest.mark.filterwarnings(
+    "default::pytest.PytestResourceLeakWarning"
+)
+
+
+@leak_warnings_default
+def test_fd_leak(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        leaked = []
+
+        def test_leak(tmp_path):
+            leaked.append(open(tmp_path / "leaked.txt", "w"))
+
+        def test_no_leak(tmp_path):
+            with open(tmp_path / "closed.txt", "w"):
+                pass
+            leaked.pop().close()
+        """
+    )
+    result = pytester.runpytest("--track-leaks=fds")
+    result.assert_outcomes(passed=2, warnings=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*PytestResourceLeakWarning: test_fd_leak.py::test_leak leaked resources:",
+            "*fds: * -> */leaked.txt",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_no_leak leaked*")
+
+
+@leak_warnings_default
+def test_thread_leak(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import threading
+
+        stop = threading.Event()
+
+        def test_leak():
+            threading.Thread(target=stop.wait, name="Leaky").start()
+
+        def test_stop():
+            stop.set()
+        """
+    )
+    result = pytester.runpytest("--track-leaks=threads")
+    result.assert_outcomes(passed=2, warnings=1)
+    result.stdout.fnmatch_lines(["*threads: <Thread(Leaky, started*"])
+
+
+@leak_warnings_default
+def test_child_and_tmpfile_leak(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import os
+        import subprocess
+        import sys
+        import tempfile
+
+        procs = []
+        paths = []
+
+        def test_leak():
+            procs.append(subprocess.Popen([sys.executable, "-c", "pass"]))
+            fd, path = tempfile.mkstemp(prefix="leaky-")
+            os.close(fd)
+            paths.append(path)
+
+        def test_cleanup():
+            for proc in procs:
+                proc.wait()
+            for path in paths:
+                os.remove(path)
+        """
+    )
+    result = pytester.runpytest("--track-leaks=children,tmpfiles")
+    result.assert_outcomes(passed=2, warnings=1)
+    result.stdout.fnmatch_lines(
+        ["*children: pid * (*)", "*tmpfiles: *leaky-*"],
+        consecutive=False,
+    )
+
+
+def test_leak_as_error(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import threading
+
+        stop = threading.Event()
+
+        def test_leak():
+            threading.Thread(target=stop.wait).start()
+
+        def test_stop():
+            stop.set()
+        """
+    )
+    result = pytester.runpytest(
+        "--track-leaks=all", "-W", "error::pytest.PytestResourceLeakWarning"
+    )
+    result.assert_outcomes(passed=2, errors=1)
+    result.stdout.fnmatch_lines(["*ERROR at teardown of test_leak*"])
+
+
+@leak_warnings_default
+def test_higher_scoped_fixture_resources(pytester: Pytester) -> None:
+    pytester.makeconftest(
+        """
+        import os
+
+        unclosed_fds = []
+
+        def pytest_unconfigure():
+            for fd in unclosed_fds:
+                os.close(fd)
+        """
+    )
+    pytester.makepyfile(
+        """
+        import os
+        import pytest
+        from conftest import unclosed_fds
+
+        @pytest.fixture(scope="module")
+        def kept(tmp_path_factory):
+            with open(tmp_path_factory.mktemp("kept") / "kept.txt", "w") as f:
+                yield f
+
+        @pytest.fixture(scope="module")
+        def unclosed(tmp_path_factory):
+            path = tmp_path_factory.mktemp("unclosed") / "unclosed.txt"
+            unclosed_fds.append(os.open(path, os.O_WRONLY | os.O_CREAT))
+
+        def test_a(kept):
+            pass
+
+        def test_b(kept, unclosed):
+            pass
+        """
+    )
+    result = pytester.runpytest(
+        "--track-leaks=fds", "-W", "error::pytest.PytestResourceLeakWarning"
+    )
+    result.assert_outcomes(passed=2, errors=1)
+    # The fixture which never closes its file leaks it once torn down, with
+    # the teardown of the last test of the module.
+    result.stdout.fnmatch_lines(
+        [
+            "*ERROR at teardown of test_b*",
+            "*test_b leaked resources:",
+            "*fds: * -> */unclosed.txt",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_a leaked*")
+    result.stdout.no_fnmatch_line("*kept.txt*")
+
+
+@leak_warnings_default
+def test_leak_location(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import threading
+
+        stop = threading.Event()
+
+        def test_leak():
+            threading.Thread(target=stop.wait).start()
+
+        def test_stop():
+            stop.set()
+        """
+    )
+    result = pytester.runpytest("--track-leaks=threads")
+    result.assert_outcomes(passed=2, warnings=1)
+    result.stdout.fnmatch_lines(
+        ["*test_leak_location.py:5: PytestResourceLeakWarning: *test_leak leaked*"]
+    )
+    result.stdout.no_fnmatch_line("*leaks.py*")
+
+
+def test_unknown_kind(pytester: Pytester) -> None:
+    result = pytester.runpytest("--track-leaks=fds,sockets")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*--track-leaks: unknown kind(s) sockets*"])
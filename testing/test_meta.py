@@ -10,6 +10,8 @@ import sys
 from typing import List
 
 import _pytest
+from _pytest.debugging import pytestPDB
+from _pytest.mark import MARK_GEN
 import pytest
 
 
@@ -31,3 +33,35 @@ def test_no_warnings(module: str) -> None:
         "-c", f"__import__({module!r})",
     ))
     # fmt: on
+
+
+def _imported_after(code: str) -> List[str]:
+    """Return the _pytest modules imported by running ``code``."""
+    output = subprocess.check_output(
+        (
+            sys.executable,
+            "-c",
+            f"import sys\n{code}\n"
+            "print(*sorted(m for m in sys.modules if m.startswith('_pytest')))",
+        ),
+        text=True,
+    )
+    return output.split()
+
+
+def test_import_is_lazy() -> None:
+    assert _imported_after("import pytest") == ["_pytest", "_pytest._version"]
+    modules = _imported_after("import pytest\npytest.fixture\npytest.mark")
+    assert "_pytest.fixtures" in modules
+    for module in ("_pytest.doctest", "_pytest.legacypath", "_pytest.pytester"):
+        assert module not in modules
+
+
+def test_namespace() -> None:
+    for name in pytest.__all__:
+        assert getattr(pytest, name) is not None
+    assert set(pytest.__all__) <= set(dir(pytest))
+    assert pytest.mark is MARK_GEN
+    assert pytest.set_trace == pytestPDB.set_trace
+    with pytest.raises(AttributeError, match="has no attribute 'nonexistent'"):
+        pytest.nonexistent  # noqa: B018
@@ -0,0 +1,120 @@
+import json
+from typing import Dict
+from typing import List
+
+from _pytest.pytester import Pytester
+
+
+def write_history(pytester: Pytester, durations: Dict[str, float]) -> None:
+    path = pytester.path.joinpath(".pytest_cache", "d", "history", "runs.jsonl")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    run = {
+        "time": 0.0,
+        "tests": {nodeid: ["passed", 0, d, 0] for nodeid, d in durations.items()},
+    }
+    path.write_text(json.dumps(run) + "\n", "utf-8")
+
+
+def collected(pytester: Pytester, *args: str) -> List[str]:
+    result = pytester.runpytest("--collect-only", "-q", *args)
+    return [line for line in result.stdout.lines if "::" in line]
+
+
+def test_order_by_duration(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        test_a="""
+        def test_1(): pass
+        def test_2(): pass
+        class TestC:
+            def test_3(self): pass
+            def test_4(self): pass
+        """,
+        test_b="""
+        def test_5(): pass
+        """,
+    )
+    write_history(
+        pytester,
+        {
+            "test_a.py::test_1": 0.1,
+            "test_a.py::test_2": 0.3,
+            "test_a.py::TestC::test_3": 0.2,
+            "test_a.py::TestC::test_4": 0.4,
+            "test_b.py::test_5": 2.0,
+        },
+    )
+    assert collected(pytester) == [
+        "test_a.py::test_1",
+        "test_a.py::test_2",
+        "test_a.py::TestC::test_3",
+        "test_a.py::TestC::test_4",
+        "test_b.py::test_5",
+    ]
+    # Modules and classes stay together.
+    assert collected(pytester, "--order=duration") == [
+        "test_b.py::test_5",
+        "test_a.py::TestC::test_4",
+        "test_a.py::TestC::test_3",
+        "test_a.py::test_2",
+        "test_a.py::test_1",
+    ]
+
+
+def test_order_keeps_fixture_param_groups(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture(scope="module", params=["a", "b"])
+        def resource(request):
+            return request.param
+
+        @pytest.mark.parametrize("x", [1, 2])
+        def test_it(resource, x):
+            pass
+        """
+    )
+    write_history(
+        pytester,
+        {
+            "test_order_keeps_fixture_param_groups.py::test_it[a-1]": 0.1,
+            "test_order_keeps_fixture_param_groups.py::test_it[a-2]": 0.1,
+            "test_order_keeps_fixture_param_groups.py::test_it[b-1]": 0.1,
+            "test_order_keeps_fixture_param_groups.py::test_it[b-2]": 0.5,
+        },
+    )
+    assert collected(pytester, "--order=duration") == [
+        "test_order_keeps_fixture_param_groups.py::test_it[b-2]",
+        "test_order_keeps_fixture_param_groups.py::test_it[b-1]",
+        "test_order_keeps_fixture_param_groups.py::test_it[a-1]",
+        "test_order_keeps_fixture_param_groups.py::test_it[a-2]",
+    ]
+
+
+def test_expected_duration_on_stash(pytester: Pytester) -> None:
+    pytester.makeconftest(
+        """
+        from _pytest.history import expected_duration_key
+        from _pytest.history import stash_expected_durations
+
+        def pytest_collection_modifyitems(items, config):
+            print("stashed", expected_duration_key in items[0].stash)
+            stash_expected_durations(config, items)
+            for item in items:
+                print("expected", item.name, item.stash.get(expected_duration_key, None))
+        """
+    )
+    pytester.makepyfile(
+        """
+        def test_known(): pass
+        def test_new(): pass
+        """
+    )
+    result = pytester.runpytest("--collect-only", "-s")
+    result.stdout.fnmatch_lines(["expected test_known None", "expected test_new None"])
+    write_history(pytester, {"test_expected_duration_on_stash.py::test_known": 1.5})
+    result = pytester.runpytest("--collect-only", "-s")
+    # Only set when asked for.
+    result.stdout.fnmatch_lines(
+        ["stashed False", "expected test_known 1.5", "expected test_new 1.5"]
+    )
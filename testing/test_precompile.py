@@ -0,0 +1,147 @@
+import os
+import sys
+
+from _pytest.assertion.archive import RewriteArchive
+from _pytest.assertion.rewrite import ARCHIVE_NAME
+from _pytest.assertion.rewrite import get_cache_dir
+from _pytest.assertion.rewrite import PYC_TAIL
+from _pytest.config import ExitCode
+from _pytest.monkeypatch import MonkeyPatch
+from _pytest.pytester import Pytester
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def write_bytecode(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    monkeypatch.setattr(sys, "pycache_prefix", None, raising=False)
+
+
+@pytest.fixture
+def project(pytester: Pytester) -> Pytester:
+    pytester.makeconftest("")
+    pytester.makepyfile(
+        test_a="def test_a(): assert 1",
+        test_b="def test_b(): assert 1",
+        helper="def helper(): pass",
+    )
+    return pytester
+
+
+def pyc(pytester: Pytester, relpath: str) -> bool:
+    path = pytester.path / relpath
+    return (get_cache_dir(path) / (path.stem + PYC_TAIL)).is_file()
+
+
+def test_precompile(project: Pytester) -> None:
+    result = project.runpytest("--precompile")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["rewrote 2 of 2 modules, the others were cached"])
+    assert pyc(project, "test_a.py")
+    assert pyc(project, "test_b.py")
+    # Not a test module.
+    assert not pyc(project, "helper.py")
+
+    result = project.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 0 of 2 modules, the others were cached"])
+    project.runpytest().assert_outcomes(passed=2)
+
+
+def test_process_pool(project: Pytester, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    project.makepyfile(test_c="def test_c(): assert 1")
+    result = project.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 3 of 3 modules, the others were cached"])
+    assert pyc(project, "test_c.py")
+    project.runpytest().assert_outcomes(passed=3)
+
+
+def test_explicit_file(project: Pytester) -> None:
+    result = project.runpytest("--precompile", "helper.py", "test_a.py::test_a")
+    result.stdout.fnmatch_lines(["rewrote 2 of 2 modules, the others were cached"])
+    assert pyc(project, "helper.py")
+
+
+def test_marked_for_rewrite(pytester: Pytester) -> None:
+    pytester.makeconftest("import pytest; pytest.register_assert_rewrite('pkg')")
+    pytester.makepyfile(
+        **{"pkg/__init__.py": "", "pkg/util.py": "", "other/util.py": ""}
+    )
+    result = pytester.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 2 of 2 modules, the others were cached"])
+    assert pyc(pytester, "pkg/util.py")
+    assert not pyc(pytester, "other/util.py")
+
+
+def test_norecursedirs(project: Pytester) -> None:
+    project.makepyfile(**{"build/test_c.py": "def test_c(): pass"})
+    result = project.runpytest("--precompile", "-o", "norecursedirs=build")
+    result.stdout.fnmatch_lines(["rewrote 2 of 2 modules, the others were cached"])
+    assert not pyc(project, "build/test_c.py")
+
+
+def test_syntax_error(project: Pytester) -> None:
+    project.makepyfile(test_c="def test_c(:")
+    result = project.runpytest("--precompile")
+    assert result.ret == ExitCode.OK
+    result.stdout.fnmatch_lines(["rewrote 2 of 3 modules, the others were cached"])
+    result = project.runpytest()
+    result.stdout.fnmatch_lines(["*SyntaxError*"])
+
+
+def test_cache_dir(project: Pytester) -> None:
+    project.makeini("[pytest]\nassert_rewrite_cache_dir = pycs")
+    project.runpytest("--precompile")
+    # With the conftest.py file, rewritten on import.
+    assert len(list(project.path.joinpath("pycs").iterdir())) == 3
+    assert not pyc(project, "test_a.py")
+    result = project.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 0 of 2 modules, the others were cached"])
+
+
+def test_at_session_start(project: Pytester) -> None:
+    project.makeini("[pytest]\nassert_rewrite_precompile = true")
+    project.makeconftest(
+        """
+        from pathlib import Path
+
+        from _pytest.assertion.rewrite import get_cache_dir, PYC_TAIL
+
+        def pytest_collection(session):
+            path = Path(session.config.rootpath, "test_a.py")
+            pyc = get_cache_dir(path) / ("test_a" + PYC_TAIL)
+            print("precompiled:", pyc.is_file())
+        """
+    )
+    result = project.runpytest("-s")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["precompiled: True"])
+
+
+def test_usage_errors(project: Pytester, monkeypatch: MonkeyPatch) -> None:
+    result = project.runpytest("--precompile", "--assert=plain")
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*--precompile requires --assert=rewrite"])
+
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    result = project.runpytest("--precompile")
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*writing bytecode is disabled*"])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_archive(project: Pytester, monkeypatch: MonkeyPatch, workers: int) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: workers)
+    project.makeini("[pytest]\nassert_rewrite_storage = archive")
+    result = project.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 2 of 2 modules, the others were cached"])
+    assert not pyc(project, "test_a.py")
+    archive = RewriteArchive(
+        project.path / ".pytest_cache/d/assertion-rewrite" / ARCHIVE_NAME
+    )
+    # With the conftest.py file, rewritten on import.
+    assert len(archive._open()) == 3
+    archive.close()
+    result = project.runpytest("--precompile")
+    result.stdout.fnmatch_lines(["rewrote 0 of 2 modules, the others were cached"])
+    project.runpytest().assert_outcomes(passed=2)
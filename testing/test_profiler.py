@@ -0,0 +1,64 @@
+import re
+import signal
+
+from _pytest.profiler import profile_filename
+from _pytest.pytester import Pytester
+import pytest
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(signal, "setitimer"), reason="requires signal.setitimer"
+)
+
+
+def test_profile_sample(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def burn(seconds):
+            end = time.process_time() + seconds
+            while time.process_time() < end:
+                pass
+
+        def test_slow():
+            burn(0.3)
+
+        def test_fast():
+            pass
+        """
+    )
+    result = pytester.runpytest("--profile-sample=1000", "--profile-sample-top=1")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*= sampled profile: top 1 tests =*",
+            "*s * samples test_profile_sample.py::test_slow",
+            "* samples at 1000 Hz written to pytest-profile",
+        ]
+    )
+    result.stdout.no_fnmatch_line("* samples test_profile_sample.py::test_fast")
+
+    outdir = pytester.path / "pytest-profile"
+    collapsed = re.compile(r"^\S.* \d+$")
+    lines = (outdir / "session.collapsed").read_text("utf-8").splitlines()
+    assert lines
+    assert all(collapsed.match(line) for line in lines)
+
+    nodeid = "test_profile_sample.py::test_slow"
+    lines = (outdir / profile_filename(nodeid)).read_text("utf-8").splitlines()
+    assert all(collapsed.match(line) for line in lines)
+    assert any(line.startswith("call;") and "burn (" in line for line in lines)
+
+
+def test_profile_sample_invalid(pytester: Pytester) -> None:
+    result = pytester.runpytest("--profile-sample=0")
+    result.stderr.fnmatch_lines(["*--profile-sample must be a positive integer*"])
+
+
+def test_profile_filename() -> None:
+    a = profile_filename("test_a.py::test[a/b]")
+    b = profile_filename("test_a.py::test[a:b]")
+    assert a != b
+    assert a.startswith("test_a.py_test_a_b-")
+    assert a.endswith(".collapsed")
@@ -36,6 +36,15 @@ class TestReportSerialization:
         assert test_b_call.outcome == "passed"
         assert test_b_call._to_json()["longrepr"] is None
 
+    def test_resources_round_trip(self, pytester: Pytester) -> None:
+        reprec = pytester.inline_runsource("def test_a(): pass", "--resource-usage")
+        reports = reprec.getreports("pytest_runtest_logreport")
+        assert len(reports) == 3
+        for rep in reports:
+            assert rep.resources is not None
+            a = TestReport._from_json(rep._to_json())
+            assert a.resources == rep.resources
+
     def test_xdist_report_longrepr_reprcrash_130(self, pytester: Pytester) -> None:
         """Regarding issue pytest-xdist#130
 
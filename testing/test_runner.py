@@ -1111,3 +1111,93 @@ def test_pytest_version_env_var(pytester: Pytester, monkeypatch: MonkeyPatch) ->
     result = pytester.runpytest_inprocess()
     assert result.ret == ExitCode.OK
     assert os.environ["PYTEST_VERSION"] == "old version"
+
+
+def test_runtest_phase_context(pytester: Pytester) -> None:
+    """Contexts registered with register_runtest_phase_context wrap every phase,
+    and errors raised when leaving them are reported against that phase."""
+    pytester.makeconftest(
+        """
+        import contextlib
+
+        from _pytest.runner import register_runtest_phase_context
+
+        phases = []
+
+        @contextlib.contextmanager
+        def phase_context(item, when):
+            phases.append((item.name, when, "enter"))
+            yield
+            phases.append((item.name, when, "exit"))
+            if item.name == "test_bad_exit" and when == "call":
+                raise RuntimeError("leaving call")
+
+        def pytest_configure(config):
+            register_runtest_phase_context(config, phase_context)
+
+        def pytest_unconfigure(config):
+            print("phases:", phases)
+        """
+    )
+    pytester.makepyfile(
+        """
+        def test_ok():
+            pass
+
+        def test_bad_exit():
+            pass
+        """
+    )
+    result = pytester.runpytest("-s")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*RuntimeError: leaving call*"])
+    expected = [
+        (name, when, action)
+        for name in ("test_ok", "test_bad_exit")
+        for when in ("setup", "call", "teardown")
+        for action in ("enter", "exit")
+    ]
+    result.stdout.fnmatch_lines([f"phases: {expected!r}"])
+
+
+@pytest.mark.parametrize("tracemalloc", [False, True])
+def test_resource_usage(pytester: Pytester, tracemalloc: bool) -> None:
+    pytester.makepyfile(
+        """
+        import gc
+
+        def test_func():
+            data = [object() for _ in range(10000)]
+            gc.collect()
+        """
+    )
+    args = ["--resource-usage-tracemalloc" if tracemalloc else "--resource-usage"]
+    reprec = pytester.inline_run(*args)
+    reports = reprec.getreports("pytest_runtest_logreport")
+    assert [rep.when for rep in reports] == ["setup", "call", "teardown"]
+    for rep in reports:
+        assert rep.resources is not None
+        assert set(rep.resources) == {
+            "cpu_user",
+            "cpu_system",
+            "maxrss_delta",
+            "gc_collections",
+            "gc_pause",
+            "tracemalloc_peak",
+        }
+        assert rep.resources["cpu_user"] >= 0
+        assert rep.resources["maxrss_delta"] >= 0
+    call = reports[1].resources
+    assert call["gc_collections"] >= 1
+    assert call["gc_pause"] > 0
+    if tracemalloc:
+        assert call["tracemalloc_peak"] > 10000 * 16
+    else:
+        assert call["tracemalloc_peak"] is None
+
+
+def test_resource_usage_disabled(pytester: Pytester) -> None:
+    pytester.makepyfile("def test_func(): pass")
+    reprec = pytester.inline_run()
+    for rep in reprec.getreports("pytest_runtest_logreport"):
+        assert rep.resources is None
@@ -0,0 +1,102 @@
+import json
+from typing import List
+
+from _pytest.pytester import Pytester
+from _pytest.sharding import assign_shards
+import pytest
+
+
+def selected(pytester: Pytester, *args: str) -> List[str]:
+    result = pytester.runpytest("--collect-only", "-q", *args)
+    return [line for line in result.stdout.lines if "::" in line]
+
+
+def test_shards_partition_tests(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        test_a="""
+        import pytest
+
+        @pytest.mark.parametrize("x", range(7))
+        def test_a(x):
+            pass
+        """,
+        test_b="def test_b(): pass",
+    )
+    shards = [selected(pytester, f"--shard={k}/3") for k in (1, 2, 3)]
+    assert sorted(len(shard) for shard in shards) == [2, 3, 3]
+    all_items = selected(pytester)
+    assert sorted(item for shard in shards for item in shard) == sorted(all_items)
+    # Same assignment on every run.
+    assert shards == [selected(pytester, f"--shard={k}/3") for k in (1, 2, 3)]
+
+
+def test_shards_keep_fixture_groups_together(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture(scope="module", params=["a", "b"])
+        def resource(request):
+            return request.param
+
+        @pytest.mark.parametrize("x", range(3))
+        def test_uses_resource(resource, x):
+            pass
+        """
+    )
+    for k in (1, 2):
+        items = selected(pytester, f"--shard={k}/2")
+        assert len(items) == 3
+        assert len({item.split("[")[1].split("-")[0] for item in items}) == 1
+
+
+def test_shards_balanced_by_history(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("x", range(4))
+        def test_x(x):
+            pass
+        """
+    )
+    history = pytester.path.joinpath(".pytest_cache", "d", "history", "runs.jsonl")
+    history.parent.mkdir(parents=True)
+    durations = {0: 3.0, 1: 1.0, 2: 1.0, 3: 1.0}
+    run = {
+        "time": 0.0,
+        "tests": {
+            f"test_shards_balanced_by_history.py::test_x[{x}]": ["passed", 0, d, 0]
+            for x, d in durations.items()
+        },
+    }
+    history.write_text(json.dumps(run) + "\n", "utf-8")
+    shards = [selected(pytester, f"--shard={k}/2") for k in (1, 2)]
+    assert sorted(shards, key=len) == [
+        ["test_shards_balanced_by_history.py::test_x[0]"],
+        [
+            "test_shards_balanced_by_history.py::test_x[1]",
+            "test_shards_balanced_by_history.py::test_x[2]",
+            "test_shards_balanced_by_history.py::test_x[3]",
+        ],
+    ]
+    result = pytester.runpytest("--shard=1/2")
+    result.stdout.fnmatch_lines(["shard 1/2: estimated duration 3.00s"])
+
+
+def test_assign_shards() -> None:
+    assert assign_shards([5, 4, 3, 3, 1], [[0], [1], [2], [3], [4]], 2) == [
+        0,
+        1,
+        1,
+        0,
+        1,
+    ]
+    assert assign_shards([1, 1], [[0, 1]], 3) == [0]
+
+
+@pytest.mark.parametrize("value", ["1", "0/2", "3/2", "a/b", "1/0"])
+def test_invalid_shard(pytester: Pytester, value: str) -> None:
+    result = pytester.runpytest(f"--shard={value}")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["ERROR: --shard*"])
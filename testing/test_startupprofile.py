@@ -0,0 +1,70 @@
+import json
+from typing import Tuple
+
+from _pytest.config.startupprofile import StartupProfile
+from _pytest.pytester import Pytester
+import pytest
+
+
+def test_startup_profile(pytester: Pytester) -> None:
+    pytester.makepyfile(slowplugin="import time; time.sleep(0.05)")
+    pytester.makeconftest(
+        """
+        import time
+
+        pytest_plugins = ["slowplugin"]
+
+        def pytest_configure(config):
+            time.sleep(0.02)
+        """
+    )
+    pytester.makepyfile("def test_it(): pass")
+    pytester.syspathinsert()
+    result = pytester.runpytest("--startup-profile=profile.json")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*= startup phases (*s) =*",
+            "*own*total  kind  name",
+            "*s *s  plugin  slowplugin",
+            "*s *s  configure  conftest.py",
+        ]
+    )
+    result.stdout.fnmatch_lines(["*s *s  conftest  conftest.py"])
+    result.stdout.fnmatch_lines(["*s *s  ini  configuration file"])
+
+    data = json.loads(pytester.path.joinpath("profile.json").read_text("utf-8"))
+    phases = {(p["kind"], p["name"]): p for p in data["phases"]}
+    assert phases["conftest", str(pytester.path / "conftest.py")]["own"] < 0.05
+    assert phases["plugin", "slowplugin"]["own"] >= 0.05
+    assert phases["configure", str(pytester.path / "conftest.py")]["own"] >= 0.02
+    assert sum(p["own"] for p in data["phases"]) == pytest.approx(data["duration"])
+    assert [p["own"] for p in data["phases"]] == sorted(
+        (p["own"] for p in data["phases"]), reverse=True
+    )
+
+
+@pytest.mark.parametrize("args", [(), ("--fixtures-per-test",)])
+def test_not_reported_by_default(pytester: Pytester, args: Tuple[str, ...]) -> None:
+    pytester.makepyfile("def test_it(): pass")
+    result = pytester.runpytest(*args)
+    assert result.ret == 0
+    result.stdout.no_fnmatch_line("*startup phases*")
+
+
+def test_phases_after_end_not_recorded(mock_timing) -> None:
+    profile = StartupProfile()
+    with profile.phase("plugin", "outer"):
+        mock_timing.sleep(1)
+        with profile.phase("plugin", "inner"):
+            mock_timing.sleep(2)
+    mock_timing.sleep(4)
+    profile.end()
+    with profile.phase("plugin", "late"):
+        mock_timing.sleep(8)
+    assert profile.duration == 7
+    assert [(p.kind, p.name, p.own, p.total) for p in profile.sorted_phases()] == [
+        ("other", "", 4, 4),
+        ("plugin", "inner", 2, 2),
+        ("plugin", "outer", 1, 3),
+    ]
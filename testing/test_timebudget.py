@@ -0,0 +1,106 @@
+import json
+from typing import Dict
+
+from _pytest.pytester import Pytester
+import pytest
+
+
+def write_history(pytester: Pytester, durations: Dict[str, float]) -> None:
+    path = pytester.path.joinpath(".pytest_cache", "d", "history", "runs.jsonl")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Far in the future, so that no test file counts as changed.
+    run = {
+        "time": 4e9,
+        "tests": {nodeid: ["passed", 0, d, 0] for nodeid, d in durations.items()},
+    }
+    path.write_text(json.dumps(run) + "\n", "utf-8")
+
+
+def test_selects_by_value_per_second(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_slow(): pass
+        def test_fast(): pass
+        def test_failed(): pass
+        def test_medium(): pass
+        """
+    )
+    prefix = "test_selects_by_value_per_second.py::"
+    write_history(
+        pytester,
+        {
+            prefix + "test_slow": 100.0,
+            prefix + "test_fast": 1.0,
+            prefix + "test_failed": 30.0,
+            prefix + "test_medium": 30.0,
+        },
+    )
+    pytester.path.joinpath(".pytest_cache", "v", "cache").mkdir(parents=True)
+    pytester.path.joinpath(".pytest_cache", "v", "cache", "lastfailed").write_text(
+        json.dumps({prefix + "test_failed": True}), "utf-8"
+    )
+    result = pytester.runpytest("--time-budget=60", "-v")
+    result.assert_outcomes(passed=2, deselected=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*::test_fast PASSED*",
+            "*::test_failed PASSED*",
+            "*= time budget of 60s =*",
+            "selected tests expected to take 31.00s, used *s",
+            "2 tests deselected for time, expected to take 130.00s",
+            "not run: *::test_slow",
+            "not run: *::test_medium",
+        ]
+    )
+
+
+def test_new_tests_are_valuable(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        def test_old(): pass
+        def test_new(): pass
+        """
+    )
+    prefix = "test_new_tests_are_valuable.py::"
+    pytester.path.joinpath(".pytest_cache", "v", "cache").mkdir(parents=True)
+    pytester.path.joinpath(".pytest_cache", "v", "cache", "nodeids").write_text(
+        json.dumps([prefix + "test_old"]), "utf-8"
+    )
+    write_history(pytester, {prefix + "test_old": 10.0})
+    result = pytester.runpytest("--time-budget=15", "-v")
+    result.assert_outcomes(passed=1, deselected=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*::test_new PASSED*",
+            "1 tests deselected for time, expected to take 10.00s",
+        ]
+    )
+
+
+def test_stops_at_budget(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        """
+        import time
+
+        def test_1():
+            time.sleep(0.5)
+
+        def test_2(): pass
+        def test_3(): pass
+        """
+    )
+    result = pytester.runpytest("--time-budget=0.3", "-p", "no:cacheprovider")
+    assert result.ret == 0
+    result.assert_outcomes(passed=1, deselected=2)
+    result.stdout.fnmatch_lines(
+        [
+            "no recorded durations, tests ordered by value, used *s",
+            "2 tests not run after the budget was used up",
+        ]
+    )
+
+
+def test_invalid_budget(pytester: Pytester) -> None:
+    result = pytester.runpytest("--time-budget=0")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["ERROR: --time-budget must be positive, got 0.0"])
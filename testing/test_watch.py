@@ -0,0 +1,211 @@
+from pathlib import Path
+import signal
+import subprocess
+import sys
+import time
+from typing import Type
+from typing import Union
+
+from _pytest.config import ExitCode
+from _pytest.pytester import Pytester
+from _pytest.watch import InotifyWatcher
+from _pytest.watch import PollingWatcher
+import pytest
+
+
+@pytest.mark.parametrize(
+    "watcher_class",
+    [
+        PollingWatcher,
+        pytest.param(
+            InotifyWatcher,
+            marks=pytest.mark.skipif(
+                not sys.platform.startswith("linux"), reason="requires inotify"
+            ),
+        ),
+    ],
+)
+def test_watcher(
+    pytester: Pytester,
+    watcher_class: Type[Union[PollingWatcher, InotifyWatcher]],
+) -> None:
+    pytester.makepyfile(mod="x = 1")
+    config = pytester.parseconfig()
+    watcher = watcher_class(config, lambda path: path.endswith(".py"))
+    try:
+        pytester.makepyfile(mod="x = 2", new="")
+        pytester.path.joinpath("data.txt").write_text("ignored", encoding="utf-8")
+        pytester.mkdir("__pycache__").joinpath("mod.py").write_text("")
+        pytester.mkdir("sub").joinpath("sub.py").write_text("")
+        assert watcher.wait() == {
+            str(pytester.path / name) for name in ("mod.py", "new.py", "sub/sub.py")
+        }
+    finally:
+        watcher.close()
+
+
+def wait_for(output: Path, text: str, count: int = 1) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if output.read_text(encoding="utf-8").count(text) >= count:
+            return
+        time.sleep(0.05)
+    pytest.fail(f"{text!r} not found in:\n{output.read_text(encoding='utf-8')}")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sends SIGINT")
+def test_watch(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        **{
+            "pkg/__init__.py": "",
+            "pkg/core.py": "def value(): return 1",
+            "tests/test_core.py": """
+                from pkg.core import value
+                def test_value(): assert value() == 2
+            """,
+            "tests/test_other.py": "def test_other(): pass",
+        }
+    )
+    pytester.makeini("[pytest]\npythonpath = .")
+    output = pytester.path / "output.txt"
+    with output.open("wb") as f:
+        proc = pytester.popen(
+            [sys.executable, "-m", "pytest", "--watch", "-p", "no:cacheprovider"],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for(output, "watching for changes")
+        wait_for(output, "1 failed, 1 passed")
+
+        # The changed module is loaded again, and its dependent tests re-run.
+        pytester.makepyfile(**{"pkg/core.py": "def value(): return 2"})
+        wait_for(output, "watch: 1 changed files, running 1 tests")
+        wait_for(output, "watching for changes", 2)
+
+        pytester.makepyfile(
+            **{
+                "tests/test_other.py": """
+                    def test_other(): pass
+                    def test_new(): assert 0
+                """
+            }
+        )
+        wait_for(output, "watch: 1 changed files, running 2 tests")
+        wait_for(output, "watching for changes", 3)
+
+        # Only the failed test is re-run for a change without dependent tests.
+        pytester.makepyfile(**{"pkg/unused.py": ""})
+        wait_for(output, "watch: 1 changed files, running 1 tests", 2)
+        wait_for(output, "watching for changes", 4)
+
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=60) == ExitCode.TESTS_FAILED
+    finally:
+        proc.kill()
+        proc.wait()
+    text = output.read_text(encoding="utf-8")
+    assert "test_core.py ." in text
+    assert "FAILED tests/test_other.py::test_new - assert 0" in text
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sends SIGINT")
+def test_watch_reruns_failed_batch_cases(pytester: Pytester) -> None:
+    pytester.makepyfile(
+        test_a="""
+            import pytest
+
+            @pytest.mark.batch
+            @pytest.mark.parametrize("x", [1, 2, 3, 4])
+            def test_case(x):
+                assert x < 2
+        """
+    )
+    output = pytester.path / "output.txt"
+    with output.open("wb") as f:
+        proc = pytester.popen(
+            [sys.executable, "-m", "pytest", "--watch", "-p", "no:cacheprovider"],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for(output, "watching for changes")
+        wait_for(output, "3 failed, 1 passed")
+        pytester.makepyfile(unused="")
+        wait_for(output, "watch: 1 changed files, running 3 tests")
+        wait_for(output, "watching for changes", 2)
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=60) == ExitCode.TESTS_FAILED
+    finally:
+        proc.kill()
+        proc.wait()
+    text = output.read_text(encoding="utf-8")
+    # The failed cases run again, batched or not, rather than being skipped.
+    assert "3 failed in" in text
+    for x in (2, 3, 4):
+        assert text.count(f"FAILED test_a.py::test_case[{x}]") >= 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sends SIGINT")
+def test_watch_restarts_on_conftest_change(pytester: Pytester) -> None:
+    pytester.makepyfile(test_a="def test_a(): pass")
+    output = pytester.path / "output.txt"
+    with output.open("wb") as f:
+        proc = pytester.popen(
+            [sys.executable, "-m", "pytest", "--watch", "-p", "no:cacheprovider"],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for(output, "watching for changes")
+        pytester.makeconftest("")
+        wait_for(output, "watch: conftest.py is affected, restarting")
+        wait_for(output, "watching for changes", 2)
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=60) == ExitCode.OK
+    finally:
+        proc.kill()
+        proc.wait()
+    assert output.read_text(encoding="utf-8").count("test session starts") == 2
+
+
+@pytest.mark.parametrize("option", ["--shard=1/2", "--time-budget=10"])
+def test_watch_refuses_selection_options(pytester: Pytester, option: str) -> None:
+    result = pytester.runpytest("--watch", option)
+    assert result.ret == ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*--watch cannot be combined with --*"])
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sends SIGINT")
+def test_watch_selects_from_all_items(pytester: Pytester) -> None:
+    pytester.makeconftest(
+        """
+        def pytest_collection_modifyitems(items):
+            print(f"selecting from {len(items)} items")
+        """
+    )
+    pytester.makepyfile(
+        test_a="def test_a1(): pass\ndef test_a2(): pass",
+        test_b="def test_b(): pass",
+    )
+    output = pytester.path / "output.txt"
+    with output.open("wb") as f:
+        proc = pytester.popen(
+            [sys.executable, "-m", "pytest", "--watch", "-s", "-p", "no:cacheprovider"],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for(output, "watching for changes")
+        pytester.makepyfile(test_b="def test_b(): pass\ndef test_b2(): pass")
+        wait_for(output, "watch: 1 changed files, running 2 tests")
+        wait_for(output, "watching for changes", 2)
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=60) == ExitCode.OK
+    finally:
+        proc.kill()
+        proc.wait()
+    text = output.read_text(encoding="utf-8")
+    assert text.count("selecting from 3 items") == 1
+    assert text.count("selecting from 4 items") == 1
+    assert "selecting from 2 items" not in text